@@ -1,13 +1,19 @@
+import contextlib
+import uuid
+
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib_venn import venn2
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-import plotly.express as px
-from matplotlib.ticker import MaxNLocator
+
+from transjakarta.analytics import get_store_aggregates
+from transjakarta.charts import ChartCache, coverage_chart, dashboard_charts
+from transjakarta.chat import ResponseCache, stream_response
+from transjakarta.context import ANGGARAN_TOKEN_KONTEKS, get_sections, select_context
+from transjakarta.coords import normalize_coordinates, rejection_summary
+from transjakarta.cube import DIMENSI, filter_key, get_cube
+from transjakarta.maps import TINGKAT_DETAIL, build_deck, build_hub_deck, get_map_layers
+from transjakarta.matching import AMBANG_COCOK, get_endpoint_matches, get_hub_locations
+from transjakarta.profiling import LOG_BAWAAN, Profiler, activate, span
+from transjakarta.spatial import MAKS_JARAK_WILAYAH_KM, coverage_gaps, get_coverage
+from transjakarta.store import PartitionedStore
 
 # --- BAGIAN 1: KONFIGURASI TAMPILAN DAN FUNGSI BANTU ---
 
@@ -31,7 +37,7 @@ def set_page_style():
     }
     
     /* Style untuk SETIAP GRAFIK sebagai kartu dengan bayangan */
-    .stPlot, [data-testid="stImage"], .stDataFrame, .stMap, .stPlotlyChart, .stGraphVizChart {
+    .stPlot, [data-testid="stImage"], .stDataFrame, .stMap, .stDeckGlJsonChart, .stPlotlyChart, .stGraphVizChart {
         background: #FFFFFF;
         border-radius: 15px;
         padding: 20px;
@@ -77,361 +83,592 @@ def set_page_style():
     """, unsafe_allow_html=True)
 
 
-@st.cache_data
-def load_data():
+# Interval pemeriksaan file baru/berubah di direktori data
+INTERVAL_PANTAU_DETIK = 30
+
+
+@st.cache_resource
+def get_store():
+    """
+    Penyimpanan terpartisi direktori data (lihat transjakarta.store), dipakai
+    bersama oleh semua sesi dalam satu proses.
+    """
+    return PartitionedStore('.')
+
+
+@st.cache_resource(max_entries=2)
+def load_data(fingerprint):
     """
-    Memuat data dari file Excel. Menggunakan caching Streamlit untuk performa.
+    Memuat data dari penyimpanan terpartisi (lihat transjakarta.store). Hanya
+    file Excel yang baru atau berubah yang di-parse saat sinkronisasi;
+    `fingerprint` membuat cache Streamlit ikut diperbarui saat itu terjadi.
+
+    DataFrame disimpan sekali per proses dan dibagikan ke semua sesi tanpa
+    disalin (berbeda dengan st.cache_data yang mengembalikan salinan hasil
+    unpickle di setiap rerun); max_entries=2 menyisakan dataset lama selama
+    pergantian data. pandas tidak mencegah penulisan ke frame ini, jadi
+    pemanggil tidak memakainya langsung: setiap rerun menerima view
+    copy-on-write (df.copy(deep=False)), sehingga penulisan in-place hanya
+    menyalin kolom yang ditulis di sesi itu. Hasil turunan yang di-memo per
+    sidik jari (agregat, kubus, peta) tetap dibagikan antarsesi; tidak
+    mengubahnya in-place adalah konvensi yang wajib diikuti modul analitik.
     """
     try:
-        halte_df = pd.read_excel('Data Halte Transjakarta 2025_modified.xlsx', sheet_name='Sheet1')
-        bus_penumpang_df = pd.read_excel('Data Jumlah Bus yang Beroperasi dan Jumlah Penumpang Layanan Transjakarta 2024_modified.xlsx', sheet_name='Sheet1')
-        rute_df = pd.read_excel('Data Rute Jalur Transjakarta 2024_modified.xlsx', sheet_name='Sheet1')
-
-        # FIX: Gabungkan kategori 'BRT' dan 'Bus Rapid Transit'
-        bus_penumpang_df['jenis_layanan'] = bus_penumpang_df['jenis_layanan'].replace('Bus Rapid Transit', 'BRT')
-        rute_df['kategori'] = rute_df['kategori'].replace('Bus Rapid Transit', 'BRT')
-
-        # Persiapan data untuk peta geospasial
-        halte_df['koordinat_x'] = pd.to_numeric(halte_df['koordinat_x'], errors='coerce')
-        halte_df['koordinat_y'] = pd.to_numeric(halte_df['koordinat_y'], errors='coerce')
-        halte_df.dropna(subset=['koordinat_x', 'koordinat_y'], inplace=True)
-        
-        halte_df['lat'] = halte_df['koordinat_x'] / 1000000
-        halte_df['lon'] = halte_df['koordinat_y'].apply(lambda y: y / 100000 if y < 100000000 else y / 1000000)
+        # Penyatuan 'BRT' dan 'Bus Rapid Transit' dilakukan di lapisan ingest
+        sumber = get_store().load()
+        halte_df = sumber['halte']
+        bus_penumpang_df = sumber['bus_penumpang']
+        rute_df = sumber['rute']
 
-        halte_df = halte_df[
-            (halte_df['lat'] > -6.5) & (halte_df['lat'] < -6.0) &
-            (halte_df['lon'] > 106.6) & (halte_df['lon'] < 107.0)
-        ].copy()
-        
-        return halte_df, bus_penumpang_df, rute_df
+        # Persiapan data untuk peta geospasial: skala koordinat dideteksi per nilai
+        # dan baris di luar batas wilayah dicatat beserta alasannya
+        halte_df, halte_ditolak_df = normalize_coordinates(halte_df)
+
+        return halte_df, bus_penumpang_df, rute_df, halte_ditolak_df
     except FileNotFoundError as e:
         st.error(f"Gagal memuat file: {e.filename}. Pastikan file Excel asli ada di direktori yang sama.")
-        return None, None, None
+        return None, None, None, None
     except Exception as e:
         st.error(f"Terjadi kesalahan saat memproses data: {e}")
-        return None, None, None
+        return None, None, None, None
+
+def profiler_baru(lingkup):
+    """
+    Profiler baru sesuai pengaturan panel profiling di sidebar, atau None bila profiling nonaktif.
+    """
+    if not st.session_state.get('profiling'):
+        return None
+    return Profiler(lingkup, lacak_memori=st.session_state.get('profil_memori', False))
+
+
+def laporkan_profil(profiler, wadah, **meta):
+    """
+    Menampilkan hasil profiler di `wadah` dan, bila diminta, menambahkannya ke log JSONL.
+    """
+    profiler.stop()
+    if st.session_state.get('profil_log'):
+        sesi = st.session_state.setdefault('id_sesi', uuid.uuid4().hex[:8])
+        profiler.append_jsonl(LOG_BAWAAN, sesi=sesi, **meta)
+
+    tabel = profiler.to_frame()
+    for kolom in ('detik', 'detik_sendiri', 'cpu_detik', 'pertama_detik'):
+        if kolom in tabel:
+            tabel[kolom] = tabel[kolom] * 1000
+    kolom_tampil = [k for k in ('bagian', 'nama', 'fase', 'detik', 'detik_sendiri', 'cpu_detik', 'rss_delta_mb',
+                                'puncak_mb', 'cache', 'pertama_detik') if k in tabel]
+    with wadah:
+        st.markdown(f"**Profil {profiler.lingkup} terakhir: {profiler.total_detik * 1000:,.0f} ms**")
+        st.dataframe((profiler.phase_summary() * 1000).rename('ms (waktu sendiri)').to_frame().style.format('{:,.1f}'))
+        st.dataframe(
+            tabel[kolom_tampil],
+            hide_index=True,
+            column_config={
+                'detik': st.column_config.NumberColumn("wall (ms)", format="%.1f"),
+                'detik_sendiri': st.column_config.NumberColumn("sendiri (ms)", format="%.1f", help="Waktu wall dikurangi span anak."),
+                'cpu_detik': st.column_config.NumberColumn("CPU thread (ms)", format="%.1f", help="Waktu CPU thread sesi ini."),
+                'rss_delta_mb': st.column_config.NumberColumn(
+                    "ΔRSS proses (MB)", format="%.1f",
+                    help="Seluruh proses; kosong bila sesi lain sedang diprofil bersamaan."),
+                'puncak_mb': st.column_config.NumberColumn(
+                    "puncak proses (MB)", format="%.1f",
+                    help="Puncak tracemalloc seluruh proses; kosong bila sesi lain sedang diprofil bersamaan."),
+                'pertama_detik': st.column_config.NumberColumn("potongan pertama (ms)", format="%.0f"),
+            }
+        )
+
+@st.fragment(run_every=INTERVAL_PANTAU_DETIK)
+def pantau_data():
+    """
+    Memeriksa direktori data secara berkala (hanya os.stat) dan menjalankan
+    ulang aplikasi bila ada file sumber yang baru, berubah, atau dihapus.
+    """
+    store = get_store()
+    if any(store.scan().values()):
+        st.rerun()
+    st.caption(f"Diperiksa setiap {INTERVAL_PANTAU_DETIK} detik.")
+
+
+def render_sumber_data(store, perubahan):
+    """
+    Ringkasan file sumber di penyimpanan terpartisi (sidebar).
+    """
+    with st.sidebar.expander("Data sumber"):
+        ringkasan = store.summary()
+        st.dataframe(ringkasan[['file', 'sumber', 'baris', 'partisi']], hide_index=True)
+        diperbarui = perubahan['baru'] + perubahan['berubah'] + perubahan['dihapus']
+        if diperbarui:
+            st.caption(f"Diperbarui pada rerun ini: {', '.join(diperbarui)}")
+        if st.toggle("Pantau file baru", value=True, key='pantau_data'):
+            pantau_data()
+
+def kosongkan_filter():
+    for dimensi in DIMENSI:
+        st.session_state[f"filter_{dimensi}"] = []
+
+
+def catat_filter_terakhir(dimensi):
+    st.session_state['filter_terakhir'] = dimensi
+
+
+def render_filter(cube):
+    """
+    Filter silang di sidebar. Pilihan setiap dimensi hanya berisi nilai yang
+    masih memiliki data di bawah filter dimensi lainnya; pilihan kosong berarti semua.
+    Mengembalikan filter {dimensi: [nilai, ...]}.
+    """
+    filter_ = {d: list(st.session_state.get(f"filter_{d}", [])) for d in DIMENSI}
+    # Nilai yang tidak lagi memiliki data di bawah filter lain dibuang sebelum
+    # widget dibuat; dimensi yang terakhir diubah pengguna diutamakan
+    terakhir = st.session_state.get('filter_terakhir')
+    for dimensi in sorted(DIMENSI, key=lambda d: d != terakhir):
+        if filter_[dimensi]:
+            pilihan = cube.options(dimensi, filter_)
+            filter_[dimensi] = [v for v in filter_[dimensi] if v in pilihan]
+
+    with st.sidebar.expander("Filter silang", expanded=bool(filter_key(filter_))):
+        for dimensi, label in DIMENSI.items():
+            kunci = f"filter_{dimensi}"
+            st.session_state[kunci] = filter_[dimensi]
+            filter_[dimensi] = st.multiselect(
+                label, cube.options(dimensi, filter_), key=kunci, placeholder="Semua",
+                on_change=catat_filter_terakhir, args=(dimensi,),
+            )
+        st.button("Hapus semua filter", on_click=kosongkan_filter, disabled=not filter_key(filter_))
+    return filter_
+
+
+def sumber_kosong(agg, nama, keterangan):
+    """
+    Menampilkan pemberitahuan dan mengembalikan True bila sumber `nama` tidak memiliki data untuk filter aktif.
+    """
+    if nama in agg['kosong']:
+        st.info(f"Tidak ada data {keterangan} untuk filter yang dipilih.")
+        return True
+    return False
 
 # --- BAGIAN 2: LOGIKA CHATBOT DENGAN LANGCHAIN ---
 
-def get_response(user_query, chat_history, model, data_context):
+@st.cache_resource
+def get_chat_model(google_api_key):
     """
-    Mendapatkan respons dari model AI menggunakan LangChain.
+    Klien model AI, dibuat sekali per proses saat pertanyaan pertama dikirim.
+    LangChain dan klien Google baru diimpor di sini, bukan saat aplikasi dimulai.
     """
-    template = """
-    Anda adalah "Analis AI", seorang ahli analis data transportasi publik yang berspesialisasi dalam sistem Transjakarta.
-    Anda sedang berdiskusi dengan seorang pengguna yang melihat dashboard interaktif.
-    Berdasarkan konteks data yang telah dianalisis dan riwayat percakapan, berikan jawaban yang mendalam dan rekomendasi yang dapat ditindaklanjuti.
+    from langchain_google_genai import ChatGoogleGenerativeAI
 
-    Konteks Hasil Analisis Data:
-    {data_context}
+    return ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=google_api_key, temperature=0.7)
 
-    Riwayat Percakapan:
-    {chat_history}
 
-    Pertanyaan Pengguna:
-    {user_question}
+@st.cache_resource
+def get_response_cache():
     """
-    
-    prompt = PromptTemplate(
-        input_variables=["data_context", "chat_history", "user_question"],
-        template=template
+    Cache jawaban chatbot yang dipakai bersama oleh semua sesi dalam satu proses.
+    """
+    return ResponseCache()
+
+
+def get_response(user_query, chat_history, model, data_context, data_fingerprint=None):
+    """
+    Mengalirkan respons dari model AI menggunakan LangChain (generator potongan
+    teks untuk st.write_stream). `chat_history` berisi pesan sebelum pertanyaan ini.
+    """
+    return stream_response(
+        model, user_query, chat_history, data_context,
+        cache=get_response_cache(), kunci_dataset=data_fingerprint
     )
-    
-    chain = prompt | model
-    
-    response = chain.invoke({
-        "data_context": data_context,
-        "chat_history": chat_history,
-        "user_question": user_query
-    })
-    
-    return response.content
 
-# --- BAGIAN 3: UTAMA APLIKASI STREAMLIT ---
+# --- BAGIAN 3: BAGIAN-BAGIAN DASHBOARD ---
+
+@st.cache_resource
+def get_chart_cache():
+    """
+    Cache gambar grafik yang dipakai bersama oleh semua sesi dalam satu proses.
+    """
+    return ChartCache()
+
+
+def tampilkan_grafik(key, spec):
+    """
+    Menampilkan grafik (ChartSpec) dari cache; grafik hanya digambar bila kuncinya belum ada.
+    `key` harus memuat sidik jari data dan semua parameter yang memengaruhi grafik.
+    """
+    cache = get_chart_cache()
+    with span(f"grafik {key[0]}", 'render') as catatan:
+        misses = cache.misses
+        data = cache.get_or_render(key, spec, figsize=spec.figsize)
+        catatan['cache'] = 'miss' if cache.misses > misses else 'hit'
+    with span(f"kirim {key[0]}", 'kirim'):
+        st.image(data, width="stretch")
+
+
+def render_distribusi_halte(agg):
+    """
+    Bagian "Distribusi Halte": jumlah halte per wilayah dan kecamatan.
+    """
+    st.header("Analisis Distribusi Geografis Halte")
+    if sumber_kosong(agg, 'halte', "halte"):
+        return
+    grafik = dashboard_charts(agg)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Jumlah Halte per Wilayah")
+        tampilkan_grafik(('halte_wilayah', agg['fingerprint_sumber']['halte']), grafik['halte_wilayah'])
+    with col2:
+        st.subheader("Top 10 Jumlah Halte Terbanyak per Kecamatan")
+        tampilkan_grafik(('halte_kecamatan', agg['fingerprint_sumber']['halte']), grafik['halte_kecamatan'])
+
+
+def render_penumpang_bus(agg):
+    """
+    Bagian "Penumpang & Bus": rasio penumpang per bus per layanan.
+    """
+    st.header("Analisis Penumpang dan Armada Bus")
+    if sumber_kosong(agg, 'bus_penumpang', "penumpang dan bus"):
+        return
+    grafik = dashboard_charts(agg)
+
+    st.subheader("Rasio Penumpang per Bus (Efisiensi & Kepadatan)")
+    r_col1, r_col2, r_col3 = st.columns([0.2, 1.5, 0.2])
+    with r_col2:
+        tampilkan_grafik(('rasio_penumpang_bus', agg['fingerprint_sumber']['bus_penumpang']), grafik['rasio_penumpang_bus'])
+
+    st.info("**Interpretasi:** Grafik ini menunjukkan efisiensi layanan. Bar yang lebih panjang berarti setiap bus melayani lebih banyak penumpang, menandakan efisiensi tinggi namun juga potensi kepadatan yang tinggi.", icon="💡")
+
+
+def render_jaringan_rute(agg):
+    """
+    Bagian "Jaringan Rute": titik keberangkatan dan tujuan terbanyak.
+    """
+    st.header("Analisis Jaringan dan Rute Utama")
+    if sumber_kosong(agg, 'rute', "rute"):
+        return
+    grafik = dashboard_charts(agg)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Top 10 Titik Keberangkatan")
+        tampilkan_grafik(('top_titik_a', agg['fingerprint_sumber']['rute']), grafik['top_titik_a'])
+    with col2:
+        st.subheader("Top 10 Titik Tujuan")
+        tampilkan_grafik(('top_titik_b', agg['fingerprint_sumber']['rute']), grafik['top_titik_b'])
+
+
+def render_hub(agg, cube):
+    """
+    Bagian "Analisis Hub Halte": irisan lokasi, hub utama, tipologinya, serta
+    lokasi hub hasil pencocokan nama titik rute ke halte.
+    """
+    st.header("Analisis Hub Transit Utama")
+    st.markdown("Hub adalah lokasi yang sering menjadi titik awal sekaligus titik akhir, menandakan perannya sebagai pusat transit.")
+    if sumber_kosong(agg, 'rute', "rute"):
+        return
+    grafik = dashboard_charts(agg)
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.subheader("Irisan Lokasi")
+        tampilkan_grafik(('venn_hub', agg['fingerprint_sumber']['rute']), grafik['venn_hub'])
+    with col2:
+        st.subheader("Top 15 Lokasi Hub")
+        tampilkan_grafik(('top_hub', agg['fingerprint_sumber']['rute']), grafik['top_hub'])
+
+    st.markdown("---")
+    st.subheader("Tipologi Hub Utama")
+    st.markdown("Analisis ini mengklasifikasikan hub berdasarkan fungsinya: sebagai titik awal (Terminal), titik akhir (Tujuan), atau keduanya (Transit).")
+
+    # Padanan titik -> halte dihitung sekali dari seluruh titik rute dan halte;
+    # tabel hub yang terfilter hanya melakukan lookup ke hasilnya
+    with span("padanan halte", 'hitung'):
+        cocok = get_endpoint_matches(cube.fingerprint, cube.rows('rute'), cube.rows('halte'))
+        hub_analysis_df = get_hub_locations(
+            agg['fingerprint_sumber']['rute'], agg['hub_analysis_df'], cocok, cube.rows('rute', agg['filter'])
+        )
+    if not hub_analysis_df.empty:
+        st.dataframe(
+            hub_analysis_df,
+            column_config={
+                'PageRank': st.column_config.NumberColumn(format="%.4f", help="Peluang tiba di lokasi ini bila mengikuti arah rute secara acak."),
+                'Betweenness': st.column_config.NumberColumn(format="%.4f", help="Seberapa sering lokasi ini berada di lintasan terpendek antar lokasi lain."),
+                'Jumlah_Layanan': st.column_config.NumberColumn(help="Jumlah kode rute unik yang berawal atau berakhir di lokasi ini."),
+                'Skor': st.column_config.NumberColumn(format="%.2f", help="Keyakinan padanan nama lokasi dengan nama halte (1 = sama setelah normalisasi)."),
+                'Lintang': st.column_config.NumberColumn(format="%.5f"),
+                'Bujur': st.column_config.NumberColumn(format="%.5f"),
+            }
+        )
+
+        st.subheader("Peta Hub")
+        with span("deck hub", 'render'):
+            deck, jumlah_titik = build_hub_deck(hub_analysis_df)
+        if jumlah_titik:
+            with span("kirim peta hub", 'kirim', objek=jumlah_titik):
+                st.pydeck_chart(deck)
+        st.caption(
+            f"{jumlah_titik} dari {len(hub_analysis_df)} hub berpadanan dengan halte (skor minimal {AMBANG_COCOK:.1f}). "
+            "Ukuran titik sebanding dengan jumlah layanan; warna menunjukkan tipologi."
+        )
+    else:
+        st.warning("Tidak ditemukan data hub yang memenuhi kriteria (minimal 5 koneksi rute).")
+
+    with st.expander("Padanan titik rute ke halte"):
+        st.markdown(f"{int(cocok['Halte'].notna().sum())} dari {len(cocok)} titik rute berpadanan dengan halte.")
+        st.dataframe(cocok, column_config={'Skor': st.column_config.NumberColumn(format="%.2f")})
+
+    st.subheader("Jumlah Transit Antar Lokasi")
+    st.markdown("Jumlah pergantian rute minimum yang dibutuhkan untuk berpindah antar setiap pasangan lokasi dalam jaringan.")
+    st.dataframe(
+        agg['network'].transfer_distribution(),
+        column_config={'Proporsi': st.column_config.NumberColumn(format="percent")}
+    )
+
+
+def render_sebaran_halte(agg, cube, halte_ditolak_df):
+    """
+    Bagian "Sebaran Halte": peta lokasi halte dan celah cakupan layanan.
+    Peta memuat halte yang lolos filter; raster cakupan selalu dihitung dari
+    seluruh halte karena halte di luar filter tetap melayani area di sekitarnya.
+    """
+    st.header("Analisis Sebaran Halte")
+    st.subheader("Peta Sebaran Halte")
+    st.markdown("Peta ini menunjukkan sebaran halte untuk melihat cakupan layanan. Pada tingkat kota dan kecamatan, halte dikelompokkan ke dalam heksagon; warna yang lebih gelap berarti lebih banyak halte.")
+    halte_df = cube.rows('halte')
+    halte_terpilih_df = cube.rows('halte', agg['filter'])
+    if not halte_terpilih_df.empty:
+        with span("lapisan peta", 'hitung'):
+            lapisan = get_map_layers(agg['fingerprint_sumber']['halte'], halte_terpilih_df)
+        tingkat = st.radio("Tingkat detail peta", list(TINGKAT_DETAIL), horizontal=True)
+        with span("deck peta", 'render'):
+            deck, jumlah_objek = build_deck(lapisan, tingkat)
+        with span("kirim peta", 'kirim', objek=jumlah_objek):
+            st.pydeck_chart(deck)
+        st.caption(f"Objek yang dikirim ke peta: {jumlah_objek:,} (dari {lapisan['jumlah_halte']:,} halte).")
+
+        with st.expander("Ringkasan per wilayah dan kecamatan"):
+            kolom_format = {
+                'Proporsi': st.column_config.NumberColumn(format="percent"),
+                'Lintang Pusat': st.column_config.NumberColumn(format="%.4f"),
+                'Bujur Pusat': st.column_config.NumberColumn(format="%.4f"),
+            }
+            st.dataframe(lapisan['wilayah'], column_config=kolom_format)
+            st.dataframe(lapisan['kecamatan'], column_config=kolom_format)
+    elif agg['filter']:
+        st.info("Tidak ada data halte untuk filter yang dipilih.")
+    else:
+        st.warning("Data halte tidak tersedia.")
+
+    if halte_ditolak_df is not None and not halte_ditolak_df.empty:
+        st.caption(f"{len(halte_ditolak_df)} halte tidak ditampilkan karena koordinatnya tidak valid atau di luar wilayah.")
+        with st.expander("Lihat halte yang dikecualikan"):
+            st.dataframe(rejection_summary(halte_ditolak_df))
+            st.dataframe(halte_ditolak_df[['nama_halte', 'wilayah', 'koordinat_x', 'koordinat_y', 'lat', 'lon', 'alasan']])
+
+    if halte_df.empty:
+        return
+
+    st.markdown("---")
+    st.subheader("Celah Cakupan Layanan")
+    st.markdown("Peta ini menunjukkan jarak dari setiap titik di wilayah Jakarta ke halte terdekat. Area berwarna gelap di dalam garis hitam berada di luar jangkauan jalan kaki yang dipilih.")
+    ambang_km = st.slider("Jarak jalan kaki maksimum ke halte (km)", 0.5, 3.0, 1.0, 0.25)
+
+    with span("raster cakupan", 'hitung'):
+        raster = get_coverage(cube.fingerprint, halte_df)['raster']
+    with span("celah cakupan", 'hitung'):
+        celah = coverage_gaps(raster, halte_df, ambang_km)
+
+    m_col1, m_col2, m_col3 = st.columns(3)
+    m_col1.metric("Luas celah layanan", f"{celah['luas_celah_km2']:,.0f} km²")
+    m_col2.metric("Porsi wilayah tidak terlayani", f"{celah['persen_celah']:.1f}%")
+    m_col3.metric("Median jarak ke halte", f"{celah['jarak_median_km']:.2f} km")
+
+    per_kecamatan = celah['per_kecamatan']
+    if agg['filter']:
+        per_kecamatan = per_kecamatan[per_kecamatan.index.isin(halte_terpilih_df['kecamatan'].astype(str))]
+
+    c_col1, c_col2 = st.columns([2, 1])
+    with c_col1:
+        # Titik halte yang digambar mengikuti filter; raster tetap seluruh halte
+        tampilkan_grafik(
+            ('cakupan', agg['fingerprint_sumber']['halte'], raster['resolusi_km'], ambang_km),
+            coverage_chart(raster, halte_terpilih_df, ambang_km)
+        )
+    with c_col2:
+        st.markdown("**Kecamatan dengan celah terluas** (menurut halte terdekat)")
+        st.dataframe(per_kecamatan.head(10).style.format('{:.2f}'))
+    st.caption(f"Sel lebih dari {MAKS_JARAK_WILAYAH_KM:.0f} km dari halte mana pun (mis. laut) tidak dihitung sebagai wilayah layanan.")
+    if agg['filter']:
+        st.caption("Luas dan porsi celah dihitung dari seluruh halte; filter membatasi titik halte yang digambar dan daftar kecamatan.")
+
+
+def render_tren_korelasi(agg, cube):
+    """
+    Bagian "Tren & Korelasi": tren tahunan dan korelasi bus-penumpang.
+    Jenis layanan dan periode dipilih melalui filter silang di sidebar.
+    """
+    st.header("Analisis Tren dan Korelasi")
+    if sumber_kosong(agg, 'bus_penumpang', "penumpang dan bus"):
+        return
+
+    st.subheader("Tren Penumpang dan Armada per Layanan per Tahun")
+    st.caption("Gunakan **Filter silang** di sidebar untuk memilih jenis layanan dan periode.")
+    grafik = dashboard_charts(agg, cube.rows('bus_penumpang', agg['filter']))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("#### Tren Penumpang per Layanan")
+        tampilkan_grafik(('tren_penumpang', agg['fingerprint_sumber']['bus_penumpang']), grafik['tren_penumpang'])
+
+    with col2:
+        st.markdown("#### Tren Armada Bus per Layanan")
+        tampilkan_grafik(('tren_bus', agg['fingerprint_sumber']['bus_penumpang']), grafik['tren_bus'])
+
+    st.markdown("---")
+
+    st.subheader("Korelasi Jumlah Bus dan Penumpang per Layanan")
+    st.markdown("Diagram ini menunjukkan hubungan antara penambahan armada dengan jumlah penumpang untuk semua jenis layanan.")
+
+    corr_col1, corr_col2, corr_col3 = st.columns([0.3, 1, 0.3])
+    with corr_col2:
+        tampilkan_grafik(('korelasi', agg['fingerprint_sumber']['bus_penumpang']), grafik['korelasi'])
+
+    fit = agg['korelasi']['fit']
+    if fit is not None:
+        st.caption(
+            f"Garis regresi: penumpang = {fit['intercept']:,.0f} + {fit['slope']:,.0f} × jumlah bus "
+            f"(R² = {fit['r2']:.2f}, n = {fit['n']}); area berbayang adalah interval kepercayaan {fit['confidence']:.0%}."
+        )
+    st.markdown("#### Koefisien Korelasi per Layanan")
+    st.dataframe(agg['korelasi']['koefisien'].style.format({'Pearson': '{:.2f}', 'Spearman': '{:.2f}'}, na_rep='-'))
+
+
+@st.fragment
+def render_chatbot(google_api_key, konteks_bagian, anggaran_token, data_fingerprint):
+    """
+    Sesi chatbot. Dijalankan sebagai fragment sehingga setiap pesan chat hanya
+    menjalankan ulang bagian ini, tanpa menggambar ulang grafik dashboard.
+    Konteks data disusun per pertanyaan dari bagian yang relevan saja.
+    """
+    if not st.session_state.api_configured:
+        st.warning("Chatbot non-aktif. Mohon konfigurasikan GOOGLE_API_KEY Anda di pengaturan secrets Streamlit.")
+    else:
+        if "chat_history" not in st.session_state:
+            st.session_state.chat_history = [
+                {"role": "AI", "content": "Halo! Saya adalah Analis AI Anda. Silakan ajukan pertanyaan mengenai data Transjakarta ini untuk mendapatkan insight atau rekomendasi. Anda bisa menggunakan contoh di atas sebagai inspirasi."},
+            ]
+
+        for message in st.session_state.chat_history:
+            with st.chat_message(message["role"]):
+                st.write(message["content"])
+
+        if user_query := st.chat_input("Tanyakan sesuatu tentang data ini..."):
+            riwayat = list(st.session_state.chat_history)
+            st.session_state.chat_history.append({"role": "Human", "content": user_query})
+            with st.chat_message("Human"):
+                st.write(user_query)
+
+            with st.chat_message("AI"):
+                profiler = profiler_baru('chat')
+                with profiler if profiler is not None else contextlib.nullcontext():
+                    with span("pilih konteks", 'hitung'):
+                        konteks = select_context(konteks_bagian, user_query, anggaran_token)
+                    with span("klien model", 'muat'):
+                        model = get_chat_model(google_api_key)
+                    # Waktu tulis st.write_stream per potongan ikut terhitung di span "stream model"
+                    response = st.write_stream(
+                        get_response(user_query, riwayat, model, konteks['teks'], data_fingerprint)
+                    )
+                st.session_state.chat_history.append({"role": "AI", "content": response})
+                st.caption(
+                    f"Konteks data: ~{konteks['perkiraan_token']} token; rincian dari "
+                    f"{', '.join(konteks['bagian_rinci']) or 'ringkasan saja'}."
+                )
+                if profiler is not None:
+                    laporkan_profil(profiler, st.expander("Profil pertanyaan ini"), token_konteks=konteks['perkiraan_token'])
+
+
+# --- BAGIAN 4: UTAMA APLIKASI STREAMLIT ---
 
 # Konfigurasi halaman
 st.set_page_config(page_title="Dashboard Analisis Transjakarta", page_icon="💡", layout="wide")
 set_page_style() # Memanggil fungsi style baru
 
-# Inisialisasi Model AI
+# Konfigurasi Model AI (klien baru dibuat saat pertanyaan pertama, lihat get_chat_model)
 try:
     google_api_key = st.secrets["GOOGLE_API_KEY"]
-    chat_model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=google_api_key, temperature=0.7)
     st.session_state.api_configured = True
 except (FileNotFoundError, KeyError):
     st.error("Konfigurasi GOOGLE_API_KEY tidak ditemukan di Streamlit Secrets. Chatbot tidak akan berfungsi.")
-    chat_model = None
+    google_api_key = None
     st.session_state.api_configured = False
 
 # Judul Aplikasi
 st.title("🚌 Dashboard Analisis Interaktif Transjakarta")
 st.markdown("Aplikasi ini memvisualisasikan data operasional Transjakarta. Gunakan tab untuk navigasi dan chatbot untuk diskusi.")
 
-# Memuat Data
-halte_df, bus_penumpang_df, rute_df = load_data()
+# Panel profiling: bila aktif, setiap tahap rerun ini (muat, hitung, render,
+# kirim) diukur dan hasilnya ditampilkan di akhir skrip
+panel_profil = st.sidebar.expander("Profiling (debug)")
+with panel_profil:
+    st.toggle("Aktifkan profiling", key='profiling', help="Mengukur waktu dan memori setiap tahap rerun dan chatbot.")
+    st.checkbox("Lacak puncak memori (tracemalloc)", key='profil_memori', help="Menambah overhead; gunakan hanya untuk diagnosis.")
+    st.checkbox("Simpan ke log JSONL", key='profil_log', help=f"Setiap rerun dan pertanyaan chat ditambahkan ke {LOG_BAWAAN}.")
+profiler = activate(profiler_baru('rerun'))
+
+# Memuat Data: file baru/berubah di direktori data di-parse dan ditambahkan
+# ke penyimpanan terpartisi; file lain tidak dibuka sama sekali
+store = get_store()
+with span("sinkronisasi data", 'muat'):
+    perubahan_data = store.sync()
+for nama_file, galat in perubahan_data['gagal'].items():
+    st.warning(f"File {nama_file} dilewati karena gagal dibaca: {galat}")
+render_sumber_data(store, perubahan_data)
+data_fingerprint = store.fingerprint()
+with span("load_data", 'muat'):
+    # View copy-on-write per rerun: penulisan di sesi ini tidak bocor ke cache bersama
+    halte_df, bus_penumpang_df, rute_df, halte_ditolak_df = (
+        df.copy(deep=False) if df is not None else None for df in load_data(data_fingerprint)
+    )
 
 if halte_df is not None:
-    # Pengaturan Tema dan Ukuran Font untuk Grafik Matplotlib
-    sns.set_style("whitegrid")
-    plt.rcParams['figure.figsize'] = (10, 6)
-    plt.rcParams['font.family'] = 'sans-serif'
-    plt.rcParams['axes.labelsize'] = 14  # Ukuran font label sumbu X dan Y
-    plt.rcParams['xtick.labelsize'] = 12 # Ukuran font tick sumbu X
-    plt.rcParams['ytick.labelsize'] = 12 # Ukuran font tick sumbu Y
-    plt.rcParams['axes.titlesize'] = 18  # Ukuran font judul grafik
-    plt.rcParams['legend.fontsize'] = 14 # Ukuran font legenda
-
-    # Navigasi Menggunakan Tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "Distribusi Halte", "Penumpang & Bus", "Jaringan Rute", "Analisis Hub Halte", "Sebaran Halte", "Tren & Korelasi"
-    ])
-
-    with tab1:
-        st.header("Analisis Distribusi Geografis Halte")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Jumlah Halte per Wilayah")
-            fig1, ax1 = plt.subplots()
-            halte_by_wilayah = halte_df['wilayah'].value_counts().sort_values(ascending=False)
-            sns.barplot(x=halte_by_wilayah.values, y=halte_by_wilayah.index, palette='Blues_r', ax=ax1)
-            ax1.set_xlabel('Jumlah Halte'); ax1.set_ylabel('')
-            sns.despine(left=True, bottom=True); st.pyplot(fig1)
-        with col2:
-            st.subheader("Top 10 Jumlah Halte Terbanyak per Kecamatan")
-            fig2, ax2 = plt.subplots()
-            halte_by_kecamatan = halte_df['kecamatan'].value_counts().nlargest(10)
-            sns.barplot(y=halte_by_kecamatan.index, x=halte_by_kecamatan.values, palette='Greens_r', ax=ax2)
-            ax2.set_xlabel('Jumlah Halte'); ax2.set_ylabel('')
-            sns.despine(left=True, bottom=True); st.pyplot(fig2)
-
-    with tab2:
-        st.header("Analisis Penumpang dan Armada Bus")
-        penumpang_by_layanan = bus_penumpang_df.groupby('jenis_layanan')['jumlah_penumpang'].sum().sort_values(ascending=False)
-        bus_by_layanan = bus_penumpang_df.groupby('jenis_layanan')['jumlah_bus'].sum().sort_values(ascending=False)
-        ratio_df = pd.DataFrame({'Total Penumpang': penumpang_by_layanan, 'Total Bus': bus_by_layanan})
-        ratio_df['Penumpang per Bus'] = ratio_df['Total Penumpang'] / ratio_df['Total Bus']
-        ratio_df = ratio_df.sort_values(by='Penumpang per Bus', ascending=False)
-
-        st.subheader("Rasio Penumpang per Bus (Efisiensi & Kepadatan)")
-        r_col1, r_col2, r_col3 = st.columns([0.2, 1.5, 0.2])
-        with r_col2:
-            fig3, ax3 = plt.subplots(figsize=(10, 6))
-            sns.barplot(x=ratio_df['Penumpang per Bus'], y=ratio_df.index, palette='rocket_r', ax=ax3)
-            ax3.set_xlabel('Rata-rata Penumpang Dilayani per Bus'); ax3.set_ylabel('')
-            sns.despine(); st.pyplot(fig3)
-        
-        st.info("**Interpretasi:** Grafik ini menunjukkan efisiensi layanan. Bar yang lebih panjang berarti setiap bus melayani lebih banyak penumpang, menandakan efisiensi tinggi namun juga potensi kepadatan yang tinggi.", icon="💡")
-
-    with tab3:
-        st.header("Analisis Jaringan dan Rute Utama")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Top 10 Titik Keberangkatan")
-            fig6, ax6 = plt.subplots()
-            top_10_titik_a = rute_df['titik_a'].value_counts().nlargest(10)
-            sns.barplot(y=top_10_titik_a.index, x=top_10_titik_a.values, palette='Purples_r', ax=ax6)
-            ax6.set_xlabel('Jumlah Rute'); ax6.set_ylabel('')
-            sns.despine(); st.pyplot(fig6)
-        with col2:
-            st.subheader("Top 10 Titik Tujuan")
-            fig7, ax7 = plt.subplots()
-            top_10_titik_b = rute_df['titik_b'].value_counts().nlargest(10)
-            sns.barplot(y=top_10_titik_b.index, x=top_10_titik_b.values, palette='Oranges_r', ax=ax7)
-            ax7.set_xlabel('Jumlah Rute'); ax7.set_ylabel('')
-            sns.despine(); st.pyplot(fig7)
-
-    with tab4:
-        st.header("Analisis Hub Transit Utama")
-        st.markdown("Hub adalah lokasi yang sering menjadi titik awal sekaligus titik akhir, menandakan perannya sebagai pusat transit.")
-        
-        set_a = set(rute_df['titik_a'].dropna())
-        set_b = set(rute_df['titik_b'].dropna())
-        
-        col1, col2 = st.columns([1, 2])
-        with col1:
-            st.subheader("Irisan Lokasi")
-            fig9, ax9 = plt.subplots()
-            v = venn2([set_a, set_b], set_labels=('Keberangkatan (A)', 'Tujuan (B)'), ax=ax9)
-            
-            for text in v.subset_labels:
-                if text:
-                    text.set_fontsize(20)
-            for text in v.set_labels:
-                if text:
-                    text.set_fontsize(16)
-                    
-            st.pyplot(fig9)
-        with col2:
-            st.subheader("Top 15 Lokasi Hub")
-            intersection_locations = set_a.intersection(set_b)
-            counts_a = rute_df[rute_df['titik_a'].isin(intersection_locations)]['titik_a'].value_counts()
-            counts_b = rute_df[rute_df['titik_b'].isin(intersection_locations)]['titik_b'].value_counts()
-            total_counts = counts_a.add(counts_b, fill_value=0).sort_values(ascending=False).nlargest(15)
-            fig10, ax10 = plt.subplots(figsize=(10, 8))
-            sns.barplot(y=total_counts.index, x=total_counts.values, palette='viridis', ax=ax10)
-            ax10.set_xlabel('Total Frekuensi sebagai Titik Awal & Akhir'); ax10.set_ylabel('')
-            sns.despine(); st.pyplot(fig10)
-        
-        st.markdown("---")
-        st.subheader("Tipologi Hub Utama")
-        st.markdown("Analisis ini mengklasifikasikan hub berdasarkan fungsinya: sebagai titik awal (Terminal), titik akhir (Tujuan), atau keduanya (Transit).")
-        
-        try:
-            in_degree = rute_df['titik_b'].value_counts()
-            out_degree = rute_df['titik_a'].value_counts()
-            
-            hub_analysis_df = pd.DataFrame({
-                'Rute_Masuk': in_degree,
-                'Rute_Keluar': out_degree
-            }).fillna(0).astype(int)
-
-            hub_analysis_df['Total_Koneksi'] = hub_analysis_df['Rute_Masuk'] + hub_analysis_df['Rute_Keluar']
-            hub_analysis_df = hub_analysis_df[hub_analysis_df['Total_Koneksi'] > 5].copy()
-
-            def get_typology(row):
-                diff = row['Rute_Keluar'] - row['Rute_Masuk']
-                if diff > 2:
-                    return "Dominan Terminal"
-                elif diff < -2:
-                    return "Dominan Tujuan"
-                else:
-                    return "Seimbang (Transit)"
-            
-            if not hub_analysis_df.empty:
-                hub_analysis_df['Tipologi'] = hub_analysis_df.apply(get_typology, axis=1)
-                hub_analysis_df.index.name = 'Hub'
-                hub_analysis_df.reset_index(inplace=True)
-                
-                st.dataframe(
-                    hub_analysis_df[['Hub', 'Rute_Masuk', 'Rute_Keluar', 'Total_Koneksi', 'Tipologi']]
-                    .sort_values(by='Total_Koneksi', ascending=False)
-                )
-            else:
-                st.warning("Tidak ditemukan data hub yang memenuhi kriteria (minimal 5 koneksi rute).")
-        except Exception as e:
-            st.error(f"Terjadi kesalahan saat membuat analisis tipologi hub: {e}")
-
-    with tab5:
-        st.header("Analisis Sebaran Halte")
-        st.subheader("Peta Sebaran Halte")
-        st.markdown("Peta ini menunjukkan lokasi setiap halte untuk melihat cakupan layanan.")
-        if not halte_df.empty:
-            map_data = halte_df[['lat', 'lon']].copy().dropna()
-            if not map_data.empty:
-                st.map(map_data, zoom=10)
-            else:
-                st.warning("Tidak ada data koordinat valid untuk ditampilkan.")
-        else:
-            st.warning("Data halte tidak tersedia.")
-
-    with tab6:
-        st.header("Analisis Tren dan Korelasi")
-
-        # Agregasi data per tahun
-        yearly_df = bus_penumpang_df.groupby(['periode_data', 'jenis_layanan']).agg(
-            jumlah_penumpang=('jumlah_penumpang', 'sum'),
-            jumlah_bus=('jumlah_bus', 'mean') # Mengambil rata-rata bus per tahun
-        ).reset_index()
-
-        st.subheader("Filter Analisis Tren")
-        service_options = ['Tampilkan Semua'] + yearly_df['jenis_layanan'].unique().tolist()
-        selected_service = st.selectbox(
-            "Pilih satu jenis layanan untuk melihat tren:",
-            service_options
+    # Semua agregat tab dihitung sekali per dataset; rerun hanya membaca hasilnya.
+    # Saat file baru masuk, hanya sumber yang berubah yang dihitung ulang.
+    with span("agregat", 'hitung'):
+        agg_dasar = get_store_aggregates(store, bus_penumpang_df, rute_df)
+    # Filter silang dilayani dari kubus agregat; hasilnya berbentuk sama dengan
+    # agregat dataset sehingga setiap bagian, grafik, dan chatbot ikut terfilter
+    with span("kubus filter", 'hitung') as catatan:
+        cube = get_cube(agg_dasar, halte_df, bus_penumpang_df, rute_df)
+        agg = cube.aggregates(render_filter(cube))
+        catatan['filter'] = len(agg['filter'])
+
+    # Navigasi: pada mode ringan hanya bagian yang sedang dibuka yang dihitung
+    # dan digambar; mode tab menjalankan keenam bagian seperti sebelumnya.
+    bagian_dashboard = {
+        "Distribusi Halte": lambda: render_distribusi_halte(agg),
+        "Penumpang & Bus": lambda: render_penumpang_bus(agg),
+        "Jaringan Rute": lambda: render_jaringan_rute(agg),
+        "Analisis Hub Halte": lambda: render_hub(agg, cube),
+        "Sebaran Halte": lambda: render_sebaran_halte(agg, cube, halte_ditolak_df),
+        "Tren & Korelasi": lambda: render_tren_korelasi(agg, cube),
+    }
+    mode_ringan = st.sidebar.toggle(
+        "Render hanya bagian aktif", value=True, key='mode_ringan',
+        help="Jika aktif, hanya bagian yang dipilih yang digambar sehingga setiap interaksi lebih cepat."
+    )
+    with st.sidebar.expander("Statistik cache grafik"):
+        st.json(get_chart_cache().stats())
+    with st.sidebar.expander("Statistik cache respons chatbot"):
+        st.json(get_response_cache().stats())
+
+    if mode_ringan:
+        bagian_aktif = st.radio(
+            "Navigasi", list(bagian_dashboard), horizontal=True,
+            label_visibility="collapsed", key="bagian_aktif"
         )
+        with span(bagian_aktif, 'render', bagian=bagian_aktif):
+            bagian_dashboard[bagian_aktif]()
+    else:
+        for tab, (nama, render) in zip(st.tabs(list(bagian_dashboard)), bagian_dashboard.items()):
+            with tab, span(nama, 'render', bagian=nama):
+                render()
 
-        # Filter data based on selection for trend plots
-        if selected_service == 'Tampilkan Semua':
-            filtered_yearly_df = yearly_df
-        else:
-            filtered_yearly_df = yearly_df[yearly_df['jenis_layanan'] == selected_service]
-
-        st.subheader("Tren Penumpang dan Armada per Layanan per Tahun")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("#### Tren Penumpang per Layanan")
-            fig_pass, ax_pass = plt.subplots(figsize=(10, 8))
-            sns.lineplot(data=filtered_yearly_df, x='periode_data', y='jumlah_penumpang', hue='jenis_layanan', marker='o', ax=ax_pass)
-            ax_pass.set_title("")
-            ax_pass.set_xlabel("Tahun")
-            ax_pass.set_ylabel("Jumlah Penumpang")
-            ax_pass.xaxis.set_major_locator(MaxNLocator(integer=True)) 
-            ax_pass.legend(title='Jenis Layanan', loc='upper right', fontsize='medium')
-            sns.despine()
-            st.pyplot(fig_pass)
-            
-        with col2:
-            st.markdown("#### Tren Armada Bus per Layanan")
-            fig_bus, ax_bus = plt.subplots(figsize=(10, 8))
-            sns.lineplot(data=filtered_yearly_df, x='periode_data', y='jumlah_bus', hue='jenis_layanan', marker='o', ax=ax_bus)
-            ax_bus.set_title("")
-            ax_bus.set_xlabel("Tahun")
-            ax_bus.set_ylabel("Rata-rata Jumlah Bus")
-            ax_bus.xaxis.set_major_locator(MaxNLocator(integer=True))
-            ax_bus.legend(title='Jenis Layanan', loc='upper right', fontsize='medium')
-            sns.despine()
-            st.pyplot(fig_bus)
-
-        st.markdown("---")
-        
-        st.subheader("Korelasi Jumlah Bus dan Penumpang per Layanan")
-        st.markdown("Diagram ini menunjukkan hubungan antara penambahan armada dengan jumlah penumpang untuk semua jenis layanan.")
-        
-        corr_col1, corr_col2, corr_col3 = st.columns([0.3, 1, 0.3])
-        with corr_col2:
-            fig_corr_sns, ax_corr_sns = plt.subplots(figsize=(8, 6))
-            
-            # --- FIX: Prepare data with new column names for legend titles ---
-            corr_plot_df = bus_penumpang_df.copy()
-            corr_plot_df.rename(columns={
-                'jenis_layanan': 'Jenis Layanan',
-                'jumlah_penumpang': 'Jumlah Penumpang'
-            }, inplace=True)
-
-            # Draw the regression line first
-            sns.regplot(
-                data=corr_plot_df,
-                x="jumlah_bus",
-                y="Jumlah Penumpang",
-                ax=ax_corr_sns,
-                scatter=False, 
-                color='darkred',
-                line_kws={'linestyle':'--'}
-            )
-            
-            # Overlay the scatter plot
-            sns.scatterplot(
-                data=corr_plot_df,
-                x="jumlah_bus",
-                y="Jumlah Penumpang",
-                hue="Jenis Layanan",
-                size="Jumlah Penumpang",
-                sizes=(30, 400),
-                ax=ax_corr_sns,
-                palette="viridis"
-            )
-            
-            ax_corr_sns.set_xlabel("Jumlah Bus", fontsize=10)
-            ax_corr_sns.set_ylabel("Jumlah Penumpang", fontsize=10)
-            ax_corr_sns.legend(bbox_to_anchor=(1.05, 1), loc=2, fontsize='medium')
-            
-            ax_corr_sns.grid(which='major', linestyle='-', linewidth='0.7', color='gray')
-            
-            plt.tight_layout()
-            st.pyplot(fig_corr_sns)
-
-
-    # Konteks Data untuk Chatbot
-    data_context = """
-    1. **Distribusi Halte**: Paling banyak di Jakarta Timur, Selatan, Pusat. Paling sedikit di Utara.
-    2. **Efisiensi Layanan**: BRT punya rasio penumpang/bus tertinggi (efisien tapi padat).
-    3. **Jaringan Rute**: Mayoritas rute adalah pengumpan (feeder) dan Mikrotrans.
-    4. **Hub Utama**: Blok M, Pulo Gadung, Tanah Abang, Senen adalah hub utama dengan fungsi yang berbeda-beda (terminal, tujuan, transit).
-    5. **Tren**: Ada sedikit fluktuasi jumlah penumpang dan bus antar tahun, yang bervariasi antar layanan.
-    6. **Korelasi**: Terdapat hubungan positif antara jumlah bus dan penumpang, terutama pada layanan utama.
-    """
     st.markdown("---")
 
     # --- Sesi Chatbot ---
@@ -451,34 +688,22 @@ if halte_df is not None:
         - `Bandingkan tren penumpang antara layanan BRT dan Mikrotrans per tahun.`
         """)
 
-    if not st.session_state.api_configured:
-        st.warning("Chatbot non-aktif. Mohon konfigurasikan GOOGLE_API_KEY Anda di pengaturan secrets Streamlit.")
-    else:
-        if "chat_history" not in st.session_state:
-            st.session_state.chat_history = [
-                AIMessage(content="Halo! Saya adalah Analis AI Anda. Silakan ajukan pertanyaan mengenai data Transjakarta ini untuk mendapatkan insight atau rekomendasi. Anda bisa menggunakan contoh di atas sebagai inspirasi."),
-            ]
-
-        for message in st.session_state.chat_history:
-            if isinstance(message, AIMessage):
-                with st.chat_message("AI"):
-                    st.write(message.content)
-            elif isinstance(message, HumanMessage):
-                with st.chat_message("Human"):
-                    st.write(message.content)
-
-        if user_query := st.chat_input("Tanyakan sesuatu tentang data ini..."):
-            st.session_state.chat_history.append(HumanMessage(content=user_query))
-            with st.chat_message("Human"):
-                st.write(user_query)
-
-            with st.chat_message("AI"):
-                with st.spinner("Analis AI sedang berpikir..."):
-                    response = get_response(user_query, st.session_state.chat_history, chat_model, data_context)
-                    st.write(response)
-                    st.session_state.chat_history.append(AIMessage(content=response))
+    # Ringkasan konteks dibangun sekali per dataset dari agregat yang sama dengan grafik
+    anggaran_token = st.sidebar.number_input(
+        "Anggaran token konteks chatbot", min_value=200, max_value=4000,
+        value=ANGGARAN_TOKEN_KONTEKS, step=100,
+        help="Batas perkiraan ukuran konteks data yang dikirim ke model per pertanyaan."
+    )
+    with span("konteks chatbot", 'hitung', bagian="Chatbot"):
+        konteks_bagian = get_sections(agg)
+    with span("chatbot", 'render', bagian="Chatbot"):
+        render_chatbot(google_api_key, konteks_bagian, anggaran_token, agg['fingerprint'])
 
 st.markdown('<div style="text-align: center; color: black; margin-top: 50px;">Dibuat dengan ❤️ oleh Jati Tepatasa Bagastakwa (dibantu AI)</div>', unsafe_allow_html=True)
 st.markdown("")
 st.markdown("")
-st.markdown("")
\ No newline at end of file
+st.markdown("")
+
+if profiler is not None:
+    # bagian_aktif None berarti mode tab (semua bagian digambar)
+    laporkan_profil(profiler, panel_profil, bagian_aktif=st.session_state.get('bagian_aktif'))
@@ -0,0 +1,75 @@
+"""
+Pipeline chat secara luring dengan model palsu: ukuran prompt terhadap
+panjang percakapan (riwayat repr penuh vs riwayat beranggaran), waktu
+sampai potongan pertama (invoke vs stream), dan waktu jawaban dari cache.
+
+Jalankan dari root repo:
+    python benchmarks/bench_chat.py
+"""
+
+import os
+import sys
+import time
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.chat import ResponseCache, get_prompt, prompt_tokens, stream_response  # noqa: E402
+from transjakarta.context import estimate_tokens  # noqa: E402
+
+GILIRAN = [1, 10, 50, 200]
+KONTEKS = "## Distribusi Halte\n267 halte; terbanyak di Kota Adm. Jakarta Timur (68)." * 10
+JAWABAN = "Berdasarkan data, layanan BRT memiliki rasio penumpang per bus tertinggi. " * 8
+# Jeda per karakter model palsu: jawaban lengkap ~1,2 detik
+JEDA = 2e-3
+
+
+def riwayat_sintetis(giliran):
+    pesan = []
+    for i in range(giliran):
+        pesan.append({'role': 'Human', 'content': f"Pertanyaan ke-{i}: bagaimana tren penumpang BRT dibanding Mikrotrans?"})
+        pesan.append({'role': 'AI', 'content': JAWABAN})
+    return pesan
+
+
+def main():
+    print(f"{'giliran':>8} | {'prompt lama':>12} | {'prompt baru':>12}")
+    for giliran in GILIRAN:
+        riwayat = riwayat_sintetis(giliran)
+        lama = estimate_tokens(get_prompt().format(data_context=KONTEKS, chat_history=riwayat, user_question="Apa saja?"))
+        baru = prompt_tokens("Apa saja?", riwayat, KONTEKS)
+        print(f"{giliran:>8,} | {lama:>8,} tok | {baru:>8,} tok")
+
+    riwayat = riwayat_sintetis(5)
+    model = FakeListChatModel(responses=[JAWABAN], sleep=JEDA)
+
+    # invoke baru kembali setelah seluruh jawaban dibangkitkan
+    model_invoke = FakeListChatModel(responses=[JAWABAN], sleep=JEDA * len(JAWABAN))
+    t0 = time.perf_counter()
+    (get_prompt() | model_invoke).invoke({"data_context": KONTEKS, "chat_history": riwayat, "user_question": "Apa saja?"})
+    t_invoke = time.perf_counter() - t0
+
+    cache = ResponseCache()
+    t0 = time.perf_counter()
+    aliran = stream_response(model, "Apa saja?", riwayat, KONTEKS, cache=cache, kunci_dataset='bench')
+    next(aliran)
+    t_pertama = time.perf_counter() - t0
+    for _ in aliran:
+        pass
+    t_stream = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    "".join(stream_response(model, "apa  saja?", riwayat, KONTEKS, cache=cache, kunci_dataset='bench'))
+    t_cache = time.perf_counter() - t0
+
+    print()
+    print(f"invoke (teks pertama = teks lengkap): {t_invoke * 1000:>8.1f} ms")
+    print(f"stream, potongan pertama:            {t_pertama * 1000:>8.1f} ms")
+    print(f"stream, jawaban lengkap:             {t_stream * 1000:>8.1f} ms")
+    print(f"cache hit:                           {t_cache * 1000:>8.3f} ms")
+    print(f"statistik cache: {cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
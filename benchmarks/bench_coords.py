@@ -0,0 +1,63 @@
+"""
+Perbandingan normalisasi koordinat: versi lama berbasis Series.apply vs
+transjakarta.coords.normalize_coordinates yang tervektorisasi.
+
+Jalankan dari root repo:
+    python benchmarks/bench_coords.py [jumlah_baris]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.coords import normalize_coordinates  # noqa: E402
+
+
+def versi_apply(halte_df):
+    halte_df = halte_df.copy()
+    halte_df['koordinat_x'] = pd.to_numeric(halte_df['koordinat_x'], errors='coerce')
+    halte_df['koordinat_y'] = pd.to_numeric(halte_df['koordinat_y'], errors='coerce')
+    halte_df.dropna(subset=['koordinat_x', 'koordinat_y'], inplace=True)
+    halte_df['lat'] = halte_df['koordinat_x'] / 1000000
+    halte_df['lon'] = halte_df['koordinat_y'].apply(lambda y: y / 100000 if y < 100000000 else y / 1000000)
+    return halte_df[
+        (halte_df['lat'] > -6.5) & (halte_df['lat'] < -6.0) &
+        (halte_df['lon'] > 106.6) & (halte_df['lon'] < 107.0)
+    ].copy()
+
+
+def data_sintetis(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-6.4, -6.1, n)
+    lon = rng.uniform(106.65, 106.95, n)
+    # Campuran skala seperti pada data sumber (7, 9 dan 10 digit untuk bujur)
+    skala_lon = rng.choice([1e5, 1e6, 1e7], n, p=[0.1, 0.85, 0.05])
+    return pd.DataFrame({
+        'nama_halte': 'Halte',
+        'koordinat_x': (lat * 1e6).astype('int64'),
+        'koordinat_y': (lon * skala_lon).astype('int64'),
+    })
+
+
+def main(n=1_000_000):
+    df = data_sintetis(n)
+    t0 = time.perf_counter()
+    lama = versi_apply(df)
+    t_apply = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    baru, ditolak = normalize_coordinates(df)
+    t_vektor = time.perf_counter() - t0
+
+    print(f"baris                : {n:,}")
+    print(f"apply (lama)         : {t_apply * 1000:8.1f} ms  ({len(lama):,} baris valid)")
+    print(f"tervektorisasi (baru): {t_vektor * 1000:8.1f} ms  ({len(baru):,} valid, {len(ditolak):,} ditolak)")
+    print(f"percepatan           : {t_apply / t_vektor:8.1f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
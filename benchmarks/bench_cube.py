@@ -0,0 +1,109 @@
+"""
+Waktu melayani filter silang: menyaring baris lalu menghitung ulang seluruh
+agregat (cara naif) vs kubus transjakarta.cube (dingin = kombinasi filter
+pertama kali, hangat = kombinasi yang sudah pernah diminta).
+
+Filter dikelompokkan menurut sumber yang terpengaruh: filter halte
+(wilayah/kecamatan) dan layanan bus cukup menjumlahkan sel kubus, sedangkan
+filter kategori/periode rute juga membangun ulang graf hub dari baris yang
+tersaring.
+
+Jalankan dari root repo:
+    python benchmarks/bench_cube.py
+    python benchmarks/bench_cube.py --skala 1 10 100 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta import synthetic  # noqa: E402
+from transjakarta.analytics import build_aggregates  # noqa: E402
+from transjakarta.coords import normalize_coordinates  # noqa: E402
+from transjakarta.cube import Cube, DIMENSI_SUMBER  # noqa: E402
+from transjakarta.store import load_directory  # noqa: E402
+
+SKALA = [1, 10, 100]
+JUMLAH_FILTER = 20
+
+# Kelompok filter -> dimensi yang diacak
+KELOMPOK = {
+    'halte': ('wilayah', 'kecamatan'),
+    'bus': ('jenis_layanan',),
+    'rute+periode': ('kategori', 'periode_data'),
+}
+
+
+def filter_acak(cube, dims, rng):
+    filter_ = {}
+    for d in dims:
+        pilihan = cube.options(d, filter_)
+        if pilihan:
+            filter_[d] = list(rng.choice(pilihan, size=min(len(pilihan), rng.integers(1, 4)), replace=False))
+    return filter_
+
+
+def naif(filter_, frames):
+    tersaring = {}
+    for nama, df in frames.items():
+        mask = np.ones(len(df), dtype=bool)
+        for d in DIMENSI_SUMBER[nama]:
+            if d in filter_:
+                mask &= df[d].astype(str).isin(filter_[d]).to_numpy()
+        tersaring[nama] = df[mask]
+    return build_aggregates(tersaring['halte'], tersaring['bus_penumpang'], tersaring['rute'])
+
+
+def ms(detik):
+    return f"{detik * 1000:>9.1f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--skala', type=float, nargs='+', default=SKALA)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    templat = load_directory()
+    print(f"{'skala':>6} | {'baris':>9} | {'filter':<12} | {'naif':>12} | {'kubus dingin':>12} | {'kubus hangat':>12}")
+    for skala in args.skala:
+        mentah = synthetic.generate(skala, templat=templat)
+        frames = {
+            'halte': normalize_coordinates(mentah['halte'])[0],
+            'bus_penumpang': mentah['bus_penumpang'],
+            'rute': mentah['rute'],
+        }
+        baris = sum(len(df) for df in frames.values())
+        agg = build_aggregates(frames['halte'], frames['bus_penumpang'], frames['rute'])
+        agg['fingerprint'] = f"bench-{skala:g}"
+
+        t0 = time.perf_counter()
+        cube = Cube(agg, frames['halte'], frames['bus_penumpang'], frames['rute'], max_entries=4 * JUMLAH_FILTER)
+        print(f"{skala:>6g} | {baris:>9,} | {'bangun':<12} | {'':>12} | {ms(time.perf_counter() - t0)} |")
+
+        rng = np.random.default_rng(0)
+        for kelompok, dims in KELOMPOK.items():
+            daftar = [filter_acak(cube, dims, rng) for _ in range(JUMLAH_FILTER)]
+            waktu = {'naif': 0.0, 'dingin': 0.0, 'hangat': 0.0}
+            for filter_ in daftar:
+                t0 = time.perf_counter()
+                naif(filter_, frames)
+                waktu['naif'] += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                cube.aggregates(filter_)
+                waktu['dingin'] += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                cube.aggregates(filter_)
+                waktu['hangat'] += time.perf_counter() - t0
+            rata = {k: v / len(daftar) for k, v in waktu.items()}
+            print(f"{'':>6} | {'':>9} | {kelompok:<12} | {ms(rata['naif'])} | {ms(rata['dingin'])} | {ms(rata['hangat'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Biaya impor saat cold start aplikasi, diukur dengan `python -X importtime`.
+
+Dua skenario, masing-masing pada proses Python baru:
+- header: hanya blok impor di awal skrip aplikasi (yang harus selesai
+  sebelum judul halaman tampil);
+- bare: seluruh skrip dijalankan dalam mode bare Streamlit (bagian bawaan
+  "Distribusi Halte" digambar, chatbot tidak dipakai).
+
+Untuk tiap skenario dicetak total waktu impor, paket termahal, dan paket
+berat yang ikut termuat.
+
+Jalankan dari root repo:
+    python benchmarks/bench_import.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "Analisis Data Transjakarta.py")
+
+PAKET_BERAT = [
+    'langchain_google_genai', 'langchain_core', 'langchain', 'plotly',
+    'matplotlib', 'seaborn', 'matplotlib_venn', 'pydeck',
+]
+POLA = re.compile(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)')
+
+
+def blok_impor():
+    baris = []
+    with open(APP, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('# --- BAGIAN 1'):
+                break
+            baris.append(line)
+    return ''.join(baris)
+
+
+def ukur(argv):
+    t0 = time.perf_counter()
+    hasil = subprocess.run(
+        [sys.executable, '-X', 'importtime', *argv],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - t0
+
+    per_paket = defaultdict(int)
+    termuat = set()
+    for line in hasil.stderr.splitlines():
+        m = POLA.match(line)
+        if not m:
+            continue
+        kumulatif, indent, modul = int(m.group(1)), len(m.group(2)), m.group(3)
+        termuat.add(modul.split('.')[0])
+        # Indentasi 1 = diimpor langsung oleh skrip (tingkat teratas)
+        if indent == 1:
+            per_paket[modul.split('.')[0]] += kumulatif
+    return wall, per_paket, termuat
+
+
+def main():
+    skenario = {
+        'header': ['-c', blok_impor()],
+        'bare': [APP],
+    }
+    for nama, argv in skenario.items():
+        ukur(argv)  # pemanasan cache bytecode/disk
+        wall, per_paket, termuat = ukur(argv)
+        total = sum(per_paket.values()) / 1000
+        print(f"[{nama}] proses {wall * 1000:,.0f} ms, total impor {total:,.0f} ms")
+        for paket, us in sorted(per_paket.items(), key=lambda kv: -kv[1])[:8]:
+            print(f"    {us / 1000:>8.1f} ms  {paket}")
+        print("    paket berat termuat: " + (", ".join(p for p in PAKET_BERAT if p in termuat) or "-"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Perbandingan waktu: pd.read_excel langsung vs penyimpanan terpartisi transjakarta.store.
+
+Jalankan dari root repo:
+    python benchmarks/bench_ingest.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.ingest import SUMBER_DATA  # noqa: E402
+from transjakarta.store import PartitionedStore, load_directory  # noqa: E402
+
+
+def _waktu(fn, ulang):
+    hasil = []
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        fn()
+        hasil.append(time.perf_counter() - t0)
+    return min(hasil)
+
+
+def main(ulang=5):
+    def excel():
+        for spec in SUMBER_DATA.values():
+            pd.read_excel(spec['path'], sheet_name=spec['sheet_name'])
+
+    with tempfile.TemporaryDirectory() as root:
+        t_dingin = _waktu(lambda: load_directory('.', root=root), 1)
+        # Store baru setiap ulangan agar manifest ikut dibaca seperti proses baru
+        t_hangat = _waktu(lambda: load_directory('.', root=root), ulang)
+        store = PartitionedStore('.', root=root)
+        t_muat = _waktu(store.load, ulang)
+    t_excel = _waktu(excel, ulang)
+
+    print(f"read_excel (openpyxl)         : {t_excel * 1000:8.1f} ms")
+    print(f"store dingin (parse + tulis)  : {t_dingin * 1000:8.1f} ms")
+    print(f"store hangat (sync + muat)    : {t_hangat * 1000:8.1f} ms")
+    print(f"store.load() (memory-map)     : {t_muat * 1000:8.1f} ms")
+    print(f"percepatan                    : {t_excel / t_hangat:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Ukuran payload peta terhadap jumlah halte: st.map (semua titik) dibanding
+agregasi heksagon per tingkat detail transjakarta.maps.
+
+Jalankan dari root repo:
+    python benchmarks/bench_map.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.maps import TINGKAT_DETAIL, build_deck, build_map_layers  # noqa: E402
+
+UKURAN = [300, 3_000, 30_000, 300_000]
+
+
+def data_sintetis(n, seed=0):
+    rng = np.random.default_rng(seed)
+    # Halte mengumpul di sekitar beberapa pusat kota, bukan seragam
+    pusat = rng.uniform([-6.35, 106.70], [-6.10, 106.95], size=(12, 2))
+    pilih = rng.integers(0, len(pusat), n)
+    lat_lon = pusat[pilih] + rng.normal(0, 0.03, size=(n, 2))
+    return pd.DataFrame({
+        'nama_halte': [f"Halte {i}" for i in range(n)],
+        'wilayah': pd.Categorical(np.char.add('Wilayah ', (pilih % 5).astype(str))),
+        'kecamatan': pd.Categorical(np.char.add('Kecamatan ', pilih.astype(str))),
+        'lat': lat_lon[:, 0],
+        'lon': lat_lon[:, 1],
+    })
+
+
+def ukuran_json(data):
+    return len(json.dumps(data.to_dict(orient='records'), separators=(',', ':')))
+
+
+def main():
+    kolom = ' | '.join(f"{nama.split()[0]:>18}" for nama in TINGKAT_DETAIL)
+    print(f"{'halte':>8} | {'st.map':>10} | {kolom} | {'agregasi':>9}")
+    for n in UKURAN:
+        halte_df = data_sintetis(n)
+        t0 = time.perf_counter()
+        lapisan = build_map_layers(halte_df)
+        t_agregasi = time.perf_counter() - t0
+
+        sel = []
+        for tingkat in TINGKAT_DETAIL:
+            deck, jumlah = build_deck(lapisan, tingkat)
+            data = deck.layers[0].data
+            sel.append(f"{jumlah:>7,} / {ukuran_json(pd.DataFrame(data)) / 1024:>5.0f} KB")
+        st_map = ukuran_json(halte_df[['lat', 'lon']]) / 1024
+        print(f"{n:>8,} | {st_map:>7.0f} KB | {' | '.join(f'{s:>18}' for s in sel)} | {t_agregasi * 1000:>6.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Pencocokan titik rute ke halte: indeks trigram transjakarta.matching vs
+perbandingan berpasangan difflib (setiap titik x setiap nama halte).
+
+Titik rute selalu titik nyata dari data contoh; jumlah halte diperbesar
+dengan transjakarta.synthetic. Cara berpasangan diukur pada sampel titik
+lalu diekstrapolasi ke seluruh titik karena biayanya tumbuh linear.
+
+Jalankan dari root repo:
+    python benchmarks/bench_matching.py
+    python benchmarks/bench_matching.py --skala 1 10 100 1000
+"""
+
+import argparse
+import difflib
+import os
+import sys
+import time
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta import synthetic  # noqa: E402
+from transjakarta.coords import normalize_coordinates  # noqa: E402
+from transjakarta.matching import NameIndex, normalize_name, resolve_endpoints  # noqa: E402
+from transjakarta.store import load_directory  # noqa: E402
+
+SKALA = [1, 10, 100]
+SAMPEL_BERPASANGAN = 20
+
+
+def berpasangan(titik, kunci):
+    """
+    Kunci halte dengan rasio difflib tertinggi untuk setiap titik.
+    """
+    hasil = []
+    for nama in titik:
+        q = normalize_name(nama)
+        hasil.append(max(kunci, key=lambda k: difflib.SequenceMatcher(None, q, k).ratio()))
+    return hasil
+
+
+def ms(detik):
+    return f"{detik * 1000:>10.1f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--skala', type=float, nargs='+', default=SKALA)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    templat = load_directory()
+    titik = pd.unique(pd.concat([templat['rute']['titik_a'], templat['rute']['titik_b']]).dropna().astype(str))
+
+    # Kesesuaian pada data contoh: padanan indeks yang lolos ambang vs pilihan terbaik difflib
+    halte_df = normalize_coordinates(templat['halte'])[0]
+    cocok = resolve_endpoints(titik, halte_df)
+    index = NameIndex(halte_df['nama_halte'])
+    lolos = cocok['Halte'].notna().to_numpy()
+    terbaik = berpasangan(titik[lolos], list(index.kunci))
+    sama = sum(normalize_name(h) == k for h, k in zip(cocok['Halte'][lolos], terbaik))
+    print(f"Data contoh: {lolos.sum()} dari {len(titik)} titik berpadanan; {sama} sama dengan pilihan difflib.\n")
+
+    print(f"{'skala':>6} | {'halte':>9} | {'titik':>6} | {'bangun indeks':>13} | {'kueri indeks':>13} | {'berpasangan*':>13}")
+    for skala in args.skala:
+        halte_df = normalize_coordinates(synthetic.generate(skala, templat=templat)['halte'])[0]
+
+        t0 = time.perf_counter()
+        index = NameIndex(halte_df['nama_halte'])
+        t_bangun = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for nama in titik:
+            index.query(nama)
+        t_kueri = time.perf_counter() - t0
+
+        sampel = titik[:SAMPEL_BERPASANGAN]
+        t0 = time.perf_counter()
+        berpasangan(sampel, list(index.kunci))
+        t_pasang = (time.perf_counter() - t0) * len(titik) / len(sampel)
+
+        print(f"{skala:>6g} | {len(halte_df):>9,} | {len(titik):>6} | {ms(t_bangun)} | {ms(t_kueri)} | {ms(t_pasang)}")
+    print(f"\n* diekstrapolasi dari {SAMPEL_BERPASANGAN} titik.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Skala mesin graf jaringan rute (transjakarta.network) dibanding tipologi hub
+versi lama (value_counts + DataFrame.apply per baris).
+
+Jalankan dari root repo:
+    python benchmarks/bench_network.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.network import RouteNetwork  # noqa: E402
+
+UKURAN = [(500, 250), (5_000, 2_000), (30_000, 8_000)]
+
+
+def data_sintetis(n_rute, n_lokasi, seed=0):
+    rng = np.random.default_rng(seed)
+    lokasi = np.array([f"Lokasi {i}" for i in range(n_lokasi)])
+    # Popularitas lokasi mengikuti sebaran Zipf: sedikit hub besar, banyak lokasi kecil
+    p = 1 / np.arange(1, n_lokasi + 1) ** 0.6
+    p /= p.sum()
+    return pd.DataFrame({
+        'titik_a': rng.choice(lokasi, n_rute, p=p),
+        'titik_b': rng.choice(lokasi, n_rute, p=p),
+    })
+
+
+def versi_apply(rute_df):
+    in_degree = rute_df['titik_b'].value_counts()
+    out_degree = rute_df['titik_a'].value_counts()
+    hub_df = pd.DataFrame({'Rute_Masuk': in_degree, 'Rute_Keluar': out_degree}).fillna(0).astype(int)
+    hub_df['Total_Koneksi'] = hub_df['Rute_Masuk'] + hub_df['Rute_Keluar']
+    hub_df = hub_df[hub_df['Total_Koneksi'] > 5].copy()
+
+    def get_typology(row):
+        diff = row['Rute_Keluar'] - row['Rute_Masuk']
+        if diff > 2:
+            return "Dominan Terminal"
+        elif diff < -2:
+            return "Dominan Tujuan"
+        return "Seimbang (Transit)"
+
+    hub_df['Tipologi'] = hub_df.apply(get_typology, axis=1)
+    return hub_df
+
+
+def waktu(fn):
+    t0 = time.perf_counter()
+    hasil = fn()
+    return hasil, time.perf_counter() - t0
+
+
+def main():
+    print(f"{'rute':>7} {'lokasi':>7} | {'apply':>9} | {'graf+tipologi':>13} | {'pagerank':>9} | {'betweenness':>11} | {'transit':>9}")
+    for n_rute, n_lokasi in UKURAN:
+        rute_df = data_sintetis(n_rute, n_lokasi)
+        _, t_apply = waktu(lambda: versi_apply(rute_df))
+
+        def tipologi():
+            net = RouteNetwork(rute_df)
+            net.typology()
+            return net
+
+        net, t_graf = waktu(tipologi)
+        _, t_pr = waktu(net.pagerank)
+        _, t_bc = waktu(net.betweenness)
+        _, t_tr = waktu(net.transfer_distribution)
+        print(
+            f"{n_rute:>7,} {net.n:>7,} | {t_apply * 1000:>6.1f} ms | {t_graf * 1000:>10.1f} ms | "
+            f"{t_pr * 1000:>6.1f} ms | {t_bc * 1000:>8.1f} ms | {t_tr * 1000:>6.1f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Waktu render grafik korelasi terhadap jumlah baris: sns.regplot (pita
+kepercayaan bootstrap) vs regresi bentuk tertutup transjakarta.regression.
+
+Jalankan dari root repo:
+    python benchmarks/bench_regression.py
+"""
+
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.regression import analyze  # noqa: E402
+
+UKURAN = [50, 500, 5_000, 50_000]
+
+
+def data_sintetis(n, seed=0):
+    rng = np.random.default_rng(seed)
+    layanan = rng.choice(['BRT', 'Mikrotrans', 'Angkutan Pengumpan', 'Royaltrans'], n)
+    bus = rng.integers(10, 3000, n)
+    return pd.DataFrame({
+        'jenis_layanan': layanan,
+        'jumlah_bus': bus,
+        'jumlah_penumpang': bus * 15_000 + rng.normal(0, 5e6, n),
+    })
+
+
+def garis_regplot(df):
+    fig = Figure()
+    ax = fig.subplots()
+    sns.regplot(data=df, x='jumlah_bus', y='jumlah_penumpang', ax=ax, scatter=False)
+    fig.clear()
+
+
+def garis_analitik(df):
+    fig = Figure()
+    ax = fig.subplots()
+    hasil = analyze(df)
+    fit = hasil['fit']
+    ax.fill_between(fit['x_grid'], fit['ci_low'], fit['ci_high'], alpha=0.15)
+    ax.plot(fit['x_grid'], fit['y_hat'])
+    fig.clear()
+
+
+def waktu(fn, df):
+    t0 = time.perf_counter()
+    fn(df)
+    return time.perf_counter() - t0
+
+
+def main():
+    warnings.simplefilter('ignore')
+    print(f"{'baris':>8} | {'regplot (bootstrap)':>20} | {'analitik + koefisien':>20}")
+    for n in UKURAN:
+        df = data_sintetis(n)
+        t_boot = waktu(garis_regplot, df)
+        t_fit = waktu(garis_analitik, df)
+        print(f"{n:>8,} | {t_boot * 1000:>17.1f} ms | {t_fit * 1000:>17.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Mengukur waktu rerun dashboard dengan streamlit.testing.v1.AppTest untuk
+mode tab (semua bagian digambar) dan mode ringan (hanya bagian aktif).
+
+Jalankan dari root repo:
+    python benchmarks/bench_rerun.py [jumlah_rerun]
+"""
+
+import os
+import statistics
+import sys
+import time
+import warnings
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'Analisis Data Transjakarta.py')
+
+
+def ukur(mode_ringan, ulang, bagian=None):
+    os.chdir(ROOT)
+    at = AppTest.from_file(APP, default_timeout=300)
+    at.run()
+    at.toggle(key='mode_ringan').set_value(mode_ringan).run()
+    if bagian is not None and mode_ringan:
+        at.radio(key='bagian_aktif').set_value(bagian).run()
+    waktu = []
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        at.run()
+        waktu.append(time.perf_counter() - t0)
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return statistics.median(waktu)
+
+
+def main(ulang=5):
+    warnings.simplefilter('ignore')
+    t_tab = ukur(False, ulang)
+    print(f"mode tab (6 bagian)            : {t_tab * 1000:8.1f} ms / rerun")
+    for bagian in ["Distribusi Halte", "Analisis Hub Halte", "Tren & Korelasi"]:
+        t = ukur(True, ulang, bagian)
+        print(f"mode ringan ({bagian:<18}): {t * 1000:8.1f} ms / rerun")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,146 @@
+"""
+Uji beban sesi bersamaan dengan streamlit.testing.v1.AppTest.
+
+Setiap sesi adalah satu AppTest yang menjalankan skenario pengguna
+(membuka aplikasi, berpindah ke setiap bagian, memasang lalu menghapus
+filter). N sesi hidup bersamaan di satu proses seperti pada deployment
+bersama, sehingga cache_resource dan memo modul dipakai bersama.
+
+AppTest mengganti instance Runtime global selama satu rerun, sehingga dua
+rerun AppTest tidak bisa berjalan tumpang tindih. Sesi karena itu
+dijalankan bergiliran per langkah: pada setiap langkah semua N sesi
+berinteraksi "bersamaan" dan dilayani satu per satu, seperti server satu
+proses yang dibatasi GIL. Yang dilaporkan per jumlah sesi:
+
+- memori per sesi: kenaikan RSS proses (dan, dengan --tracemalloc, alokasi
+  Python) setelah semua sesi selesai dan masih hidup, dibagi N; cache
+  bersama sudah diisi oleh sesi pemanasan sebelum pengukuran dimulai;
+- latensi rerun: persentil p50/p90/p99 waktu layanan satu rerun, serta p90
+  latensi antre (waktu sejak awal langkah sampai rerun sesi itu selesai).
+
+Jalankan dari root repo (data lebih besar dibangkitkan dengan
+`python -m transjakarta.synthetic --skala 100`):
+    python benchmarks/bench_sessions.py
+    python benchmarks/bench_sessions.py --sesi 1 4 16 --tracemalloc
+    python benchmarks/bench_sessions.py --data-dir data_sintetis/x100
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, 'Analisis Data Transjakarta.py')
+
+sys.path.insert(0, ROOT)
+
+from transjakarta.profiling import _rss_mb  # noqa: E402
+
+SESI = [1, 4, 8]
+
+BAGIAN = [
+    "Distribusi Halte", "Penumpang & Bus", "Jaringan Rute",
+    "Analisis Hub Halte", "Sebaran Halte", "Tren & Korelasi",
+]
+
+
+def skenario(at):
+    """
+    Langkah-langkah satu sesi pengguna (generator). Setiap nilai yang
+    dihasilkan adalah objek yang `.run()`-nya menjalankan satu rerun.
+    """
+    yield at
+    for bagian in BAGIAN:
+        yield at.radio(key='bagian_aktif').set_value(bagian)
+    wilayah = at.multiselect(key='filter_wilayah').options
+    if wilayah:
+        yield at.multiselect(key='filter_wilayah').set_value(wilayah[:1])
+        yield at.multiselect(key='filter_wilayah').set_value([])
+
+
+def jalankan(at, langkah):
+    t0 = time.perf_counter()
+    langkah.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - t0
+
+
+def ukur_sesi(n, app, batas_waktu, lacak_memori):
+    gc.collect()
+    rss0 = _rss_mb()
+    py0 = tracemalloc.get_traced_memory()[0] if lacak_memori else 0
+
+    sesi = [AppTest.from_file(app, default_timeout=batas_waktu) for _ in range(n)]
+    aktif = [(at, skenario(at)) for at in sesi]
+    layanan, antre = [], []
+    t0 = time.perf_counter()
+    while aktif:
+        mulai, berikut = time.perf_counter(), []
+        for at, langkah in aktif:
+            try:
+                layanan.append(jalankan(at, next(langkah)))
+            except StopIteration:
+                continue
+            antre.append(time.perf_counter() - mulai)
+            berikut.append((at, langkah))
+        aktif = berikut
+    total = time.perf_counter() - t0
+
+    # Sesi masih dirujuk oleh `sesi` sehingga state-nya ikut terukur
+    gc.collect()
+    rss1 = _rss_mb()
+    py1 = tracemalloc.get_traced_memory()[0] if lacak_memori else 0
+    layanan = np.asarray(layanan) * 1000
+    antre = np.asarray(antre) * 1000
+    return {
+        'rss_mb': (rss1 - rss0) / n if rss0 is not None and rss1 is not None else float('nan'),
+        'python_mb': (py1 - py0) / n / 2**20 if lacak_memori else float('nan'),
+        'rerun': len(layanan),
+        'p50': np.percentile(layanan, 50),
+        'p90': np.percentile(layanan, 90),
+        'p99': np.percentile(layanan, 99),
+        'antre_p90': np.percentile(antre, 90),
+        'total': total,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sesi', type=int, nargs='+', default=SESI, help="Jumlah sesi bersamaan yang diuji.")
+    parser.add_argument('--app', default=APP, help="Berkas aplikasi Streamlit yang diuji.")
+    parser.add_argument('--data-dir', default=ROOT, help="Direktori data sumber; aplikasi dijalankan dari sini.")
+    parser.add_argument('--timeout', type=float, default=600, help="Batas waktu satu rerun (detik).")
+    parser.add_argument('--tracemalloc', action='store_true', help="Ukur juga alokasi Python per sesi (lebih lambat).")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    app = os.path.abspath(args.app)
+    os.chdir(args.data_dir)
+    if args.tracemalloc:
+        tracemalloc.start()
+
+    # Pemanasan: mengisi cache bersama (data, agregat, grafik) agar yang
+    # terukur hanya biaya yang benar-benar per sesi
+    t0 = time.perf_counter()
+    ukur_sesi(1, app, args.timeout, False)
+    print(f"Pemanasan (sesi pertama, cache kosong): {time.perf_counter() - t0:.1f} s\n")
+
+    print(f"{'sesi':>5} | {'RSS/sesi':>9} | {'Python/sesi':>11} | {'rerun':>5} | "
+          f"{'p50':>8} | {'p90':>8} | {'p99':>8} | {'antre p90':>9} | {'total':>7}")
+    for n in args.sesi:
+        h = ukur_sesi(n, app, args.timeout, args.tracemalloc)
+        print(f"{n:>5} | {h['rss_mb']:>6.1f} MB | {h['python_mb']:>8.2f} MB | {h['rerun']:>5} | "
+              f"{h['p50']:>5.0f} ms | {h['p90']:>5.0f} ms | {h['p99']:>5.0f} ms | {h['antre_p90']:>6.0f} ms | "
+              f"{h['total']:>5.1f} s")
+
+
+if __name__ == '__main__':
+    main()
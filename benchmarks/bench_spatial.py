@@ -0,0 +1,65 @@
+"""
+Indeks grid transjakarta.spatial dibanding jarak berpasangan brute force
+(matriks kueri x halte) untuk tetangga terdekat dan raster cakupan.
+
+Jalankan dari root repo:
+    python benchmarks/bench_spatial.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.coords import JAKARTA_BBOX  # noqa: E402
+from transjakarta.spatial import GridIndex, coverage_raster  # noqa: E402
+
+UKURAN = [300, 3_000, 30_000]
+JUMLAH_KUERI = 20_000
+BLOK_BRUTE = 2_000
+
+
+def data_sintetis(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(JAKARTA_BBOX['lat_min'], JAKARTA_BBOX['lat_max'], n)
+    lon = rng.uniform(JAKARTA_BBOX['lon_min'], JAKARTA_BBOX['lon_max'], n)
+    return lat, lon
+
+
+def brute_force(index, lat, lon, halte_lat, halte_lon):
+    qx, qy = index.project(lat, lon)
+    hx, hy = index.project(halte_lat, halte_lon)
+    jarak = np.empty(len(qx))
+    for mulai in range(0, len(qx), BLOK_BRUTE):
+        bx, by = qx[mulai:mulai + BLOK_BRUTE], qy[mulai:mulai + BLOK_BRUTE]
+        d = np.hypot(bx[:, None] - hx[None, :], by[:, None] - hy[None, :])
+        jarak[mulai:mulai + BLOK_BRUTE] = d.min(axis=1)
+    return jarak
+
+
+def waktu(fn):
+    t0 = time.perf_counter()
+    hasil = fn()
+    return hasil, time.perf_counter() - t0
+
+
+def main():
+    q_lat, q_lon = data_sintetis(JUMLAH_KUERI, seed=1)
+    print(f"{'halte':>7} | {'bangun indeks':>13} | {'grid':>9} | {'brute force':>11} | {'raster 250 m':>12} | sama")
+    for n in UKURAN:
+        lat, lon = data_sintetis(n)
+        index, t_bangun = waktu(lambda: GridIndex(lat, lon))
+        (jarak, _), t_grid = waktu(lambda: index.nearest(q_lat, q_lon))
+        acuan, t_brute = waktu(lambda: brute_force(index, q_lat, q_lon, lat, lon))
+        _, t_raster = waktu(lambda: coverage_raster(index, resolusi_km=0.25))
+        print(
+            f"{n:>7,} | {t_bangun * 1000:>10.1f} ms | {t_grid * 1000:>6.1f} ms | "
+            f"{t_brute * 1000:>8.1f} ms | {t_raster * 1000:>9.1f} ms | {np.allclose(jarak, acuan)}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Suite benchmark pipeline dashboard pada data sintetis berbagai skala.
+
+Untuk setiap skala (kelipatan ukuran data sampel) data dibangkitkan dengan
+transjakarta.synthetic, ditulis ke workbook Excel, lalu setiap tahap
+pipeline diukur: ingest (dingin/hangat), normalisasi koordinat, komputasi
+tiap tab, cakupan spasial, peta, konteks chatbot, dan render setiap grafik.
+Waktu = minimum dari beberapa ulangan; memori puncak = puncak tracemalloc
+pada satu jalan terpisah (agar pelacakan tidak memengaruhi waktu).
+
+Hasil ditulis sebagai JSON ke benchmarks/hasil/ (atau --output). Dengan
+--pembanding, hasil dibandingkan dengan JSON sebelumnya dan tahap yang
+melambat/membengkak melebihi ambang dilaporkan (kode keluar 1), sehingga
+regresi terlihat setiap kali kode berubah.
+
+Jalankan dari root repo:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --skala 1 10 100 1000 --ulang 5
+    python benchmarks/bench_suite.py --pembanding benchmarks/hasil/suite-<sebelumnya>.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from transjakarta import analytics, synthetic  # noqa: E402
+from transjakarta.charts import coverage_chart, dashboard_charts, render_figure  # noqa: E402
+from transjakarta.context import build_sections  # noqa: E402
+from transjakarta.coords import normalize_coordinates  # noqa: E402
+from transjakarta.maps import build_map_layers  # noqa: E402
+from transjakarta.spatial import GridIndex, coverage_gaps, coverage_raster  # noqa: E402
+from transjakarta.store import load_directory  # noqa: E402
+
+SKALA = [1, 10, 100]
+DIR_HASIL = os.path.join(ROOT, 'benchmarks', 'hasil')
+
+# Tahap dianggap regresi bila lebih lambat/boros dari pembanding melebihi
+# AMBANG_REGRESI dan selisih absolutnya di atas batas derau
+AMBANG_REGRESI = 0.25
+DERAU_DETIK = 0.005
+DERAU_MB = 1.0
+
+
+def ukur(fn, ulang):
+    """
+    (detik minimum dari `ulang` jalan, memori puncak tracemalloc dalam MB).
+    """
+    waktu = []
+    for _ in range(ulang):
+        t0 = time.perf_counter()
+        fn()
+        waktu.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, puncak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(waktu), puncak / 2**20
+
+
+def tahap_skala(skala, ulang, dir_kerja, templat):
+    """
+    Semua tahap untuk satu skala: dict nama -> callable, diurutkan seperti pipeline.
+    Callable yang menghasilkan data untuk tahap berikutnya menyimpannya di `data`.
+    """
+    data = {}
+    dir_data = os.path.join(dir_kerja, f"x{skala:g}")
+
+    def bangkitkan():
+        data['mentah'] = synthetic.generate(skala, templat=templat)
+
+    def tulis_excel():
+        synthetic.write_sources(data['mentah'], dir_data)
+
+    def ingest_dingin():
+        # Direktori store baru setiap jalan: selalu parse Excel + tulis partisi Feather
+        data['store_root'] = tempfile.mkdtemp(dir=dir_kerja)
+        data['frames'] = load_directory(dir_data, root=data['store_root'])
+
+    def ingest_hangat():
+        # Seperti proses baru: manifest dibaca ulang, tidak ada file yang di-parse
+        load_directory(dir_data, root=data['store_root'])
+
+    def koordinat():
+        data['halte'], _ = normalize_coordinates(data['frames']['halte'])
+
+    def agregat_total():
+        data['agg'] = analytics.build_aggregates(data['halte'], data['frames']['bus_penumpang'], data['frames']['rute'])
+        data['agg']['fingerprint'] = f"bench-{skala}"
+
+    def cakupan():
+        raster = coverage_raster(GridIndex(data['halte']['lat'], data['halte']['lon']))
+        coverage_gaps(raster, data['halte'])
+        data['raster'] = raster
+
+    halte = lambda: data['halte']  # noqa: E731
+    bus = lambda: data['frames']['bus_penumpang']  # noqa: E731
+    rute = lambda: data['frames']['rute']  # noqa: E731
+    tahap = {
+        'bangkitkan': (bangkitkan, 1),
+        'tulis_excel': (tulis_excel, 1),
+        'ingest_dingin': (ingest_dingin, 1),
+        'ingest_hangat': (ingest_hangat, ulang),
+        'koordinat': (koordinat, ulang),
+        'tab1_halte': (lambda: analytics.halte_aggregates(halte()), ulang),
+        'tab2_tab6_bus': (lambda: analytics.bus_aggregates(bus()), ulang),
+        'tab3_tab4_rute': (lambda: analytics.rute_aggregates(rute()), ulang),
+        'agregat_total': (agregat_total, ulang),
+        'cakupan': (cakupan, ulang),
+        'peta': (lambda: build_map_layers(data['halte']), ulang),
+        'konteks_chatbot': (lambda: build_sections(data['agg']), ulang),
+    }
+    return tahap, data
+
+
+def jalankan_skala(skala, ulang, dir_kerja, templat):
+    tahap, data = tahap_skala(skala, ulang, dir_kerja, templat)
+    hasil = {}
+    for nama, (fn, n) in tahap.items():
+        detik, puncak = ukur(fn, n)
+        hasil[nama] = {'detik': detik, 'puncak_mb': puncak}
+        print(f"  {nama:<24} {detik * 1000:>10.1f} ms {puncak:>9.1f} MB", flush=True)
+
+    specs = dashboard_charts(data['agg'], data['frames']['bus_penumpang'])
+    specs['cakupan'] = coverage_chart(data['raster'], data['halte'], 1.0)
+    # Pemanasan: impor matplotlib dan cache font tidak dihitung pada grafik pertama
+    render_figure(specs['venn_hub'], figsize=specs['venn_hub'].figsize)
+    for nama, spec in specs.items():
+        detik, puncak = ukur(lambda: render_figure(spec, figsize=spec.figsize), ulang)
+        hasil[f"render_{nama}"] = {'detik': detik, 'puncak_mb': puncak}
+        print(f"  {'render_' + nama:<24} {detik * 1000:>10.1f} ms {puncak:>9.1f} MB", flush=True)
+
+    return {
+        'skala': skala,
+        'baris': {nama: len(df) for nama, df in data['mentah'].items()},
+        'tahap': hasil,
+        # Kumulatif untuk seluruh proses hingga skala ini selesai
+        'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def metadata():
+    def versi(paket):
+        try:
+            return __import__(paket).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'waktu': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu': os.cpu_count(),
+        'versi': {p: versi(p) for p in ('numpy', 'pandas', 'matplotlib', 'pyarrow')},
+    }
+
+
+def bandingkan(lama, baru, ambang=AMBANG_REGRESI):
+    """
+    Daftar regresi (skala, tahap, metrik, nilai lama, nilai baru) antara dua hasil suite.
+    """
+    regresi = []
+    lama_per_skala = {h['skala']: h['tahap'] for h in lama['hasil']}
+    print(f"\nPerbandingan dengan {lama['meta'].get('commit')} ({lama['meta'].get('waktu')}):")
+    for h in baru['hasil']:
+        acuan = lama_per_skala.get(h['skala'])
+        if acuan is None:
+            continue
+        for nama, nilai in h['tahap'].items():
+            if nama not in acuan:
+                continue
+            for metrik, derau in (('detik', DERAU_DETIK), ('puncak_mb', DERAU_MB)):
+                a, b = acuan[nama][metrik], nilai[metrik]
+                if b > a * (1 + ambang) and b - a > derau:
+                    regresi.append((h['skala'], nama, metrik, a, b))
+    for skala, nama, metrik, a, b in regresi:
+        print(f"  REGRESI x{skala:g} {nama:<24} {metrik:<9} {a:>10.3f} -> {b:>10.3f} ({b / a:.2f}x)")
+    if not regresi:
+        print("  tidak ada regresi di atas ambang")
+    return regresi
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suite benchmark pipeline dashboard pada data sintetis.")
+    parser.add_argument('--skala', type=float, nargs='+', default=SKALA, help="Kelipatan ukuran data sampel.")
+    parser.add_argument('--ulang', type=int, default=3, help="Jumlah ulangan pengukuran waktu per tahap.")
+    parser.add_argument('--output', default=None, help="File JSON hasil (default: benchmarks/hasil/suite-<commit>-<waktu>.json).")
+    parser.add_argument('--pembanding', default=None, help="File JSON hasil sebelumnya untuk deteksi regresi.")
+    parser.add_argument('--ambang', type=float, default=AMBANG_REGRESI, help="Batas kenaikan relatif yang dianggap regresi (default: 0.25).")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter('ignore')
+    os.chdir(ROOT)
+    templat = load_directory()
+    hasil = {'meta': metadata(), 'hasil': []}
+    with tempfile.TemporaryDirectory() as dir_kerja:
+        for skala in args.skala:
+            print(f"skala x{skala:g}", flush=True)
+            hasil['hasil'].append(jalankan_skala(skala, args.ulang, dir_kerja, templat))
+
+    output = args.output
+    if output is None:
+        os.makedirs(DIR_HASIL, exist_ok=True)
+        stempel = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = os.path.join(DIR_HASIL, f"suite-{hasil['meta']['commit'] or 'lokal'}-{stempel}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(hasil, f, indent=2)
+    print(f"\nhasil -> {output}")
+
+    if args.pembanding:
+        with open(args.pembanding, encoding='utf-8') as f:
+            if bandingkan(json.load(f), hasil, args.ambang):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Uji luring pipeline chat (transjakarta.chat) dengan model palsu LangChain.
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.chat import (  # noqa: E402
+    ANGGARAN_TOKEN_RIWAYAT, ResponseCache, format_history, stream_response,
+)
+from transjakarta.context import KARAKTER_PER_TOKEN  # noqa: E402
+
+KONTEKS = "## Distribusi Halte\n267 halte; terbanyak di Kota Adm. Jakarta Timur (68)."
+JAWABAN = "Layanan BRT memiliki rasio penumpang per bus tertinggi."
+
+
+class ModelPenghitung(FakeListChatModel):
+    """
+    Model palsu yang mencatat berapa kali model benar-benar dipanggil.
+    """
+    panggilan: int = 0
+
+    def _stream(self, *args, **kwargs):
+        self.panggilan += 1
+        yield from super()._stream(*args, **kwargs)
+
+
+def model_palsu(*jawaban):
+    return ModelPenghitung(responses=list(jawaban or [JAWABAN]))
+
+
+def riwayat(giliran, panjang=200):
+    pesan = []
+    for i in range(giliran):
+        pesan.append({'role': 'Human', 'content': f"Pertanyaan ke-{i} tentang tren penumpang BRT?"})
+        pesan.append({'role': 'AI', 'content': "Jawaban panjang. " * (panjang // 17)})
+    return pesan
+
+
+def test_potongan_stream_membentuk_jawaban_utuh():
+    potongan = list(stream_response(model_palsu(), "Layanan mana paling efisien?", [], KONTEKS))
+    assert len(potongan) > 1
+    assert "".join(potongan) == JAWABAN
+
+
+def test_cache_hit_pada_sidik_jari_sama_dan_miss_pada_sidik_jari_berbeda():
+    cache = ResponseCache()
+    model = model_palsu(JAWABAN, "Jawaban untuk dataset baru.")
+
+    pertama = "".join(stream_response(model, "Layanan mana paling efisien?", [], KONTEKS, cache, 'fp-1'))
+    # Pertanyaan yang sama (beda huruf besar dan spasi) pada dataset yang sama
+    kedua = list(stream_response(model, "  layanan MANA paling efisien? ", [], KONTEKS, cache, 'fp-1'))
+    assert pertama == JAWABAN
+    assert kedua == [JAWABAN]
+    assert model.panggilan == 1
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    ketiga = "".join(stream_response(model, "Layanan mana paling efisien?", [], KONTEKS, cache, 'fp-2'))
+    assert ketiga == "Jawaban untuk dataset baru."
+    assert model.panggilan == 2
+    assert cache.stats() == {'entries': 2, 'hits': 1, 'misses': 2, 'evictions': 0, 'hit_rate': pytest.approx(1 / 3)}
+
+
+def test_jawaban_tidak_disimpan_bila_stream_dihentikan():
+    cache = ResponseCache()
+    aliran = stream_response(model_palsu(), "Apa saja?", [], KONTEKS, cache, 'fp-1')
+    next(aliran)
+    aliran.close()
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_mengeluarkan_entri_terlama_dan_menghitung_statistik():
+    cache = ResponseCache(max_entries=2)
+    cache.put('a', "A")
+    cache.put('b', "B")
+    assert cache.get('a') == "A"  # 'a' menjadi yang terbaru
+    cache.put('c', "C")           # 'b' dikeluarkan
+    assert cache.get('b') is None
+    assert cache.get('c') == "C"
+    assert cache.get('a') == "A"
+    assert cache.stats() == {'entries': 2, 'hits': 3, 'misses': 1, 'evictions': 1, 'hit_rate': 0.75}
+
+
+@pytest.mark.parametrize('giliran', [0, 1, 5, 50, 500])
+@pytest.mark.parametrize('anggaran', [50, ANGGARAN_TOKEN_RIWAYAT])
+def test_format_history_dalam_anggaran_token(giliran, anggaran):
+    teks = format_history(riwayat(giliran), anggaran)
+    assert len(teks) <= anggaran * KARAKTER_PER_TOKEN
+
+
+def test_format_history_menyertakan_pesan_terbaru_dan_meringkas_yang_lama():
+    pesan = riwayat(50)
+    teks = format_history(pesan)
+    assert teks.endswith(f"Analis AI: {pesan[-1]['content']}")
+    assert teks.startswith("(Ringkasan ")
+    assert "Pertanyaan ke-0 " not in teks.split("\n", 1)[1]
@@ -0,0 +1,142 @@
+"""
+Uji kubus filter silang (transjakarta.cube): agregat tersaring harus sama
+dengan build_aggregates pada baris yang tersaring.
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.analytics import build_aggregates  # noqa: E402
+from transjakarta.cube import Cube, DIMENSI_SUMBER  # noqa: E402
+from transjakarta.ingest import SUMBER_DATA, apply_schema  # noqa: E402
+
+# Agregat yang dibandingkan; 'network', 'set_a', dan 'set_b' diwakili hub_counts/hub_analysis_df
+KUNCI_FRAME = ('halte_by_wilayah', 'halte_by_kecamatan', 'ratio_df', 'yearly_df', 'top_titik_a',
+               'top_titik_b', 'rute_by_kategori', 'hub_counts', 'hub_analysis_df')
+
+
+def data(seed=0):
+    """
+    Tiga sumber kecil bertipe seperti hasil PartitionedStore.load().
+    """
+    rng = np.random.default_rng(seed)
+    wilayah = {'Jakarta Pusat': ['Gambir', 'Menteng'], 'Jakarta Selatan': ['Tebet', 'Setiabudi', 'Cilandak'],
+               'Jakarta Timur': ['Matraman']}
+    pasangan = [(w, k) for w, daftar in wilayah.items() for k in daftar]
+    pilih = rng.integers(0, len(pasangan), 120)
+    halte = pd.DataFrame({
+        'periode_data': rng.choice([2024, 2025], 120),
+        'wilayah': [pasangan[i][0] for i in pilih],
+        'kecamatan': [pasangan[i][1] for i in pilih],
+    })
+    bus = pd.DataFrame({
+        'periode_data': np.repeat([2022, 2023, 2024], 24),
+        'jenis_layanan': np.tile(['BRT', 'Mikrotrans', 'Royaltrans', 'Bus Rapid Transit'], 18),
+        'jumlah_bus': rng.integers(5, 60, 72),
+    })
+    bus['jumlah_penumpang'] = bus['jumlah_bus'] * 900 + rng.integers(-5000, 5000, 72)
+    lokasi = [f"Lokasi {i}" for i in range(25)]
+    rute = pd.DataFrame({
+        'periode_data': rng.choice([2023, 2024], 150),
+        'kategori': rng.choice(['BRT', 'Mikrotrans', 'Transjabodetabek'], 150),
+        'titik_a': rng.choice(lokasi, 150),
+        'titik_b': rng.choice(lokasi, 150),
+    })
+    return {
+        'halte': apply_schema(halte, SUMBER_DATA['halte']),
+        'bus_penumpang': apply_schema(bus, SUMBER_DATA['bus_penumpang']),
+        'rute': apply_schema(rute, SUMBER_DATA['rute']),
+    }
+
+
+def saring(frames, filter_):
+    """
+    Cara naif: menyaring baris setiap sumber pada dimensinya, lalu build_aggregates.
+    """
+    tersaring = {}
+    for nama, df in frames.items():
+        mask = np.ones(len(df), dtype=bool)
+        for d in DIMENSI_SUMBER[nama]:
+            if d in filter_:
+                mask &= df[d].astype(str).isin(filter_[d]).to_numpy()
+        tersaring[nama] = df[mask]
+    return tersaring, build_aggregates(tersaring['halte'], tersaring['bus_penumpang'], tersaring['rute'])
+
+
+@pytest.fixture
+def kubus():
+    frames = data()
+    agg = build_aggregates(frames['halte'], frames['bus_penumpang'], frames['rute'])
+    agg['fingerprint'] = 'uji'
+    return frames, Cube(agg, frames['halte'], frames['bus_penumpang'], frames['rute'])
+
+
+def sama(hasil, harapan):
+    if isinstance(harapan, pd.DataFrame):
+        pd.testing.assert_frame_equal(hasil, harapan)
+    else:
+        pd.testing.assert_series_equal(hasil, harapan)
+
+
+@pytest.mark.parametrize('filter_', [
+    {'wilayah': ['Jakarta Selatan']},
+    {'wilayah': ['Jakarta Pusat', 'Jakarta Timur'], 'kecamatan': ['Gambir', 'Matraman', 'Tebet']},
+    {'jenis_layanan': ['BRT', 'Royaltrans']},
+    {'kategori': ['Mikrotrans']},
+    {'periode_data': ['2024']},
+    {'periode_data': ['2023', '2024'], 'kategori': ['BRT', 'Transjabodetabek'], 'jenis_layanan': ['Mikrotrans']},
+])
+def test_agregat_tersaring_sama_dengan_build_aggregates(kubus, filter_):
+    frames, cube = kubus
+    tersaring, harapan = saring(frames, filter_)
+    hasil = cube.aggregates(filter_)
+    for kunci in KUNCI_FRAME:
+        sama(hasil[kunci], harapan[kunci])
+    assert hasil['service_options'] == harapan['service_options']
+    assert hasil['set_a'] == harapan['set_a'] and hasil['set_b'] == harapan['set_b']
+    sama(hasil['korelasi']['koefisien'], harapan['korelasi']['koefisien'])
+    for nama, df in tersaring.items():
+        pd.testing.assert_frame_equal(cube.rows(nama, filter_), df)
+
+
+def test_tanpa_filter_mengembalikan_agregat_dataset(kubus):
+    _, cube = kubus
+    assert cube.aggregates({}) is cube.dasar
+    assert cube.aggregates({'wilayah': []}) is cube.dasar
+
+
+def test_filter_hanya_menghitung_ulang_sumber_yang_terpengaruh(kubus):
+    _, cube = kubus
+    hasil = cube.aggregates({'wilayah': ['Jakarta Selatan']})
+    # Dimensi wilayah tidak berlaku untuk rute dan bus: agregatnya objek yang sama
+    assert hasil['hub_analysis_df'] is cube.dasar['hub_analysis_df']
+    assert hasil['ratio_df'] is cube.dasar['ratio_df']
+    assert hasil['fingerprint_sumber']['rute'] == cube.fingerprint
+    assert hasil['fingerprint_sumber']['halte'] != cube.fingerprint
+
+
+def test_filter_tanpa_baris_dicatat_kosong(kubus):
+    _, cube = kubus
+    hasil = cube.aggregates({'kecamatan': ['Gambir'], 'wilayah': ['Jakarta Selatan']})
+    assert hasil['kosong'] == ('halte',)
+    assert hasil['halte_by_wilayah'].empty
+
+
+def test_options_filter_silang(kubus):
+    frames, cube = kubus
+    halte = frames['halte']
+    harapan = sorted(halte.loc[halte['wilayah'] == 'Jakarta Selatan', 'kecamatan'].astype(str).unique())
+    assert cube.options('kecamatan', {'wilayah': ['Jakarta Selatan']}) == harapan
+    # Filter pada dimensi itu sendiri tidak mempersempit pilihannya
+    assert cube.options('wilayah', {'wilayah': ['Jakarta Selatan']}) == sorted(halte['wilayah'].astype(str).unique())
+    # Periode digabung dari semua sumber yang memilikinya
+    assert cube.options('periode_data') == ['2022', '2023', '2024', '2025']
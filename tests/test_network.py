@@ -0,0 +1,102 @@
+"""
+Uji mesin graf jaringan rute (transjakarta.network) terhadap networkx.
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.network import RouteNetwork, hub_typology  # noqa: E402
+
+nx = pytest.importorskip('networkx')
+
+
+def rute_acak(n_lokasi=40, n_rute=90, seed=0):
+    """
+    Rute acak dengan sisi ganda, loop, satu komponen terpisah, dan ujung kosong.
+    """
+    rng = np.random.default_rng(seed)
+    lokasi = np.array([f"Lokasi {i}" for i in range(n_lokasi)], dtype=object)
+    rute = pd.DataFrame({'titik_a': rng.choice(lokasi, n_rute), 'titik_b': rng.choice(lokasi, n_rute)})
+    tambahan = pd.DataFrame({
+        'titik_a': ['Pulau A', 'Pulau B', 'Lokasi 0', 'Lokasi 1', None],
+        'titik_b': ['Pulau B', 'Pulau A', 'Lokasi 0', 'Lokasi 2', 'Lokasi 3'],
+    })
+    return pd.concat([rute, tambahan, rute.head(5)], ignore_index=True)
+
+
+def graf_tak_berarah(rute_df):
+    g = nx.Graph()
+    ujung = rute_df.dropna()
+    g.add_nodes_from(pd.concat([rute_df['titik_a'], rute_df['titik_b']]).dropna())
+    g.add_edges_from((a, b) for a, b in zip(ujung['titik_a'], ujung['titik_b']) if a != b)
+    return g
+
+
+def test_derajat_dan_tipologi():
+    rute = rute_acak()
+    net = RouteNetwork(rute)
+    for jenis, kolom in (('out', 'titik_a'), ('in', 'titik_b')):
+        harapan = rute[kolom].value_counts().reindex(net.nodes, fill_value=0)
+        assert net.degree_series(jenis).to_dict() == harapan.to_dict()
+    assert list(hub_typology([5, 1, 3], [1, 5, 2])) == ["Dominan Terminal", "Dominan Tujuan", "Seimbang (Transit)"]
+
+
+def test_betweenness_sama_dengan_networkx():
+    rute = rute_acak()
+    net = RouteNetwork(rute)
+    harapan = nx.betweenness_centrality(graf_tak_berarah(rute), normalized=True)
+    hasil = pd.Series(net.betweenness(sampel=None), index=net.nodes)
+    for lokasi, nilai in harapan.items():
+        assert hasil[lokasi] == pytest.approx(nilai, abs=1e-12)
+
+
+def test_betweenness_sampel_mendekati_eksak():
+    net = RouteNetwork(rute_acak(n_lokasi=120, n_rute=300))
+    eksak = net.betweenness(sampel=None)
+    sampel = net.betweenness(sampel=80)
+    assert np.corrcoef(eksak, sampel)[0, 1] > 0.9
+
+
+def test_transfer_distribution_sama_dengan_jarak_networkx():
+    rute = rute_acak()
+    net = RouteNetwork(rute)
+    g = graf_tak_berarah(rute)
+    harapan = {}
+    for s, jarak in nx.all_pairs_shortest_path_length(g):
+        for t, hop in jarak.items():
+            if s != t:
+                label = f"{hop - 1} kali transit"
+                harapan[label] = harapan.get(label, 0) + 1
+        tidak_terjangkau = g.number_of_nodes() - len(jarak)
+        if tidak_terjangkau:
+            harapan['Tidak terjangkau'] = harapan.get('Tidak terjangkau', 0) + tidak_terjangkau
+
+    hasil = net.transfer_distribution(sampel=None)
+    assert hasil['Jumlah Pasangan'].to_dict() == harapan
+    assert hasil['Proporsi'].sum() == pytest.approx(1.0)
+
+
+def test_transfer_distribution_sampel_diskalakan_ke_seluruh_pasangan():
+    net = RouteNetwork(rute_acak(n_lokasi=120, n_rute=300))
+    hasil = net.transfer_distribution(sampel=30)
+    assert hasil['Jumlah Pasangan'].sum() == pytest.approx(net.n * (net.n - 1), rel=1e-3)
+
+
+def test_hop_matrix_menolak_matriks_terlalu_besar(monkeypatch):
+    import transjakarta.network as network
+
+    net = RouteNetwork(rute_acak())
+    monkeypatch.setattr(network, 'MAKS_SIMPUL_TRANSIT', 10)
+    with pytest.raises(ValueError):
+        net.hop_matrix()
+    # Distribusi transit tetap dapat dihitung per blok kecil
+    assert net.transfer_distribution(sampel=None, seed=1)['Jumlah Pasangan'].sum() == net.n * (net.n - 1)
@@ -0,0 +1,89 @@
+"""
+Uji regresi dan korelasi bentuk tertutup (transjakarta.regression).
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transjakarta.regression import SEMUA_LAYANAN, correlation_table, fit_line, t_critical  # noqa: E402
+
+# Kuantil 0.975 distribusi t (nilai kritis dua sisi 95%) dan galat maksimum
+# yang dijanjikan docstring t_critical
+KUANTIL_T = [
+    (1, 12.706204736, 1e-9),
+    (2, 4.302652730, 1e-9),
+    (3, 3.182446305, 5e-3),
+    (10, 2.228138852, 1e-5),
+    (30, 2.042272456, 1e-5),
+]
+
+
+@pytest.mark.parametrize('df, kuantil, galat', KUANTIL_T)
+def test_t_critical_sesuai_kuantil_acuan(df, kuantil, galat):
+    assert t_critical(df) == pytest.approx(kuantil, abs=galat)
+
+
+def test_t_critical_tidak_terdefinisi_untuk_df_nol():
+    assert np.isnan(t_critical(0))
+
+
+def data_bus(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    layanan = rng.choice(['BRT', 'Mikrotrans', 'Royaltrans'], n)
+    # Bilangan bulat agar ada nilai kembar pada peringkat Spearman
+    bus = rng.integers(5, 40, n)
+    penumpang = bus * 1000 + rng.integers(-8000, 8000, n)
+    return pd.DataFrame({
+        'jenis_layanan': pd.Categorical(layanan),
+        'jumlah_bus': bus,
+        'jumlah_penumpang': penumpang,
+    })
+
+
+def test_fit_line_sama_dengan_polyfit():
+    df = data_bus()
+    fit = fit_line(df['jumlah_bus'], df['jumlah_penumpang'])
+    slope, intercept = np.polyfit(df['jumlah_bus'], df['jumlah_penumpang'], 1)
+    r = df['jumlah_bus'].corr(df['jumlah_penumpang'])
+    assert fit['n'] == len(df)
+    assert fit['slope'] == pytest.approx(slope)
+    assert fit['intercept'] == pytest.approx(intercept)
+    assert fit['r2'] == pytest.approx(r ** 2)
+    assert np.all(fit['ci_low'] <= fit['y_hat']) and np.all(fit['y_hat'] <= fit['ci_high'])
+
+
+def test_fit_line_tanpa_variasi_x():
+    assert fit_line([3, 3, 3], [1, 2, 3]) is None
+    assert fit_line([1], [1]) is None
+
+
+@pytest.mark.parametrize('metode, kolom', [('pearson', 'Pearson'), ('spearman', 'Spearman')])
+def test_correlation_table_sama_dengan_series_corr(metode, kolom):
+    df = data_bus()
+    tabel = correlation_table(df)
+    for layanan, grup in df.groupby('jenis_layanan', observed=True):
+        harapan = grup['jumlah_bus'].corr(grup['jumlah_penumpang'], method=metode)
+        assert tabel.loc[layanan, kolom] == pytest.approx(harapan)
+        assert tabel.loc[layanan, 'Jumlah Data'] == len(grup)
+    harapan = df['jumlah_bus'].corr(df['jumlah_penumpang'], method=metode)
+    assert tabel.loc[SEMUA_LAYANAN, kolom] == pytest.approx(harapan)
+
+
+def test_correlation_table_varians_nol_menjadi_nan():
+    df = pd.DataFrame({
+        'jenis_layanan': ['A', 'A', 'B', 'B', 'B'],
+        'jumlah_bus': [10, 10, 1, 2, 3],
+        'jumlah_penumpang': [5, 7, 2, 4, 6],
+    })
+    tabel = correlation_table(df)
+    assert np.isnan(tabel.loc['A', 'Pearson'])
+    assert tabel.loc['B', 'Pearson'] == pytest.approx(1.0)
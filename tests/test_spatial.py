@@ -0,0 +1,100 @@
+"""
+Uji indeks grid spasial (transjakarta.spatial) terhadap perhitungan brute force.
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transjakarta.spatial as spatial  # noqa: E402
+from transjakarta.spatial import GridIndex, coverage_gaps  # noqa: E402
+
+
+def titik_halte(n=300, seed=0):
+    """
+    Titik acak di sekitar Jakarta: sebagian menggerombol, sebagian kembar.
+    """
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-6.37, -6.09, n)
+    lon = rng.uniform(106.68, 106.97, n)
+    lat[:40] = -6.2 + rng.normal(0, 0.002, 40)
+    lon[:40] = 106.82 + rng.normal(0, 0.002, 40)
+    lat[40:45], lon[40:45] = lat[45], lon[45]
+    return lat, lon
+
+
+def titik_kueri(n=200, seed=1):
+    rng = np.random.default_rng(seed)
+    # Termasuk kueri jauh di luar sebaran halte
+    lat = np.r_[rng.uniform(-6.45, -6.0, n), -7.0, -5.5]
+    lon = np.r_[rng.uniform(106.6, 107.05, n), 106.8, 107.5]
+    return lat, lon
+
+
+def jarak_brute(index, lat, lon, q_lat, q_lon):
+    x, y = index.project(lat, lon)
+    qx, qy = index.project(q_lat, q_lon)
+    return np.hypot(qx[:, None] - x[None, :], qy[:, None] - y[None, :])
+
+
+@pytest.fixture(autouse=True)
+def blok_kueri_kecil(monkeypatch):
+    # Blok kecil agar penggabungan hasil antarblok ikut teruji
+    monkeypatch.setattr(spatial, 'UKURAN_BLOK_KUERI', 37)
+
+
+@pytest.mark.parametrize('cell_km', [None, 0.3, 5.0])
+def test_nearest_sama_dengan_brute_force(cell_km):
+    lat, lon = titik_halte()
+    q_lat, q_lon = titik_kueri()
+    index = GridIndex(lat, lon, cell_km=cell_km)
+    jarak, indeks = index.nearest(q_lat, q_lon)
+    d = jarak_brute(index, lat, lon, q_lat, q_lon)
+    np.testing.assert_allclose(jarak, d.min(axis=1), rtol=1e-12)
+    # Titik kembar boleh terpilih yang mana saja asalkan jaraknya minimum
+    np.testing.assert_allclose(d[np.arange(len(q_lat)), indeks], d.min(axis=1), rtol=1e-12)
+
+
+@pytest.mark.parametrize('cell_km, radius_km', [(None, 0.5), (0.3, 1.0), (5.0, 2.5)])
+def test_query_radius_sama_dengan_brute_force(cell_km, radius_km):
+    lat, lon = titik_halte()
+    q_lat, q_lon = titik_kueri()
+    index = GridIndex(lat, lon, cell_km=cell_km)
+    qid, pid = index.query_radius(q_lat, q_lon, radius_km)
+    d = jarak_brute(index, lat, lon, q_lat, q_lon)
+    harapan = set(zip(*np.nonzero(d <= radius_km)))
+    hasil = list(zip(qid.tolist(), pid.tolist()))
+    assert len(hasil) == len(set(hasil))
+    assert set(hasil) == harapan
+    np.testing.assert_array_equal(index.count_within(q_lat, q_lon, radius_km), (d <= radius_km).sum(axis=1))
+
+
+def test_grid_tanpa_titik_ditolak():
+    with pytest.raises(ValueError):
+        GridIndex([], [])
+
+
+def test_coverage_gaps_menghitung_luas_dan_kecamatan():
+    halte_df = pd.DataFrame({'kecamatan': ['Tebet', 'Gambir']})
+    raster = {
+        'resolusi_km': 0.5,
+        'jarak': np.array([[0.2, 1.5, 7.0], [2.0, 0.8, 1.2]]),
+        'terdekat': np.array([[0, 0, 1], [1, 1, 1]]),
+    }
+    hasil = coverage_gaps(raster, halte_df, ambang_km=1.0, maks_km=5.0)
+    # Lima sel dalam wilayah, tiga di antaranya celah; sel 7 km di luar wilayah
+    assert hasil['luas_wilayah_km2'] == pytest.approx(5 * 0.25)
+    assert hasil['luas_celah_km2'] == pytest.approx(3 * 0.25)
+    assert hasil['persen_celah'] == pytest.approx(60.0)
+    per_kecamatan = hasil['per_kecamatan']
+    assert per_kecamatan.loc['Gambir', 'Luas Celah (km²)'] == pytest.approx(0.5)
+    assert per_kecamatan.loc['Gambir', 'Jarak Maks (km)'] == pytest.approx(2.0)
+    assert per_kecamatan.loc['Tebet', 'Luas Celah (km²)'] == pytest.approx(0.25)
@@ -0,0 +1,192 @@
+"""
+Uji penyimpanan terpartisi (transjakarta.store): sinkronisasi inkremental,
+file berubah/dihapus, pembacaan tersaring, dan snapshot gabungan.
+
+Jalankan dari root repo:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transjakarta.store as store_mod  # noqa: E402
+from transjakarta.store import PartitionedStore  # noqa: E402
+
+KOLOM_RUTE = ['periode_data', 'kategori', 'kode', 'jurusan', 'titik_a', 'titik_b']
+
+
+def rute(periode, n=4, kategori=('BRT', 'Bus Rapid Transit', 'Mikrotrans')):
+    return pd.DataFrame({
+        'periode_data': [periode] * n,
+        'kategori': [kategori[i % len(kategori)] for i in range(n)],
+        'kode': [f"{periode % 100}{i}" for i in range(n)],
+        'jurusan': [f"Asal {i} - Tujuan {i}" for i in range(n)],
+        'titik_a': [f"Asal {i}" for i in range(n)],
+        'titik_b': [f"Tujuan {i}" for i in range(n)],
+    })
+
+
+def tulis(data_dir, nama_file, df, mtime):
+    path = os.path.join(data_dir, nama_file)
+    df.to_csv(path, index=False)
+    # mtime eksplisit agar urutan file dan deteksi perubahan tidak bergantung jam
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+@pytest.fixture
+def parse(monkeypatch):
+    """
+    Daftar file yang benar-benar di-parse selama uji.
+    """
+    dibaca = []
+    asli = store_mod._baca_file_sumber
+
+    def mencatat(path, spec):
+        dibaca.append(os.path.basename(path))
+        return asli(path, spec)
+
+    monkeypatch.setattr(store_mod, '_baca_file_sumber', mencatat)
+    return dibaca
+
+
+def test_sync_awal_menulis_partisi_dan_menerapkan_skema(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    store = PartitionedStore(str(tmp_path))
+    perubahan = store.sync()
+    assert perubahan == {'baru': ["Data Rute Jalur Transjakarta 2023.csv"], 'berubah': [], 'dihapus': [], 'gagal': {}}
+
+    df = store.read('rute')
+    assert list(df.columns) == KOLOM_RUTE
+    # 'Bus Rapid Transit' disatukan menjadi 'BRT' oleh skema ingest
+    assert df['kategori'].tolist() == ['BRT', 'BRT', 'Mikrotrans', 'BRT']
+    assert isinstance(df['kategori'].dtype, pd.CategoricalDtype)
+    assert df['kode'].dtype == 'string'
+    # Satu partisi per (periode_data, kategori)
+    assert store.summary().loc[0, 'partisi'] == 2
+    assert os.path.isdir(os.path.join(store.root, 'rute', 'periode_data=2023', 'kategori=BRT'))
+
+
+def test_sync_ulang_tanpa_perubahan_tidak_mem_parse(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    versi = store.fingerprint()
+    assert not any(store.sync().values())
+    # Proses baru membaca manifest yang sama tanpa mem-parse ulang
+    lain = PartitionedStore(str(tmp_path))
+    assert not any(lain.sync().values())
+    assert lain.fingerprint() == versi
+    pd.testing.assert_frame_equal(lain.read('rute'), store.read('rute'))
+    assert parse == ["Data Rute Jalur Transjakarta 2023.csv"]
+
+
+def test_file_baru_hanya_mem_parse_file_itu(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    versi_halte, versi_rute = store.version('halte'), store.version('rute')
+
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2024.csv", rute(2024, n=3), 2_000)
+    perubahan = store.sync()
+    assert perubahan['baru'] == ["Data Rute Jalur Transjakarta 2024.csv"]
+    assert parse == ["Data Rute Jalur Transjakarta 2023.csv", "Data Rute Jalur Transjakarta 2024.csv"]
+    assert store.version('halte') == versi_halte
+    assert store.version('rute') != versi_rute
+
+    df = store.read('rute')
+    # Baris digabung menurut urutan file (mtime) lalu urutan baris di file
+    assert df['kode'].tolist() == ['230', '231', '232', '233', '240', '241', '242']
+    assert store.read('rute', file="Data Rute Jalur Transjakarta 2024.csv")['periode_data'].unique().tolist() == [2024]
+
+
+def test_file_berubah_mengganti_partisinya(tmp_path, parse):
+    path = tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    partisi_lama = [p['path'] for p in store.entries('rute')[0][1]['partisi']]
+
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023, n=2, kategori=('Royaltrans',)), 1_500)
+    perubahan = store.sync()
+    assert perubahan['berubah'] == ["Data Rute Jalur Transjakarta 2023.csv"]
+    assert store.read('rute')['kategori'].tolist() == ['Royaltrans', 'Royaltrans']
+    for p in partisi_lama:
+        assert not os.path.exists(os.path.join(store.root, p))
+    assert os.path.exists(path)
+
+
+def test_file_dihapus_menghapus_partisinya(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    path = tulis(tmp_path, "Data Rute Jalur Transjakarta 2024.csv", rute(2024, n=3), 2_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    partisi = [p['path'] for f, e in store.entries('rute') if f.endswith('2024.csv') for p in e['partisi']]
+
+    os.remove(path)
+    assert store.scan()['dihapus'] == ["Data Rute Jalur Transjakarta 2024.csv"]
+    assert store.sync()['dihapus'] == ["Data Rute Jalur Transjakarta 2024.csv"]
+    assert store.read('rute')['periode_data'].unique().tolist() == [2023]
+    for p in partisi:
+        assert not os.path.exists(os.path.join(store.root, p))
+
+    os.remove(os.path.join(tmp_path, "Data Rute Jalur Transjakarta 2023.csv"))
+    store.sync()
+    with pytest.raises(FileNotFoundError):
+        store.read('rute')
+    assert not os.path.exists(os.path.join(store.root, 'rute.feather'))
+
+
+def test_pembacaan_tersaring_hanya_partisi_yang_cocok(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023, n=6), 1_000)
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2024.csv", rute(2024, n=6), 2_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    semua = store.read('rute')
+
+    tersaring = store.read('rute', where={'kategori': ['Mikrotrans'], 'periode_data': [2024]})
+    harapan = semua[(semua['kategori'] == 'Mikrotrans') & (semua['periode_data'] == 2024)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(tersaring, harapan)
+
+    kosong = store.read('rute', where={'kategori': ['Transjabodetabek']})
+    assert kosong.empty and list(kosong.columns) == KOLOM_RUTE
+
+
+def test_snapshot_sama_dengan_gabungan_partisi(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023, n=5), 1_000)
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2024.csv", rute(2024, n=3), 2_000)
+    store = PartitionedStore(str(tmp_path))
+    store.sync()
+    assert os.path.exists(os.path.join(store.root, 'rute.feather'))
+    pd.testing.assert_frame_equal(store.read('rute'), store.read('rute', where={}))
+
+
+def test_file_tanpa_baris_menghasilkan_frame_kosong_bertipe(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2026_01.csv", rute(2026).iloc[:0], 1_000)
+    store = PartitionedStore(str(tmp_path))
+    assert store.sync()['gagal'] == {}
+    df = store.read('rute')
+    assert df.empty and list(df.columns) == KOLOM_RUTE
+    assert isinstance(df['kategori'].dtype, pd.CategoricalDtype)
+
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 500)
+    store.sync()
+    df = store.read('rute')
+    assert len(df) == 4 and df['periode_data'].dtype == 'int64'
+
+
+def test_file_rusak_dicatat_dan_tidak_dicoba_ulang(tmp_path, parse):
+    tulis(tmp_path, "Data Rute Jalur Transjakarta 2023.csv", rute(2023), 1_000)
+    rusak = os.path.join(tmp_path, "Data Rute Jalur Transjakarta 2024.xlsx")
+    with open(rusak, 'wb') as f:
+        f.write(b"bukan workbook")
+    store = PartitionedStore(str(tmp_path))
+    perubahan = store.sync()
+    assert list(perubahan['gagal']) == ["Data Rute Jalur Transjakarta 2024.xlsx"]
+    assert len(store.read('rute')) == 4
+    assert not any(store.sync().values())
+    assert parse.count("Data Rute Jalur Transjakarta 2024.xlsx") == 1
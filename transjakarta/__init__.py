@@ -0,0 +1,6 @@
+"""
+Modul pendukung Dashboard Analisis Transjakarta.
+
+Berisi lapisan data dan analitik yang tidak bergantung pada Streamlit,
+sehingga dapat dipakai ulang oleh aplikasi, skrip benchmark, maupun laporan.
+"""
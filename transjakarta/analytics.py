@@ -0,0 +1,267 @@
+"""
+Agregasi dashboard yang dihitung sekali per dataset.
+
+Streamlit menjalankan ulang seluruh skrip pada setiap interaksi (termasuk
+setiap pesan chat). Modul ini menghitung semua agregat yang dibaca oleh tab
+dalam satu kali jalan dan menyimpannya berdasarkan sidik jari dataset,
+sehingga rerun hanya membaca hasil yang sudah ada. Modul ini tidak
+bergantung pada Streamlit.
+"""
+
+import hashlib
+
+import pandas as pd
+
+from transjakarta import regression
+from transjakarta.coords import normalize_coordinates
+from transjakarta.memo import FingerprintMemo
+from transjakarta.network import RouteNetwork
+
+
+_memo = FingerprintMemo(max_entries=8)
+# Untuk get_store_aggregates: agregat per sumber dikunci pada versi sumber
+# tersebut, parsial per file dikunci pada kunci file sumbernya
+_memo_sumber = FingerprintMemo(max_entries=16)
+_memo_parsial = FingerprintMemo(max_entries=256)
+
+
+def frame_fingerprint(*frames):
+    """
+    Sidik jari isi beberapa DataFrame. Dipakai bila data tidak berasal dari
+    file sumber (mis. data sintetis); untuk file sumber gunakan
+    PartitionedStore.fingerprint (transjakarta.store) yang jauh lebih murah.
+    """
+    h = hashlib.sha1()
+    for df in frames:
+        h.update(','.join(map(str, df.columns)).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _hitung(series):
+    """
+    value_counts dengan indeks string biasa (tanpa kategori berjumlah nol),
+    agar urutan grafik mengikuti jumlah, bukan urutan kategori.
+    """
+    counts = series.value_counts()
+    counts = counts[counts > 0].astype('int64')
+    counts.index = counts.index.astype(str)
+    return counts
+
+
+def _gabung_hitungan(daftar):
+    """
+    Menjumlahkan beberapa hasil _hitung (satu per file sumber) lalu mengurutkan
+    ulang dari yang terbesar; urutan stabil agar seri tetap mengikuti urutan file.
+    """
+    if len(daftar) == 1:
+        return daftar[0]
+    total = pd.concat(daftar).groupby(level=0, sort=False).sum()
+    return total.sort_values(ascending=False, kind='stable')
+
+
+def _parsial_halte(halte_df):
+    """
+    Hitungan halte per wilayah/kecamatan; dapat dijumlahkan antar file sumber.
+    """
+    return {k: _hitung(halte_df[k]) for k in ('wilayah', 'kecamatan')}
+
+
+def _parsial_bus(bus_penumpang_df):
+    """
+    Jumlah penumpang, jumlah bus, dan banyak baris per (periode, layanan);
+    dapat dijumlahkan antar file sumber.
+    """
+    parsial = bus_penumpang_df.groupby(['periode_data', 'jenis_layanan'], observed=True).agg(
+        jumlah_penumpang=('jumlah_penumpang', 'sum'),
+        jumlah_bus=('jumlah_bus', 'sum'),
+        n_bus=('jumlah_bus', 'count'),
+    )
+    parsial.index = parsial.index.set_levels(parsial.index.levels[1].astype(str), level='jenis_layanan')
+    return parsial
+
+
+def _parsial_rute(rute_df):
+    """
+    Hitungan titik awal, titik akhir, dan kategori rute; dapat dijumlahkan antar file sumber.
+    """
+    return {k: _hitung(rute_df[k]) for k in ('titik_a', 'titik_b', 'kategori')}
+
+
+def _gabung_parsial(daftar):
+    """
+    Menggabungkan parsial beberapa file sumber (dict hitungan atau DataFrame _parsial_bus).
+    """
+    if len(daftar) == 1:
+        return daftar[0]
+    if isinstance(daftar[0], dict):
+        return {k: _gabung_hitungan([p[k] for p in daftar]) for k in daftar[0]}
+    return pd.concat(daftar).groupby(level=[0, 1]).sum()
+
+
+def _ratio(parsial_bus):
+    per_layanan = parsial_bus.groupby(level='jenis_layanan')[['jumlah_penumpang', 'jumlah_bus']].sum()
+    ratio_df = per_layanan.rename(columns={'jumlah_penumpang': 'Total Penumpang', 'jumlah_bus': 'Total Bus'})
+    ratio_df['Penumpang per Bus'] = ratio_df['Total Penumpang'] / ratio_df['Total Bus']
+    return ratio_df.sort_values(by='Penumpang per Bus', ascending=False)
+
+
+def _hub(rute_df):
+    net = RouteNetwork(rute_df)
+    set_a, set_b = net.location_sets()
+    return net, set_a, set_b, net.top_hubs(15), net.hub_table()
+
+
+def _yearly(parsial_bus):
+    yearly_df = parsial_bus.reset_index()
+    # Rata-rata bus per tahun dari jumlah dan banyak baris
+    yearly_df['jumlah_bus'] = yearly_df['jumlah_bus'] / yearly_df.pop('n_bus')
+    return yearly_df
+
+
+def halte_aggregates_from_partial(parsial):
+    """
+    Agregat tab 1 dari parsial halte: dict 'wilayah'/'kecamatan' -> hitungan
+    (Series berindeks string, seperti hasil penjumlahan hitungan per file).
+    """
+    return {
+        # Tab 1: distribusi halte
+        'halte_by_wilayah': parsial['wilayah'].sort_values(ascending=False),
+        'halte_by_kecamatan': parsial['kecamatan'].nlargest(10),
+    }
+
+
+def bus_aggregates_from_partial(parsial, bus_penumpang_df):
+    """
+    Agregat tab 2 dan tab 6 dari parsial bus: DataFrame berindeks
+    (periode_data, jenis_layanan) dengan kolom jumlah_penumpang, jumlah_bus,
+    dan n_bus (banyak baris). Regresi dihitung dari `bus_penumpang_df`,
+    yaitu baris yang menghasilkan parsial tersebut.
+    """
+    yearly_df = _yearly(parsial)
+    return {
+        # Tab 2: penumpang & bus
+        'ratio_df': _ratio(parsial),
+        # Tab 6: tren
+        'yearly_df': yearly_df,
+        'service_options': yearly_df['jenis_layanan'].unique().tolist(),
+        # Regresi membutuhkan seluruh baris, tidak dapat digabung dari parsial
+        'korelasi': regression.analyze(bus_penumpang_df),
+    }
+
+
+def rute_aggregates_from_partial(parsial, rute_df):
+    """
+    Agregat tab 3 dan tab 4 dari parsial rute: dict 'titik_a'/'titik_b'/
+    'kategori' -> hitungan. Graf hub dibangun dari `rute_df`, yaitu baris
+    yang menghasilkan parsial tersebut.
+    """
+    # Graf jaringan dibangun ulang dari seluruh rute bila ada file rute yang berubah
+    network, set_a, set_b, hub_counts, hub_analysis_df = _hub(rute_df)
+    return {
+        # Tab 3: jaringan rute
+        'top_titik_a': parsial['titik_a'].nlargest(10),
+        'top_titik_b': parsial['titik_b'].nlargest(10),
+        'rute_by_kategori': parsial['kategori'].sort_values(ascending=False),
+        # Tab 4: hub
+        'network': network,
+        'set_a': set_a,
+        'set_b': set_b,
+        'hub_counts': hub_counts,
+        'hub_analysis_df': hub_analysis_df,
+    }
+
+
+def halte_aggregates(halte_df):
+    """
+    Agregat tab 1 (distribusi halte) dari satu sumber halte.
+    """
+    return halte_aggregates_from_partial(_parsial_halte(halte_df))
+
+
+def bus_aggregates(bus_penumpang_df):
+    """
+    Agregat tab 2 (penumpang & bus) dan tab 6 (tren, korelasi) dari sumber bus/penumpang.
+    """
+    return bus_aggregates_from_partial(_parsial_bus(bus_penumpang_df), bus_penumpang_df)
+
+
+def rute_aggregates(rute_df):
+    """
+    Agregat tab 3 (jaringan rute) dan tab 4 (hub) dari sumber rute.
+    """
+    return rute_aggregates_from_partial(_parsial_rute(rute_df), rute_df)
+
+
+def build_aggregates(halte_df, bus_penumpang_df, rute_df):
+    """
+    Menghitung seluruh agregat dashboard dalam satu kali jalan.
+
+    Mengembalikan dict berisi hasil per tab; nilai-nilainya diperlakukan
+    sebagai read-only oleh pemanggil.
+    """
+    return {
+        **halte_aggregates(halte_df),
+        **bus_aggregates(bus_penumpang_df),
+        **rute_aggregates(rute_df),
+    }
+
+
+def get_aggregates(fingerprint, halte_df, bus_penumpang_df, rute_df):
+    """
+    Versi ter-memo dari build_aggregates, dikunci pada sidik jari dataset.
+    """
+    def hitung():
+        agg = build_aggregates(halte_df, bus_penumpang_df, rute_df)
+        # Disertakan agar kunci cache turunan (mis. grafik) bisa memakainya
+        agg['fingerprint'] = fingerprint
+        return agg
+
+    return _memo.get_or_compute(fingerprint, hitung)
+
+
+def get_store_aggregates(store, bus_penumpang_df, rute_df):
+    """
+    Seperti get_aggregates untuk data dari transjakarta.store.PartitionedStore,
+    tetapi diperbarui secara inkremental: hanya sumber yang versinya berubah
+    yang dihitung ulang, dan hitungan/jumlah yang dapat dijumlahkan (tab 1, 2,
+    3, dan tren tahunan) digabung dari parsial per file sehingga hanya file
+    baru atau berubah yang dihitung. Graf jaringan dan regresi dihitung ulang
+    dari seluruh baris sumbernya (`rute_df`, `bus_penumpang_df`). Agregat
+    halte sepenuhnya dirakit dari parsial per file, yang masing-masing
+    dinormalisasi (normalize_coordinates) saat dibaca dari store.
+    """
+    def parsial_halte(df):
+        return _parsial_halte(normalize_coordinates(df)[0])
+
+    rakit = {
+        'halte': (parsial_halte, lambda p: halte_aggregates_from_partial(p)),
+        'bus_penumpang': (_parsial_bus, lambda p: bus_aggregates_from_partial(p, bus_penumpang_df)),
+        'rute': (_parsial_rute, lambda p: rute_aggregates_from_partial(p, rute_df)),
+    }
+
+    def agregat_sumber(nama):
+        buat_parsial, akhiri = rakit[nama]
+        parsial = [
+            _memo_parsial.get_or_compute(
+                (nama, entri['key']), lambda f=fname: buat_parsial(store.read(nama, file=f))
+            )
+            for fname, entri in store.entries(nama)
+        ]
+        return akhiri(_gabung_parsial(parsial))
+
+    def hitung():
+        agg = {}
+        for nama in rakit:
+            agg.update(_memo_sumber.get_or_compute((nama, store.version(nama)), lambda n=nama: agregat_sumber(n)))
+        agg['fingerprint'] = fingerprint
+        return agg
+
+    fingerprint = store.fingerprint()
+    return _memo.get_or_compute(fingerprint, hitung)
+
+
+def clear_memo():
+    _memo.clear()
+    _memo_sumber.clear()
+    _memo_parsial.clear()
@@ -0,0 +1,312 @@
+"""
+Lapisan render grafik dengan cache gambar dan siklus hidup figure yang eksplisit.
+
+Grafik digambar pada matplotlib.figure.Figure yang dibuat langsung (tidak
+melalui pyplot), sehingga tidak pernah masuk ke registri figure global
+pyplot. Figure dirender menjadi PNG/SVG sekali per kunci (sidik jari data +
+parameter), dibersihkan, lalu byte-nya disimpan dalam LRU yang dibatasi
+jumlah entri dan total ukuran.
+
+Matplotlib, seaborn, dan matplotlib_venn baru diimpor saat grafik pertama
+benar-benar digambar, sehingga rerun yang seluruh grafiknya sudah ada di
+cache (dan bagian tanpa grafik) tidak membayar biaya impornya.
+"""
+
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+from transjakarta.profiling import span
+
+
+# Opsi simpan yang sama dengan bawaan st.pyplot
+SAVEFIG_OPTIONS = {'bbox_inches': 'tight', 'dpi': 200}
+
+# Lebar konten maksimum Streamlit. PNG yang lebih lebar akan di-decode,
+# diperkecil, dan di-encode ulang oleh st.image pada setiap rerun, sehingga
+# gambar langsung dirender tidak melebihi lebar ini.
+MAKS_LEBAR_PX = 2 * 730
+
+
+def _lebar_png(data):
+    # Lebar tersimpan di header IHDR (byte 16-20, big-endian)
+    return int.from_bytes(data[16:20], 'big')
+
+
+_gaya_diterapkan = False
+
+
+def apply_style():
+    """
+    Pengaturan tema dan ukuran font untuk grafik Matplotlib.
+    Dipanggil otomatis oleh render_figure sebelum grafik pertama digambar.
+    """
+    global _gaya_diterapkan
+    import matplotlib
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    matplotlib.rcParams['figure.figsize'] = (10, 6)
+    matplotlib.rcParams['font.family'] = 'sans-serif'
+    matplotlib.rcParams['axes.labelsize'] = 14  # Ukuran font label sumbu X dan Y
+    matplotlib.rcParams['xtick.labelsize'] = 12  # Ukuran font tick sumbu X
+    matplotlib.rcParams['ytick.labelsize'] = 12  # Ukuran font tick sumbu Y
+    matplotlib.rcParams['axes.titlesize'] = 18  # Ukuran font judul grafik
+    matplotlib.rcParams['legend.fontsize'] = 14  # Ukuran font legenda
+    _gaya_diterapkan = True
+
+
+def render_figure(draw, figsize=None, fmt='png'):
+    """
+    Membuat figure baru, memanggil `draw(fig, ax)`, lalu mengembalikan byte
+    gambar hasil render. Figure selalu dibersihkan, termasuk bila `draw` gagal.
+    """
+    from matplotlib.figure import Figure
+
+    if not _gaya_diterapkan:
+        apply_style()
+    fig = Figure(figsize=figsize)
+    try:
+        with span("gambar figure", 'render'):
+            ax = fig.subplots()
+            draw(fig, ax)
+        with span(f"encode {fmt}", 'render'):
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt, **SAVEFIG_OPTIONS)
+            data = buf.getvalue()
+            if fmt == 'png' and _lebar_png(data) > MAKS_LEBAR_PX:
+                dpi = SAVEFIG_OPTIONS['dpi'] * MAKS_LEBAR_PX / _lebar_png(data)
+                buf = io.BytesIO()
+                fig.savefig(buf, format=fmt, **{**SAVEFIG_OPTIONS, 'dpi': int(dpi)})
+                data = buf.getvalue()
+        return data
+    finally:
+        fig.clear()
+
+
+def _jumlah_figure_pyplot():
+    # pyplot tidak diimpor hanya untuk menghitung figure
+    plt = sys.modules.get('matplotlib.pyplot')
+    return len(plt.get_fignums()) if plt is not None else 0
+
+
+class ChartCache:
+    """
+    LRU byte gambar grafik, dibatasi jumlah entri dan total byte.
+    Aman dipakai bersama oleh banyak sesi dalam satu proses.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, key, draw, figsize=None, fmt='png'):
+        key = (key, figsize, fmt)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        data = render_figure(draw, figsize=figsize, fmt=fmt)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = data
+                self._bytes += len(data)
+                self._evict()
+        return data
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, data = self._entries.popitem(last=False)
+            self._bytes -= len(data)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+                # Harus tetap 0: figure cache tidak pernah terdaftar di pyplot
+                'open_pyplot_figures': _jumlah_figure_pyplot(),
+            }
+
+
+class ChartSpec:
+    """
+    Definisi satu grafik: fungsi penggambar tingkat modul beserta argumennya
+    dan ukuran figure. Dipanggil sebagai draw(fig, ax) oleh render_figure dan,
+    karena tidak memuat lambda, dapat dikirim ke proses pekerja (pickle).
+    """
+
+    def __init__(self, fungsi, *args, figsize=None, pakai_fig=False, **kwargs):
+        self.fungsi = fungsi
+        self.args = args
+        self.kwargs = kwargs
+        self.figsize = figsize
+        self.pakai_fig = pakai_fig
+
+    def __call__(self, fig, ax):
+        if self.pakai_fig:
+            return self.fungsi(fig, ax, *self.args, **self.kwargs)
+        return self.fungsi(ax, *self.args, **self.kwargs)
+
+
+# --- Fungsi penggambar grafik dashboard ---
+
+def draw_bar(ax, series, palette, xlabel, despine=None):
+    """
+    Bar horizontal dari Series (indeks sebagai label, nilai sebagai panjang bar).
+    """
+    import seaborn as sns
+
+    labels = [str(i) for i in series.index]
+    sns.barplot(x=series.values, y=labels, hue=labels, palette=palette, legend=False, ax=ax)
+    ax.set_xlabel(xlabel); ax.set_ylabel('')
+    sns.despine(ax=ax, **(despine or {}))
+
+
+def draw_venn(ax, set_a, set_b):
+    from matplotlib_venn import venn2
+
+    v = venn2([set(set_a), set(set_b)], set_labels=('Keberangkatan (A)', 'Tujuan (B)'), ax=ax)
+
+    for text in v.subset_labels:
+        if text:
+            text.set_fontsize(20)
+    for text in v.set_labels:
+        if text:
+            text.set_fontsize(16)
+
+
+def draw_trend(ax, yearly_df, y, ylabel):
+    import seaborn as sns
+    from matplotlib.ticker import MaxNLocator
+
+    sns.lineplot(data=yearly_df, x='periode_data', y=y, hue='jenis_layanan', marker='o', ax=ax)
+    ax.set_title("")
+    ax.set_xlabel("Tahun")
+    ax.set_ylabel(ylabel)
+    ax.xaxis.set_major_locator(MaxNLocator(integer=True))
+    ax.legend(title='Jenis Layanan', loc='upper right', fontsize='medium')
+    sns.despine(ax=ax)
+
+
+def draw_correlation(fig, ax, bus_penumpang_df, fit):
+    """
+    Scatter bus vs penumpang per layanan dengan garis regresi dan pita
+    kepercayaan yang sudah dihitung oleh transjakarta.regression.fit_line.
+    """
+    import seaborn as sns
+
+    # Siapkan data dengan nama kolom baru untuk judul legenda
+    corr_plot_df = bus_penumpang_df.rename(columns={
+        'jenis_layanan': 'Jenis Layanan',
+        'jumlah_penumpang': 'Jumlah Penumpang'
+    })
+
+    # Garis regresi digambar lebih dulu
+    if fit is not None:
+        ax.fill_between(fit['x_grid'], fit['ci_low'], fit['ci_high'], color='darkred', alpha=0.15, linewidth=0)
+        ax.plot(fit['x_grid'], fit['y_hat'], color='darkred', linestyle='--')
+
+    # Lalu scatter plot di atasnya
+    sns.scatterplot(
+        data=corr_plot_df,
+        x="jumlah_bus",
+        y="Jumlah Penumpang",
+        hue="Jenis Layanan",
+        size="Jumlah Penumpang",
+        sizes=(30, 400),
+        ax=ax,
+        palette="viridis"
+    )
+
+    ax.set_xlabel("Jumlah Bus", fontsize=10)
+    ax.set_ylabel("Jumlah Penumpang", fontsize=10)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc=2, fontsize='medium')
+
+    ax.grid(which='major', linestyle='-', linewidth='0.7', color='gray')
+
+    fig.tight_layout()
+
+
+def draw_coverage(fig, ax, raster, halte_lat, halte_lon, ambang_km):
+    """
+    Peta panas jarak ke halte terdekat dengan kontur ambang celah layanan.
+    """
+    bbox = raster['bbox']
+    extent = (bbox['lon_min'], bbox['lon_max'], bbox['lat_min'], bbox['lat_max'])
+    im = ax.imshow(
+        raster['jarak'], origin='lower', extent=extent, cmap='YlOrRd',
+        vmin=0, vmax=max(3 * ambang_km, 1.0), aspect='auto', interpolation='nearest'
+    )
+    ax.contour(raster['lon'], raster['lat'], raster['jarak'], levels=[ambang_km], colors='black', linewidths=0.8)
+    ax.scatter(halte_lon, halte_lat, s=6, color='navy', alpha=0.7, label='Halte')
+    fig.colorbar(im, ax=ax, label='Jarak ke halte terdekat (km)')
+    ax.set_xlabel('Bujur'); ax.set_ylabel('Lintang')
+    ax.legend(loc='upper right', fontsize='small')
+    ax.grid(False)
+
+
+def dashboard_charts(agg, bus_penumpang_df=None, yearly_df=None):
+    """
+    Katalog grafik dashboard (nama -> ChartSpec) dari hasil transjakarta.analytics.
+    Dipakai bersama oleh aplikasi Streamlit dan laporan batch agar parameter
+    grafik hanya didefinisikan di satu tempat.
+
+    `yearly_df` menggantikan agg['yearly_df'] untuk grafik tren (mis. hasil
+    filter layanan); grafik korelasi hanya disertakan bila `bus_penumpang_df` diberikan.
+    """
+    yearly_df = agg['yearly_df'] if yearly_df is None else yearly_df
+    tanpa_garis = dict(left=True, bottom=True)
+    grafik = {
+        'halte_wilayah': ChartSpec(draw_bar, agg['halte_by_wilayah'], 'Blues_r', 'Jumlah Halte', despine=tanpa_garis),
+        'halte_kecamatan': ChartSpec(draw_bar, agg['halte_by_kecamatan'], 'Greens_r', 'Jumlah Halte', despine=tanpa_garis),
+        'rasio_penumpang_bus': ChartSpec(
+            draw_bar, agg['ratio_df']['Penumpang per Bus'], 'rocket_r', 'Rata-rata Penumpang Dilayani per Bus',
+            figsize=(10, 6)
+        ),
+        'top_titik_a': ChartSpec(draw_bar, agg['top_titik_a'], 'Purples_r', 'Jumlah Rute'),
+        'top_titik_b': ChartSpec(draw_bar, agg['top_titik_b'], 'Oranges_r', 'Jumlah Rute'),
+        'venn_hub': ChartSpec(draw_venn, agg['set_a'], agg['set_b']),
+        'top_hub': ChartSpec(
+            draw_bar, agg['hub_counts'], 'viridis', 'Total Frekuensi sebagai Titik Awal & Akhir', figsize=(10, 8)
+        ),
+        'tren_penumpang': ChartSpec(draw_trend, yearly_df, 'jumlah_penumpang', "Jumlah Penumpang", figsize=(10, 8)),
+        'tren_bus': ChartSpec(draw_trend, yearly_df, 'jumlah_bus', "Rata-rata Jumlah Bus", figsize=(10, 8)),
+    }
+    if bus_penumpang_df is not None:
+        grafik['korelasi'] = ChartSpec(
+            draw_correlation, bus_penumpang_df, agg['korelasi']['fit'], figsize=(8, 6), pakai_fig=True
+        )
+    return grafik
+
+
+def coverage_chart(raster, halte_df, ambang_km):
+    """
+    ChartSpec peta panas celah cakupan untuk satu ambang jarak.
+    """
+    return ChartSpec(
+        draw_coverage, raster, halte_df['lat'].to_numpy(), halte_df['lon'].to_numpy(), ambang_km,
+        figsize=(9, 9), pakai_fig=True
+    )
@@ -0,0 +1,235 @@
+"""
+Pipeline chat Analis AI: prompt tetap, riwayat berukuran terbatas,
+respons streaming, dan cache respons exact-match.
+
+- Template prompt dibangun sekali per proses saat pertama dibutuhkan
+  (get_prompt), bukan per pertanyaan.
+- Riwayat percakapan diformat sebagai teks "Pengguna:/Analis AI:" dan
+  dipangkas ke anggaran token: pesan terbaru disertakan utuh, pesan yang
+  lebih lama diringkas menjadi daftar pertanyaan sebelumnya.
+- Respons dialirkan per potongan (chain.stream) sehingga teks pertama
+  tampil tanpa menunggu jawaban lengkap.
+- Pertanyaan yang sama dengan dataset, konteks, dan riwayat yang sama
+  dilayani dari cache LRU tanpa memanggil model.
+
+Riwayat disimpan sebagai dict {'role': 'Human' | 'AI', 'content': str}
+sehingga dashboard dapat menampilkannya tanpa mengimpor LangChain;
+langchain_core baru diimpor saat pertanyaan pertama dikirim ke model.
+
+Modul ini tidak bergantung pada Streamlit; model apa pun yang
+kompatibel dengan LangChain (termasuk model palsu untuk pengujian luring)
+dapat dipakai.
+"""
+
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+from transjakarta.context import KARAKTER_PER_TOKEN, estimate_tokens
+from transjakarta.profiling import iterate, span
+
+
+# Anggaran bawaan riwayat percakapan di dalam prompt (perkiraan token)
+ANGGARAN_TOKEN_RIWAYAT = 600
+
+# Porsi anggaran riwayat untuk ringkasan pesan lama
+PORSI_RINGKASAN = 0.25
+
+# Panjang maksimum satu pertanyaan lama di dalam ringkasan (karakter)
+MAKS_KARAKTER_RINGKASAN = 80
+
+TEMPLATE_PROMPT = """
+    Anda adalah "Analis AI", seorang ahli analis data transportasi publik yang berspesialisasi dalam sistem Transjakarta.
+    Anda sedang berdiskusi dengan seorang pengguna yang melihat dashboard interaktif.
+    Berdasarkan konteks data yang telah dianalisis dan riwayat percakapan, berikan jawaban yang mendalam dan rekomendasi yang dapat ditindaklanjuti.
+
+    Konteks Hasil Analisis Data:
+    {data_context}
+
+    Riwayat Percakapan:
+    {chat_history}
+
+    Pertanyaan Pengguna:
+    {user_question}
+    """
+
+
+@functools.cache
+def get_prompt():
+    """
+    PromptTemplate Analis AI, dibangun sekali per proses.
+    """
+    from langchain_core.prompts import PromptTemplate
+
+    return PromptTemplate(
+        input_variables=["data_context", "chat_history", "user_question"],
+        template=TEMPLATE_PROMPT
+    )
+
+
+def _baris(message):
+    peran = "Pengguna" if message['role'] == 'Human' else "Analis AI"
+    return f"{peran}: {message['content']}"
+
+
+def format_history(messages, anggaran_token=ANGGARAN_TOKEN_RIWAYAT):
+    """
+    Riwayat percakapan sebagai teks dalam batas `anggaran_token`.
+
+    Pesan diambil dari yang terbaru; begitu anggaran (dikurangi porsi
+    ringkasan) habis, pertanyaan pengguna yang lebih lama diringkas dalam
+    satu baris, dipotong bila ringkasan itu sendiri melebihi porsinya.
+    """
+    sisa = int(anggaran_token * KARAKTER_PER_TOKEN * (1 - PORSI_RINGKASAN))
+    terbaru = []
+    i = len(messages)
+    while i > 0:
+        baris = _baris(messages[i - 1])
+        if len(baris) + 1 > sisa:
+            break
+        terbaru.append(baris)
+        sisa -= len(baris) + 1
+        i -= 1
+    terbaru.reverse()
+
+    lama = [m for m in messages[:i] if m['role'] == 'Human']
+    if not lama:
+        return "\n".join(terbaru)
+
+    porsi = int(anggaran_token * KARAKTER_PER_TOKEN * PORSI_RINGKASAN) + sisa
+    kepala = f"(Ringkasan {i} pesan sebelumnya. Pertanyaan pengguna: "
+    # Pertanyaan lama yang paling baru lebih relevan, jadi diisi dari belakang
+    potongan, panjang = [], len(kepala) + 1
+    for m in reversed(lama):
+        teks = m['content']
+        if len(teks) > MAKS_KARAKTER_RINGKASAN:
+            teks = teks[:MAKS_KARAKTER_RINGKASAN - 3] + "..."
+        if panjang + len(teks) + 2 > porsi:
+            break
+        potongan.append(teks)
+        panjang += len(teks) + 2
+    if not potongan:
+        return "\n".join(terbaru)
+    ringkasan = kepala + "; ".join(reversed(potongan)) + ")"
+    return "\n".join([ringkasan] + terbaru)
+
+
+def _teks(chunk):
+    """
+    Isi teks potongan pesan (model tertentu mengirim daftar bagian, bukan string).
+    """
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(b if isinstance(b, str) else b.get('text', '') for b in content)
+
+
+class ResponseCache:
+    """
+    LRU exact-match teks jawaban, dibatasi jumlah entri.
+    Aman dipakai bersama oleh banyak sesi dalam satu proses.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(kunci_dataset, pertanyaan, data_context, chat_history):
+        """
+        Kunci cache: sidik jari dataset, pertanyaan yang dinormalisasi
+        (huruf kecil, spasi dirapikan), serta teks konteks dan riwayat
+        yang benar-benar dikirim ke model.
+        """
+        h = hashlib.sha1()
+        for bagian in (str(kunci_dataset), " ".join(pertanyaan.lower().split()), data_context, chat_history):
+            h.update(bagian.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, jawaban):
+        with self._lock:
+            self._entries[key] = jawaban
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+
+def stream_response(model, pertanyaan, riwayat, data_context, cache=None, kunci_dataset=None,
+                    anggaran_riwayat=ANGGARAN_TOKEN_RIWAYAT):
+    """
+    Generator potongan teks jawaban untuk st.write_stream.
+
+    `riwayat` adalah pesan sebelum pertanyaan ini. Jawaban yang selesai
+    dialirkan disimpan ke `cache`; bila pertanyaan yang sama sudah ada di
+    cache, jawaban dikirim langsung tanpa memanggil model.
+    """
+    with span("susun riwayat", 'hitung') as catatan:
+        chat_history = format_history(riwayat, anggaran_riwayat)
+        key = None
+        jawaban = None
+        if cache is not None:
+            key = ResponseCache.key(kunci_dataset, pertanyaan, data_context, chat_history)
+            jawaban = cache.get(key)
+        catatan['cache'] = 'hit' if jawaban is not None else 'miss'
+    if jawaban is not None:
+        yield jawaban
+        return
+
+    potongan = []
+    aliran = (get_prompt() | model).stream({
+        "data_context": data_context,
+        "chat_history": chat_history,
+        "user_question": pertanyaan
+    })
+    for chunk in iterate("stream model", 'llm', aliran):
+        teks = _teks(chunk)
+        if teks:
+            potongan.append(teks)
+            yield teks
+
+    # Hanya jawaban lengkap yang disimpan (generator yang dihentikan tidak sampai ke sini)
+    if cache is not None and potongan:
+        cache.put(key, "".join(potongan))
+
+
+def prompt_tokens(pertanyaan, riwayat, data_context, anggaran_riwayat=ANGGARAN_TOKEN_RIWAYAT):
+    """
+    Perkiraan ukuran prompt lengkap (token) untuk satu pertanyaan.
+    """
+    return estimate_tokens(get_prompt().format(
+        data_context=data_context,
+        chat_history=format_history(riwayat, anggaran_riwayat),
+        user_question=pertanyaan,
+    ))
+
@@ -0,0 +1,282 @@
+"""
+Konteks data untuk chatbot yang diturunkan dari agregat dashboard.
+
+Menggantikan paragraf konteks statis: setiap bagian analisis (halte,
+efisiensi, jaringan, hub, tren, korelasi) diringkas menjadi satu baris
+ringkasan dan beberapa baris rincian berisi angka yang benar-benar
+dihitung. Bagian-bagian ini dibangun sekali per sidik jari dataset.
+Untuk setiap pertanyaan, hanya rincian bagian yang relevan yang disertakan
+dan total teks dibatasi anggaran token, sehingga ukuran prompt (dan
+latensi serta biaya LLM) tetap dapat diperkirakan.
+"""
+
+import math
+
+from transjakarta.memo import FingerprintMemo
+
+
+# Perkiraan kasar panjang token untuk teks campuran Indonesia/angka
+KARAKTER_PER_TOKEN = 4
+
+# Anggaran bawaan teks konteks per pertanyaan (perkiraan token)
+ANGGARAN_TOKEN_KONTEKS = 800
+
+# Kata kunci pertanyaan -> bagian yang relevan
+KATA_KUNCI = {
+    'halte': ('halte', 'wilayah', 'kecamatan', 'sebaran', 'distribusi', 'cakupan', 'terlayani', 'area', 'peta'),
+    'efisiensi': ('efisien', 'rasio', 'padat', 'penumpang per bus', 'armada', 'kapasitas', 'beban'),
+    'jaringan': ('rute', 'jaringan', 'trayek', 'pengumpan', 'feeder', 'keberangkatan', 'tujuan', 'transit'),
+    'hub': ('hub', 'simpul', 'tipologi', 'terminal', 'transit', 'pagerank', 'betweenness', 'sentral'),
+    'tren': ('tren', 'tahun', 'pertumbuhan', 'naik', 'turun', 'meningkat', 'menurun', 'fluktuasi', 'perubahan', 'bandingkan'),
+    'korelasi': ('korelasi', 'hubungan', 'pengaruh', 'regresi', 'efektif', 'penambahan bus', 'tambah bus'),
+    'filter': ('filter', 'pilihan', 'dipilih', 'saring'),
+}
+
+# Sumber data yang mendasari setiap bagian; bagian dilewati bila sumbernya
+# tidak memiliki baris untuk filter aktif (agg['kosong'], lihat transjakarta.cube)
+SUMBER_BAGIAN = {
+    'halte': 'halte', 'efisiensi': 'bus_penumpang', 'jaringan': 'rute',
+    'hub': 'rute', 'tren': 'bus_penumpang', 'korelasi': 'bus_penumpang',
+}
+
+_memo = FingerprintMemo(max_entries=8)
+
+
+def estimate_tokens(teks):
+    """
+    Perkiraan jumlah token dari panjang karakter.
+    """
+    return math.ceil(len(teks) / KARAKTER_PER_TOKEN)
+
+
+def _angka(x):
+    """
+    Bilangan besar dalam format ringkas (rb, jt, M).
+    """
+    for batas, akhiran in ((1e9, ' M'), (1e6, ' jt'), (1e3, ' rb')):
+        if abs(x) >= batas:
+            return f"{x / batas:.1f}{akhiran}"
+    return f"{x:,.0f}"
+
+
+def _alias_wilayah(nama):
+    return nama.replace('Kota Adm. ', '').replace('Kab. ', '').replace('Kota ', '')
+
+
+def _bagian(nama, judul, ringkas, rinci, entitas=()):
+    return {
+        'nama': nama,
+        'judul': judul,
+        'ringkas': ringkas,
+        'rinci': list(rinci),
+        'kata_kunci': KATA_KUNCI[nama],
+        'entitas': frozenset(e.lower() for e in entitas if e),
+    }
+
+
+def _tidak_tersedia(nama, judul):
+    """
+    Bagian pengganti bila data sumbernya kosong (mis. periode tanpa baris).
+    """
+    return _bagian(nama, judul, "Data tidak tersedia.", [])
+
+
+def _halte(agg):
+    per_wilayah = agg['halte_by_wilayah']
+    total = int(per_wilayah.sum())
+    if not total:
+        return _tidak_tersedia('halte', "Distribusi Halte")
+    kecamatan = agg['halte_by_kecamatan']
+    ringkas = (
+        f"{total} halte; terbanyak di {per_wilayah.index[0]} ({per_wilayah.iloc[0]}), "
+        f"tersedikit di {per_wilayah.index[-1]} ({per_wilayah.iloc[-1]})."
+    )
+    rinci = [f"- {w}: {n} halte ({n / total:.0%})" for w, n in per_wilayah.items()]
+    rinci.append("- Kecamatan terbanyak: " + ", ".join(f"{k} ({n})" for k, n in kecamatan.items()))
+    # Nama pendek ("Jakarta Timur") dipakai untuk mencocokkan pertanyaan
+    entitas = [_alias_wilayah(w) for w in per_wilayah.index] + list(kecamatan.index)
+    return _bagian('halte', "Distribusi Halte", ringkas, rinci, entitas)
+
+
+def _efisiensi(agg):
+    ratio_df = agg['ratio_df']
+    if ratio_df.empty:
+        return _tidak_tersedia('efisiensi', "Efisiensi Layanan (total seluruh periode)")
+    ringkas = (
+        f"Penumpang per bus tertinggi: {ratio_df.index[0]} ({ratio_df['Penumpang per Bus'].iloc[0]:,.0f}); "
+        f"terendah: {ratio_df.index[-1]} ({ratio_df['Penumpang per Bus'].iloc[-1]:,.0f})."
+    )
+    rinci = [
+        f"- {layanan}: {baris['Penumpang per Bus']:,.0f} penumpang/bus "
+        f"({_angka(baris['Total Penumpang'])} penumpang, {baris['Total Bus']:,.0f} bus)"
+        for layanan, baris in ratio_df.iterrows()
+    ]
+    return _bagian('efisiensi', "Efisiensi Layanan (total seluruh periode)", ringkas, rinci, ratio_df.index)
+
+
+def _jaringan(agg):
+    kategori = agg['rute_by_kategori']
+    network = agg['network']
+    if not int(kategori.sum()):
+        return _tidak_tersedia('jaringan', "Jaringan Rute")
+    ringkas = (
+        f"{int(kategori.sum())} rute antar {network.n} lokasi; kategori terbanyak: "
+        + ", ".join(f"{k} ({n})" for k, n in kategori.head(3).items()) + "."
+    )
+    rinci = [
+        "- Rute per kategori: " + ", ".join(f"{k} ({n})" for k, n in kategori.items()),
+        "- Titik keberangkatan terbanyak: " + ", ".join(f"{k} ({n})" for k, n in agg['top_titik_a'].head(5).items()),
+        "- Titik tujuan terbanyak: " + ", ".join(f"{k} ({n})" for k, n in agg['top_titik_b'].head(5).items()),
+    ]
+    if network.n:
+        transit = network.transfer_distribution()
+        rinci.append(
+            "- Transit minimum antar pasangan lokasi: "
+            + ", ".join(f"{label} {p:.0%}" for label, p in transit['Proporsi'].items())
+        )
+    entitas = list(kategori.index) + list(agg['top_titik_a'].index) + list(agg['top_titik_b'].index)
+    return _bagian('jaringan', "Jaringan Rute", ringkas, rinci, entitas)
+
+
+def _hub(agg, maks_hub=10):
+    hub_df = agg['hub_analysis_df'].head(maks_hub)
+    if hub_df.empty:
+        return _tidak_tersedia('hub', "Hub Transit")
+    ringkas = "Hub utama: " + ", ".join(f"{h} ({t})" for h, t in zip(hub_df['Hub'].head(4), hub_df['Tipologi'].head(4))) + "."
+    rinci = [
+        f"- {b['Hub']}: masuk {b['Rute_Masuk']}, keluar {b['Rute_Keluar']}, {b['Tipologi']}, "
+        f"PageRank {b['PageRank']:.3f}, betweenness {b['Betweenness']:.3f}"
+        for b in hub_df.to_dict('records')
+    ]
+    return _bagian('hub', "Hub Transit", ringkas, rinci, agg['hub_analysis_df']['Hub'])
+
+
+def _tren(agg):
+    yearly_df = agg['yearly_df']
+    per_tahun = yearly_df.groupby('periode_data')['jumlah_penumpang'].sum()
+    if per_tahun.empty:
+        return _tidak_tersedia('tren', "Tren Tahunan")
+    awal, akhir = per_tahun.index.min(), per_tahun.index.max()
+
+    def perubahan(a, b):
+        return f"{(b - a) / a:+.1%}" if a else "n/a"
+
+    ringkas = (
+        f"Total penumpang {awal}: {_angka(per_tahun[awal])}, {akhir}: {_angka(per_tahun[akhir])} "
+        f"({perubahan(per_tahun[awal], per_tahun[akhir])})."
+    )
+    rinci = ["- Total penumpang per tahun: " + ", ".join(f"{t}: {_angka(v)}" for t, v in per_tahun.items())]
+    tabel = yearly_df.pivot_table(index='jenis_layanan', columns='periode_data', values=['jumlah_penumpang', 'jumlah_bus'])
+    for layanan, baris in tabel.iterrows():
+        p0, p1 = baris[('jumlah_penumpang', awal)], baris[('jumlah_penumpang', akhir)]
+        b0, b1 = baris[('jumlah_bus', awal)], baris[('jumlah_bus', akhir)]
+        if p0 == p0 and p1 == p1:  # lewati layanan yang tidak ada di tahun awal/akhir (NaN)
+            rinci.append(
+                f"- {layanan} {awal}->{akhir}: penumpang {_angka(p0)} -> {_angka(p1)} ({perubahan(p0, p1)}), "
+                f"rata-rata bus {b0:,.0f} -> {b1:,.0f}"
+            )
+    return _bagian('tren', "Tren Tahunan", ringkas, rinci, list(tabel.index) + [str(t) for t in per_tahun.index])
+
+
+def _korelasi(agg):
+    fit = agg['korelasi']['fit']
+    koef = agg['korelasi']['koefisien']
+    ringkas = "Korelasi jumlah bus dan penumpang"
+    if 'Semua Layanan' in koef.index:
+        semua = koef.loc['Semua Layanan']
+        ringkas += f" (semua layanan): Pearson {semua['Pearson']:.2f}, Spearman {semua['Spearman']:.2f}"
+    if fit is not None:
+        ringkas += f"; regresi: +{fit['slope']:,.0f} penumpang per tambahan 1 bus (R² {fit['r2']:.2f})"
+    rinci = [
+        f"- {layanan}: Pearson {b['Pearson']:.2f}, Spearman {b['Spearman']:.2f} (n={int(b['Jumlah Data'])})"
+        for layanan, b in koef.iterrows()
+        if layanan != 'Semua Layanan' and b['Pearson'] == b['Pearson']
+    ]
+    return _bagian('korelasi', "Korelasi Bus-Penumpang", ringkas + ".", rinci, koef.index)
+
+
+def _filter(agg):
+    filter_ = agg['filter']
+    ringkas = "Angka di bawah hanya untuk data yang difilter: " + "; ".join(
+        f"{d} = {', '.join(map(str, nilai))}" for d, nilai in filter_.items()
+    ) + "."
+    kosong = [f"- Tidak ada data {nama} untuk filter ini." for nama in agg.get('kosong', ())]
+    return _bagian('filter', "Filter Aktif", ringkas, kosong)
+
+
+def build_sections(agg):
+    """
+    Semua bagian konteks (urutan tetap) dari hasil transjakarta.analytics
+    atau transjakarta.cube. Bila ada filter aktif, bagian "Filter Aktif"
+    didahulukan dan bagian yang sumbernya kosong dilewati.
+    """
+    kosong = set(agg.get('kosong', ()))
+    bagian = [_filter(agg)] if agg.get('filter') else []
+    for nama, pembangun in (('halte', _halte), ('efisiensi', _efisiensi), ('jaringan', _jaringan),
+                            ('hub', _hub), ('tren', _tren), ('korelasi', _korelasi)):
+        if SUMBER_BAGIAN[nama] not in kosong:
+            bagian.append(pembangun(agg))
+    return bagian
+
+
+def get_sections(agg):
+    """
+    Versi ter-memo dari build_sections, dikunci pada sidik jari dataset agregat.
+    """
+    return _memo.get_or_compute(agg['fingerprint'], lambda: build_sections(agg))
+
+
+def _skor(bagian, pertanyaan):
+    # Kata kunci menunjukkan topik pertanyaan, sehingga diberi bobot lebih besar
+    # daripada nama entitas (wilayah, layanan, hub) yang bisa muncul di beberapa bagian
+    skor = 2 * sum(kata in pertanyaan for kata in bagian['kata_kunci'])
+    skor += sum(entitas in pertanyaan for entitas in bagian['entitas'])
+    return skor
+
+
+def select_context(sections, pertanyaan, anggaran_token=ANGGARAN_TOKEN_KONTEKS):
+    """
+    Menyusun teks konteks untuk satu pertanyaan dalam batas `anggaran_token`.
+
+    Ringkasan satu baris setiap bagian disertakan lebih dulu (bagian yang
+    relevan didahulukan), lalu sisa anggaran diisi baris rincian bagian yang
+    relevan menurut urutan skornya. Bila tidak ada bagian yang cocok
+    (pertanyaan umum), rincian semua bagian diisi menurut urutan bawaan.
+    """
+    pertanyaan = (pertanyaan or '').lower()
+    skor = {b['nama']: _skor(b, pertanyaan) for b in sections}
+    relevan = sorted((b for b in sections if skor[b['nama']] > 0), key=lambda b: -skor[b['nama']])
+    urutan = relevan + [b for b in sections if skor[b['nama']] == 0]
+    sumber_rinci = relevan or sections
+
+    sisa = anggaran_token * KARAKTER_PER_TOKEN
+    terpilih = {}
+    terpotong = False
+    for b in urutan:
+        kepala = f"## {b['judul']}\n{b['ringkas']}\n\n"
+        if len(kepala) > sisa:
+            terpotong = True
+            continue
+        terpilih[b['nama']] = []
+        sisa -= len(kepala)
+    for b in sumber_rinci:
+        if b['nama'] not in terpilih:
+            continue
+        for baris in b['rinci']:
+            if len(baris) + 1 > sisa:
+                terpotong = True
+                break
+            terpilih[b['nama']].append(baris)
+            sisa -= len(baris) + 1
+
+    blok = []
+    for b in sections:
+        if b['nama'] in terpilih:
+            blok.append("\n".join([f"## {b['judul']}", b['ringkas'], *terpilih[b['nama']]]))
+    teks = "\n\n".join(blok)
+    return {
+        'teks': teks,
+        'perkiraan_token': estimate_tokens(teks),
+        'bagian_rinci': [b['judul'] for b in sumber_rinci if terpilih.get(b['nama'])],
+        'terpotong': terpotong,
+    }
@@ -0,0 +1,86 @@
+"""
+Normalisasi koordinat halte secara tervektorisasi.
+
+Koordinat pada data sumber ditulis sebagai bilangan bulat tanpa titik desimal
+dengan jumlah digit yang tidak konsisten (mis. 10681992, 106818661, 1068558651
+untuk bujur ~106.8). Skala tiap nilai dideteksi dari jumlah digitnya terhadap
+jumlah digit derajat yang diharapkan untuk kolom tersebut, lalu hasilnya
+diperiksa terhadap batas wilayah Jakarta. Baris yang ditolak dikembalikan
+beserta alasannya.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Batas wilayah yang dipakai sejak versi awal dashboard (Jakarta dan sekitarnya)
+JAKARTA_BBOX = {
+    'lat_min': -6.5,
+    'lat_max': -6.0,
+    'lon_min': 106.6,
+    'lon_max': 107.0,
+}
+
+# Jumlah digit bagian bulat derajat yang diharapkan: lintang ~6.x, bujur ~106.x
+DIGIT_DERAJAT = {'lat': 1, 'lon': 3}
+
+# Alasan penolakan baris
+ALASAN_KOSONG = 'koordinat kosong / bukan angka'
+ALASAN_SKALA = 'skala koordinat tidak dikenali'
+ALASAN_LAT = 'lintang di luar batas wilayah'
+ALASAN_LON = 'bujur di luar batas wilayah'
+
+
+def detect_scale(values, digit_bulat):
+    """
+    Menentukan pembagi (pangkat 10) untuk setiap nilai agar bagian bulatnya
+    memiliki `digit_bulat` digit. Nilai nol, NaN, atau tak hingga menghasilkan NaN.
+    """
+    values = np.asarray(values, dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digit = np.floor(np.log10(np.abs(values)))
+    eksponen = digit - (digit_bulat - 1)
+    eksponen[~np.isfinite(eksponen)] = np.nan
+    return np.power(10.0, eksponen)
+
+
+def normalize_coordinates(df, x_col='koordinat_x', y_col='koordinat_y', bbox=None):
+    """
+    Mengubah kolom koordinat mentah menjadi kolom 'lat' dan 'lon' dalam derajat.
+
+    Mengembalikan tuple (valid_df, ditolak_df). `ditolak_df` memuat baris yang
+    dibuang beserta kolom 'alasan'.
+    """
+    bbox = bbox or JAKARTA_BBOX
+
+    x = pd.to_numeric(df[x_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+    y = pd.to_numeric(df[y_col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+
+    lat = x / detect_scale(x, DIGIT_DERAJAT['lat'])
+    lon = y / detect_scale(y, DIGIT_DERAJAT['lon'])
+
+    kosong = np.isnan(x) | np.isnan(y)
+    skala_gagal = ~kosong & (np.isnan(lat) | np.isnan(lon))
+    lat_luar = ~(kosong | skala_gagal) & ~((lat > bbox['lat_min']) & (lat < bbox['lat_max']))
+    lon_luar = ~(kosong | skala_gagal | lat_luar) & ~((lon > bbox['lon_min']) & (lon < bbox['lon_max']))
+
+    alasan = np.select(
+        [kosong, skala_gagal, lat_luar, lon_luar],
+        [ALASAN_KOSONG, ALASAN_SKALA, ALASAN_LAT, ALASAN_LON],
+        default='',
+    )
+    ditolak = alasan != ''
+
+    hasil = df.assign(**{x_col: x, y_col: y, 'lat': lat, 'lon': lon})
+    valid_df = hasil.loc[~ditolak]
+    ditolak_df = hasil.loc[ditolak].assign(alasan=alasan[ditolak])
+    return valid_df, ditolak_df
+
+
+def rejection_summary(ditolak_df):
+    """
+    Ringkasan jumlah baris yang ditolak per alasan.
+    """
+    if ditolak_df is None or ditolak_df.empty:
+        return pd.Series(dtype='int64', name='jumlah')
+    return ditolak_df['alasan'].value_counts().rename('jumlah')
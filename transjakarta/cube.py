@@ -0,0 +1,293 @@
+"""
+Kubus OLAP untuk filter silang (cross-filter) di seluruh dashboard.
+
+Setiap sumber diringkas sekali per dataset menjadi sel agregat pada dimensi
+filternya (periode, wilayah, kecamatan, jenis layanan, kategori rute).
+Dimensi dikodekan sebagai kode bilangan bulat kategori, sehingga filter apa
+pun dilayani dengan menyaring sel (np.isin pada kode) lalu menjumlahkan sel
+yang tersisa. Banyaknya sel bergantung pada kardinalitas dimensi, bukan
+jumlah baris, sehingga tetap instan pada jutaan baris.
+
+Hasil setiap kombinasi filter disimpan di memo LRU. Per sumber, kunci memo
+hanya memuat dimensi yang berlaku untuk sumber itu, sehingga mengubah filter
+wilayah tidak menghitung ulang jaringan rute. Agregat yang tidak dapat
+dijumlahkan dari sel (graf hub, regresi/Spearman, lapisan peta) dihitung
+dari baris yang tersaring dengan mask kode yang sama.
+
+Hasil filter memiliki bentuk yang sama dengan dict transjakarta.analytics,
+ditambah 'fingerprint_sumber' (sidik jari per sumber + filter yang berlaku
+untuknya) untuk kunci cache grafik, 'filter', dan 'kosong' (sumber yang
+tidak memiliki baris untuk filter tersebut).
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from transjakarta.analytics import (
+    bus_aggregates_from_partial, halte_aggregates_from_partial, rute_aggregates_from_partial,
+)
+from transjakarta.memo import FingerprintMemo
+
+
+# Dimensi filter -> label tampilan
+DIMENSI = {
+    'periode_data': "Periode",
+    'wilayah': "Wilayah",
+    'kecamatan': "Kecamatan",
+    'jenis_layanan': "Jenis Layanan",
+    'kategori': "Kategori Rute",
+}
+
+# Dimensi yang berlaku untuk setiap sumber; dimensi lain tidak memengaruhinya
+DIMENSI_SUMBER = {
+    'halte': ('periode_data', 'wilayah', 'kecamatan'),
+    'bus_penumpang': ('periode_data', 'jenis_layanan'),
+    'rute': ('periode_data', 'kategori'),
+}
+
+_memo = FingerprintMemo(max_entries=4)
+
+
+def filter_key(filter_):
+    """
+    Bentuk kanonis (hashable) sebuah filter {dimensi: [nilai, ...]}: tuple
+    (dimensi, nilai terurut sebagai string) tanpa dimensi yang kosong.
+    """
+    filter_ = filter_ or {}
+    return tuple((d, tuple(sorted(map(str, filter_[d])))) for d in DIMENSI if filter_.get(d))
+
+
+def _sidik(fingerprint, kunci):
+    if not kunci:
+        return fingerprint
+    return f"{fingerprint}-{hashlib.sha1(repr(kunci).encode('utf-8')).hexdigest()[:8]}"
+
+
+def _kodekan(kolom):
+    """
+    (kode int32, label string) untuk satu kolom; NaN mendapat kode -1.
+    Kolom non-kategori diberi kode menurut urutan kemunculan, sehingga nilai
+    yang jumlahnya sama berurutan seperti pada value_counts.
+    """
+    if isinstance(kolom.dtype, pd.CategoricalDtype):
+        return kolom.cat.codes.to_numpy(dtype=np.int32), pd.Index(kolom.cat.categories.astype(str))
+    kode, label = pd.factorize(kolom)
+    return kode.astype(np.int32), pd.Index(np.asarray(label).astype(str))
+
+
+class _Kode:
+    """
+    Kolom-kolom dimensi satu tabel dalam bentuk kode, dengan mask filter.
+    """
+
+    def __init__(self, kode, label):
+        self.kode = kode
+        self.label = label
+
+    @classmethod
+    def dari_frame(cls, df, dims):
+        kode, label = {}, {}
+        for d in dims:
+            kode[d], label[d] = _kodekan(df[d])
+        return cls(kode, label)
+
+    def mask(self, kunci, kecuali=None):
+        """
+        Mask boolean baris yang lolos filter, atau None bila tidak ada dimensi yang berlaku.
+        """
+        mask = None
+        for d, nilai in kunci:
+            if d == kecuali or d not in self.kode:
+                continue
+            dipilih = self.label[d].get_indexer(nilai)
+            cocok = np.isin(self.kode[d], dipilih[dipilih >= 0])
+            mask = cocok if mask is None else mask & cocok
+        return mask
+
+
+class _Sel:
+    """
+    Sel agregat satu sumber: kode dimensi (+ kolom pengelompokan tambahan) dan ukuran per sel.
+    """
+
+    def __init__(self, kode_baris, nilai, kelompok, ukuran):
+        kolom = list(kode_baris.kode) + list(kelompok)
+        data = pd.DataFrame({**kode_baris.kode, **kelompok, **nilai})
+        sel = data.groupby(kolom, sort=False).agg(**ukuran).reset_index()
+        self.kode = _Kode({d: sel[d].to_numpy() for d in kode_baris.kode}, kode_baris.label)
+        self.data = sel
+
+    def pilih(self, kunci):
+        mask = self.kode.mask(kunci)
+        return self.data if mask is None else self.data[mask]
+
+
+def _hitungan(sel, kolom, label, urut_kemunculan=False):
+    """
+    Jumlah 'n' per kode `kolom` dengan indeks label, seperti analytics._hitung.
+    value_counts mengurutkan nilai kembar menurut urutan kategori untuk kolom
+    kategori, dan menurut kemunculan pertama untuk kolom teks. Sel tersimpan
+    menurut urutan kemunculan baris, sehingga groupby tanpa pengurutan
+    (`urut_kemunculan`) meniru yang kedua pada baris yang tersaring.
+    """
+    jumlah = sel[sel[kolom] >= 0].groupby(kolom, sort=not urut_kemunculan)['n'].sum()
+    hasil = pd.Series(jumlah.to_numpy(dtype='int64'), index=pd.Index(label[jumlah.index], name=kolom), name='count')
+    return hasil[hasil > 0].sort_values(ascending=False, kind='stable')
+
+
+class Cube:
+    """
+    Kubus agregat satu dataset. `agg` adalah hasil transjakarta.analytics
+    untuk dataset tanpa filter; baris-baris sumber harus dataset yang sama
+    (halte sudah dinormalisasi koordinatnya).
+    """
+
+    def __init__(self, agg, halte_df, bus_penumpang_df, rute_df, max_entries=32):
+        self.fingerprint = agg['fingerprint']
+        self.dasar = {
+            **agg,
+            'fingerprint_sumber': {nama: self.fingerprint for nama in DIMENSI_SUMBER},
+            'filter': {},
+            'kosong': (),
+        }
+        self._baris = {'halte': halte_df, 'bus_penumpang': bus_penumpang_df, 'rute': rute_df}
+        self._kode = {nama: _Kode.dari_frame(df, DIMENSI_SUMBER[nama]) for nama, df in self._baris.items()}
+
+        kode_a, self._label_a = _kodekan(rute_df['titik_a'])
+        kode_b, self._label_b = _kodekan(rute_df['titik_b'])
+        ukuran_bus = {
+            'jumlah_penumpang': ('jumlah_penumpang', 'sum'),
+            'jumlah_bus': ('jumlah_bus', 'sum'),
+            'n_bus': ('jumlah_bus', 'count'),
+        }
+        self._sel = {
+            'halte': _Sel(self._kode['halte'], {'n': np.ones(len(halte_df), dtype='int64')}, {}, {'n': ('n', 'sum')}),
+            'bus_penumpang': _Sel(
+                self._kode['bus_penumpang'],
+                {k: bus_penumpang_df[k].to_numpy() for k in ('jumlah_penumpang', 'jumlah_bus')}, {}, ukuran_bus,
+            ),
+            # Sel rute menyimpan pasangan titik sehingga hitungan titik awal/akhir
+            # juga dapat dijumlahkan dari sel
+            'rute': _Sel(
+                self._kode['rute'], {'n': np.ones(len(rute_df), dtype='int64')},
+                {'titik_a': kode_a, 'titik_b': kode_b}, {'n': ('n', 'sum')},
+            ),
+        }
+        self._memo = FingerprintMemo(max_entries=max_entries)
+        self._memo_sumber = FingerprintMemo(max_entries=max_entries * len(DIMENSI_SUMBER))
+
+    # --- kunci ---
+
+    def _kunci_sumber(self, nama, kunci):
+        return tuple((d, nilai) for d, nilai in kunci if d in DIMENSI_SUMBER[nama])
+
+    # --- pilihan filter ---
+
+    def options(self, dimensi, filter_=None):
+        """
+        Nilai `dimensi` yang masih memiliki data di bawah filter dimensi lain
+        (filter silang), gabungan dari semua sumber yang memiliki dimensi itu.
+        """
+        kunci = filter_key(filter_)
+        ada = set()
+        for nama, dims in DIMENSI_SUMBER.items():
+            if dimensi not in dims:
+                continue
+            sel = self._sel[nama]
+            mask = sel.kode.mask(self._kunci_sumber(nama, kunci), kecuali=dimensi)
+            kode = sel.kode.kode[dimensi] if mask is None else sel.kode.kode[dimensi][mask]
+            kode = np.unique(kode[kode >= 0])
+            ada.update(sel.kode.label[dimensi][kode])
+        return sorted(ada)
+
+    # --- baris dan agregat ---
+
+    def rows(self, nama, filter_=None):
+        """
+        Baris sumber `nama` yang lolos filter (dimensi yang tidak berlaku diabaikan).
+        """
+        kunci = self._kunci_sumber(nama, filter_key(filter_))
+        if not kunci:
+            return self._baris[nama]
+
+        def hitung():
+            return self._baris[nama][self._kode[nama].mask(kunci)]
+
+        return self._memo_sumber.get_or_compute(('baris', nama, kunci), hitung)
+
+    def _parsial(self, nama, kunci):
+        sel = self._sel[nama].pilih(kunci)
+        label = self._kode[nama].label
+        if nama == 'halte':
+            return {d: _hitungan(sel, d, label[d]) for d in ('wilayah', 'kecamatan')}
+        if nama == 'rute':
+            return {
+                'titik_a': _hitungan(sel, 'titik_a', self._label_a, urut_kemunculan=True),
+                'titik_b': _hitungan(sel, 'titik_b', self._label_b, urut_kemunculan=True),
+                'kategori': _hitungan(sel, 'kategori', label['kategori']),
+            }
+        parsial = sel.groupby(['periode_data', 'jenis_layanan'])[['jumlah_penumpang', 'jumlah_bus', 'n_bus']].sum()
+        parsial.index = pd.MultiIndex.from_arrays(
+            [
+                pd.Index(label['periode_data'][parsial.index.get_level_values(0)]).astype(
+                    self._baris['bus_penumpang']['periode_data'].dtype),
+                label['jenis_layanan'][parsial.index.get_level_values(1)],
+            ],
+            names=['periode_data', 'jenis_layanan'],
+        )
+        return parsial.sort_index()
+
+    def _agregat_sumber(self, nama, kunci):
+        def hitung():
+            parsial = self._parsial(nama, kunci)
+            if nama == 'halte':
+                return halte_aggregates_from_partial(parsial)
+            baris = self.rows(nama, dict(kunci))
+            if nama == 'bus_penumpang':
+                return bus_aggregates_from_partial(parsial, baris)
+            return rute_aggregates_from_partial(parsial, baris)
+
+        return self._memo_sumber.get_or_compute(('agregat', nama, kunci), hitung)
+
+    def aggregates(self, filter_=None):
+        """
+        Agregat dashboard untuk satu kombinasi filter {dimensi: [nilai, ...]}.
+        Tanpa filter, agregat dataset dikembalikan apa adanya.
+        """
+        kunci = filter_key(filter_)
+        if not kunci:
+            return self.dasar
+
+        def hitung():
+            agg = {'fingerprint': _sidik(self.fingerprint, kunci), 'fingerprint_sumber': {}, 'filter': dict(kunci)}
+            kosong = []
+            for nama in DIMENSI_SUMBER:
+                kunci_sumber = self._kunci_sumber(nama, kunci)
+                if kunci_sumber:
+                    agg.update(self._agregat_sumber(nama, kunci_sumber))
+                else:
+                    agg.update({k: self.dasar[k] for k in _KUNCI_AGREGAT[nama]})
+                agg['fingerprint_sumber'][nama] = _sidik(self.fingerprint, kunci_sumber)
+                if len(self.rows(nama, agg['filter'])) == 0:
+                    kosong.append(nama)
+            agg['kosong'] = tuple(kosong)
+            return agg
+
+        return self._memo.get_or_compute(kunci, hitung)
+
+
+# Kunci dict agregat yang berasal dari setiap sumber
+_KUNCI_AGREGAT = {
+    'halte': ('halte_by_wilayah', 'halte_by_kecamatan'),
+    'bus_penumpang': ('ratio_df', 'yearly_df', 'service_options', 'korelasi'),
+    'rute': ('top_titik_a', 'top_titik_b', 'rute_by_kategori', 'network', 'set_a', 'set_b', 'hub_counts', 'hub_analysis_df'),
+}
+
+
+def get_cube(agg, halte_df, bus_penumpang_df, rute_df):
+    """
+    Kubus ter-memo per sidik jari dataset agregat.
+    """
+    return _memo.get_or_compute(agg['fingerprint'], lambda: Cube(agg, halte_df, bus_penumpang_df, rute_df))
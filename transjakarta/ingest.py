@@ -0,0 +1,87 @@
+"""
+Skema sumber data: spesifikasi setiap workbook Excel sumber dan tipe kolomnya.
+
+Setiap sumber diberi tipe kolom yang tetap (kategori untuk kolom
+berkardinalitas rendah, string untuk teks bebas) dan label layanan yang
+disatukan. Pembacaan file dan cache kolumnarnya (Feather yang dipetakan ke
+memori) ditangani oleh transjakarta.store.
+"""
+
+import hashlib
+import os
+
+
+# Naikkan angka ini setiap kali skema/kanonisasi di bawah berubah agar
+# cache lama otomatis dianggap usang.
+SCHEMA_VERSION = 1
+
+# Penyatuan label layanan yang ditulis berbeda di sumber data
+KANONISASI_LAYANAN = {'Bus Rapid Transit': 'BRT'}
+
+# 'pola' (glob nama file tanpa ekstensi) dan 'partisi' dipakai
+# transjakarta.store untuk ekstrak multi-periode di satu direktori data;
+# 'path' adalah nama file sampel, dipakai saat menulis data sintetis.
+SUMBER_DATA = {
+    'halte': {
+        'path': 'Data Halte Transjakarta 2025_modified.xlsx',
+        'sheet_name': 'Sheet1',
+        'kategori': ['wilayah', 'kecamatan', 'kelurahan'],
+        'teks': ['nama_halte', 'lokasi'],
+        'ganti': {},
+        'pola': 'Data Halte Transjakarta *',
+        'partisi': ['periode_data'],
+    },
+    'bus_penumpang': {
+        'path': 'Data Jumlah Bus yang Beroperasi dan Jumlah Penumpang Layanan Transjakarta 2024_modified.xlsx',
+        'sheet_name': 'Sheet1',
+        'kategori': ['jenis_layanan'],
+        'teks': [],
+        'ganti': {'jenis_layanan': KANONISASI_LAYANAN},
+        'pola': 'Data Jumlah Bus yang Beroperasi dan Jumlah Penumpang Layanan Transjakarta *',
+        'partisi': ['periode_data', 'jenis_layanan'],
+    },
+    'rute': {
+        'path': 'Data Rute Jalur Transjakarta 2024_modified.xlsx',
+        'sheet_name': 'Sheet1',
+        'kategori': ['kategori'],
+        'teks': ['kode', 'jurusan', 'titik_a', 'titik_b'],
+        'ganti': {'kategori': KANONISASI_LAYANAN},
+        'pola': 'Data Rute Jalur Transjakarta *',
+        'partisi': ['periode_data', 'kategori'],
+    },
+}
+
+
+def sources_in(data_dir):
+    """
+    Spesifikasi SUMBER_DATA dengan file yang dicari di `data_dir`
+    (mis. data sintetis atau salinan data di direktori lain).
+    """
+    return {nama: {**spec, 'path': os.path.join(data_dir, spec['path'])} for nama, spec in SUMBER_DATA.items()}
+
+
+def source_key(path):
+    """
+    Kunci cache untuk satu file sumber: path absolut, mtime, ukuran, dan versi skema.
+    """
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{SCHEMA_VERSION}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def apply_schema(df, spec):
+    """
+    Menerapkan kanonisasi label dan tipe kolom sesuai spesifikasi sumber.
+    """
+    df = df.copy()
+    for col, mapping in spec.get('ganti', {}).items():
+        if col in df.columns:
+            df[col] = df[col].replace(mapping)
+    for col in spec.get('teks', []):
+        if col in df.columns:
+            # Kolom seperti 'kode' bercampur int/str di Excel; samakan menjadi string
+            df[col] = df[col].astype('string')
+    for col in spec.get('kategori', []):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    return df
@@ -0,0 +1,212 @@
+"""
+Agregasi peta sisi server dengan beberapa tingkat detail (level-of-detail).
+
+Alih-alih mengirim setiap titik halte ke browser pada setiap rerun, halte
+dikelompokkan ke heksagon berukuran tetap pada bidang datar (km) untuk
+setiap tingkat zoom. Yang dikirim ke peta hanya poligon heksagon beserta
+jumlah halte di dalamnya, sehingga ukuran payload dibatasi oleh luas
+wilayah / luas heksagon, bukan oleh jumlah halte. Tingkat paling detail
+menampilkan titik halte, dibatasi MAKS_TITIK_PETA titik (sampel tetap).
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+from transjakarta.memo import FingerprintMemo
+from transjakarta.spatial import KM_PER_DERAJAT
+
+
+# Nama tingkat detail -> ukuran heksagon (km, pusat ke sudut; None = titik) dan zoom awal
+TINGKAT_DETAIL = {
+    "Kota (heksagon 2 km)": {'hex_km': 2.0, 'zoom': 10},
+    "Kecamatan (heksagon 0.5 km)": {'hex_km': 0.5, 'zoom': 12},
+    "Titik halte": {'hex_km': None, 'zoom': 12},
+}
+
+# Batas jumlah titik yang dikirim pada tingkat "Titik halte"
+MAKS_TITIK_PETA = 5000
+
+# Warna titik hub per tipologi (RGBA)
+WARNA_TIPOLOGI = {
+    "Dominan Terminal": [31, 119, 180, 210],
+    "Dominan Tujuan": [255, 127, 14, 210],
+    "Seimbang (Transit)": [44, 160, 44, 210],
+}
+
+_memo = FingerprintMemo(max_entries=8)
+
+
+def hex_bin(x, y, size):
+    """
+    Koordinat aksial (q, r) heksagon pointy-top berukuran `size` untuk titik (x, y).
+    """
+    qf = (math.sqrt(3) / 3 * x - y / 3) / size
+    rf = (2 / 3 * y) / size
+    # Pembulatan koordinat kubus: komponen dengan galat terbesar diturunkan dari dua lainnya
+    sf = -qf - rf
+    q, r, s = np.rint(qf), np.rint(rf), np.rint(sf)
+    dq, dr, ds = np.abs(q - qf), np.abs(r - rf), np.abs(s - sf)
+    ganti_q = (dq > dr) & (dq > ds)
+    ganti_r = ~ganti_q & (dr > ds)
+    q = np.where(ganti_q, -r - s, q)
+    r = np.where(ganti_r, -q - s, r)
+    return q.astype(np.int64), r.astype(np.int64)
+
+
+def hex_center(q, r, size):
+    """
+    Pusat (x, y) heksagon aksial (q, r).
+    """
+    return size * math.sqrt(3) * (q + r / 2), size * 1.5 * r
+
+
+def hex_aggregate(halte_df, size_km, lat0=None):
+    """
+    Jumlah halte per heksagon beserta poligon (lon, lat) dan wilayah dominan.
+    """
+    lat = halte_df['lat'].to_numpy(dtype='float64')
+    lon = halte_df['lon'].to_numpy(dtype='float64')
+    lat0 = float(np.mean(lat)) if lat0 is None else lat0
+    kx = KM_PER_DERAJAT * math.cos(math.radians(lat0))
+    q, r = hex_bin(lon * kx, lat * KM_PER_DERAJAT, size_km)
+
+    sel = pd.DataFrame({'q': q, 'r': r, 'wilayah': halte_df['wilayah'].astype(str).to_numpy()})
+    hex_df = sel.groupby(['q', 'r'], sort=False).size().rename('jumlah').reset_index()
+    dominan = (
+        sel.value_counts(['q', 'r', 'wilayah'], sort=True)
+        .reset_index()
+        .drop_duplicates(['q', 'r'])
+        [['q', 'r', 'wilayah']]
+    )
+    hex_df = hex_df.merge(dominan, on=['q', 'r'], how='left')
+
+    cx, cy = hex_center(hex_df['q'].to_numpy(), hex_df['r'].to_numpy(), size_km)
+    sudut = np.radians(30 + 60 * np.arange(6))
+    vx = (cx[:, None] + size_km * np.cos(sudut)[None, :]) / kx
+    vy = (cy[:, None] + size_km * np.sin(sudut)[None, :]) / KM_PER_DERAJAT
+    # Presisi 5 desimal (~1 m) cukup untuk peta dan memangkas ukuran JSON
+    hex_df['polygon'] = np.round(np.stack([vx, vy], axis=-1), 5).tolist()
+    hex_df['lon'] = np.round(cx / kx, 5)
+    hex_df['lat'] = np.round(cy / KM_PER_DERAJAT, 5)
+    # Bobot warna 0..1 pada skala log agar heksagon padat tidak mendominasi
+    log_n = np.log1p(hex_df['jumlah'].to_numpy())
+    hex_df['bobot'] = np.round(log_n / log_n.max(), 3) if len(log_n) else log_n
+    return hex_df.drop(columns=['q', 'r'])
+
+
+def sample_points(halte_df, maks=MAKS_TITIK_PETA, seed=0):
+    """
+    Titik halte untuk tingkat paling detail, disampel bila melebihi `maks`.
+    """
+    titik = halte_df[['nama_halte', 'wilayah', 'lat', 'lon']].dropna(subset=['lat', 'lon'])
+    if len(titik) > maks:
+        titik = titik.sample(maks, random_state=seed)
+    titik = titik.astype({'nama_halte': str, 'wilayah': str})
+    return titik.reset_index(drop=True)
+
+
+def area_summary(halte_df, kolom):
+    """
+    Ringkasan per wilayah/kecamatan: jumlah halte, proporsi, dan titik pusat.
+    """
+    ringkasan = (
+        halte_df.groupby(kolom, observed=True)
+        .agg(**{'Jumlah Halte': ('lat', 'size'), 'Lintang Pusat': ('lat', 'mean'), 'Bujur Pusat': ('lon', 'mean')})
+        .sort_values('Jumlah Halte', ascending=False)
+    )
+    ringkasan.insert(1, 'Proporsi', ringkasan['Jumlah Halte'] / ringkasan['Jumlah Halte'].sum())
+    ringkasan.index = ringkasan.index.astype(str)
+    ringkasan.index.name = kolom.capitalize()
+    return ringkasan
+
+
+def build_map_layers(halte_df):
+    """
+    Semua data peta yang sudah diagregasi: heksagon per tingkat, sampel titik,
+    dan ringkasan per wilayah dan kecamatan.
+    """
+    lat0 = float(halte_df['lat'].mean())
+    return {
+        'jumlah_halte': len(halte_df),
+        'pusat': (lat0, float(halte_df['lon'].mean())),
+        'hex': {
+            nama: hex_aggregate(halte_df, spec['hex_km'], lat0)
+            for nama, spec in TINGKAT_DETAIL.items() if spec['hex_km'] is not None
+        },
+        'titik': sample_points(halte_df),
+        'wilayah': area_summary(halte_df, 'wilayah'),
+        'kecamatan': area_summary(halte_df, 'kecamatan'),
+    }
+
+
+def get_map_layers(fingerprint, halte_df):
+    """
+    Data peta ter-memo per sidik jari dataset.
+    """
+    return _memo.get_or_compute(fingerprint, lambda: build_map_layers(halte_df))
+
+
+def build_deck(layers, tingkat):
+    """
+    pdk.Deck untuk satu tingkat detail. Mengembalikan (deck, jumlah objek yang dikirim).
+    """
+    import pydeck as pdk
+
+    spec = TINGKAT_DETAIL[tingkat]
+    lat0, lon0 = layers['pusat']
+    if spec['hex_km'] is None:
+        data = layers['titik']
+        layer = pdk.Layer(
+            'ScatterplotLayer', data,
+            get_position=['lon', 'lat'], get_radius=60, radius_min_pixels=2,
+            get_fill_color=[255, 75, 75, 200], pickable=True,
+        )
+        tooltip = {'text': "{nama_halte}\n{wilayah}"}
+    else:
+        data = layers['hex'][tingkat]
+        layer = pdk.Layer(
+            'PolygonLayer', data,
+            get_polygon='polygon', get_fill_color='[255, 230 - 200 * bobot, 60 - 60 * bobot, 170]',
+            get_line_color=[255, 255, 255, 120], line_width_min_pixels=1,
+            stroked=True, filled=True, pickable=True,
+        )
+        tooltip = {'text': "{jumlah} halte\nDominan: {wilayah}"}
+
+    deck = pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=lat0, longitude=lon0, zoom=spec['zoom']),
+        map_provider='carto', map_style='light',
+        tooltip=tooltip,
+    )
+    return deck, len(data)
+
+
+def build_hub_deck(hub_df):
+    """
+    pdk.Deck titik hub yang sudah berpadanan halte; radius sebanding dengan
+    jumlah layanan dan warna mengikuti tipologi. Mengembalikan (deck, jumlah titik).
+    """
+    import pydeck as pdk
+
+    data = hub_df.dropna(subset=['Lintang', 'Bujur'])[
+        ['Hub', 'Halte', 'Tipologi', 'Jumlah_Layanan', 'Total_Koneksi', 'Lintang', 'Bujur']
+    ].copy()
+    data['warna'] = data['Tipologi'].map(WARNA_TIPOLOGI).apply(lambda w: w if isinstance(w, list) else [120, 120, 120, 200])
+    data['radius'] = 150 + 60 * data['Jumlah_Layanan']
+    layer = pdk.Layer(
+        'ScatterplotLayer', data,
+        get_position=['Bujur', 'Lintang'], get_radius='radius', radius_min_pixels=4,
+        get_fill_color='warna', get_line_color=[255, 255, 255], line_width_min_pixels=1,
+        stroked=True, pickable=True,
+    )
+    lat0 = float(data['Lintang'].mean()) if len(data) else -6.2
+    lon0 = float(data['Bujur'].mean()) if len(data) else 106.85
+    deck = pdk.Deck(
+        layers=[layer],
+        initial_view_state=pdk.ViewState(latitude=lat0, longitude=lon0, zoom=10),
+        map_provider='carto', map_style='light',
+        tooltip={'text': "{Hub}\nHalte: {Halte}\n{Tipologi}\n{Jumlah_Layanan} layanan, {Total_Koneksi} rute"},
+    )
+    return deck, len(data)
@@ -0,0 +1,242 @@
+"""
+Pencocokan nama titik rute (titik_a/titik_b) ke halte dengan indeks trigram.
+
+Nama titik rute ditulis bebas ("Term. Pulo Gadung", "Blok M via Kemang",
+"St. LRT Harjamukti") sedangkan nama halte memuat keterangan arah
+("Pancoran Arah Timur"). Kedua sisi dinormalisasi dulu (huruf kecil,
+singkatan diperluas, bagian "via ..." dan "arah ..." dibuang, kata umum
+seperti terminal/stasiun diabaikan), lalu setiap nama halte yang unik
+dipecah menjadi trigram dan dimasukkan ke indeks terbalik trigram -> id.
+
+Kandidat untuk satu nama hanya diambil dari daftar posting trigram nama
+itu, sehingga biaya total sebanding dengan jumlah nama ditambah panjang
+posting yang disentuh, bukan jumlah titik x jumlah halte seperti
+perbandingan berpasangan.
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from transjakarta.memo import FingerprintMemo
+
+
+# Singkatan yang lazim pada nama titik rute -> bentuk panjang
+SINGKATAN = {
+    'term': 'terminal', 'st': 'stasiun', 'stsn': 'stasiun', 'tj': 'tanjung',
+    'kp': 'kampung', 'psr': 'pasar', 'jl': 'jalan', 'jln': 'jalan', 'pd': 'pondok',
+    'monas': 'monumen nasional', 'benhil': 'bendungan hilir',
+}
+
+# Kata umum yang tidak membedakan lokasi; dibuang kecuali hanya itu isi namanya
+KATA_UMUM = frozenset({'terminal', 'stasiun', 'halte', 'jalan', 'lrt', 'mrt', 'krl', 'bus', 'shelter'})
+
+# Kata pelengkap yang hanya membedakan halte sekawasan (arah, "raya", nomor);
+# tidak dihitung pada kecocokan kata sehingga "Senen" tetap cocok dengan
+# "Senen Raya" dan "Puri Beta" dengan "Puri Beta 2"
+KATA_PELENGKAP = frozenset({'raya', 'utara', 'selatan', 'timur', 'barat', 'tengah', 'kota', 'adm', 'transjakarta'})
+
+# Skor minimum (0-1) agar sebuah titik dianggap cocok dengan halte
+AMBANG_COCOK = 0.8
+
+# Trigram yang muncul di lebih dari porsi ini dari seluruh nama (dan minimal
+# MIN_POSTING_UMUM nama) tidak diindeks karena hampir tidak membedakan kandidat
+MAKS_PORSI_POSTING = 0.05
+MIN_POSTING_UMUM = 100
+
+_memo = FingerprintMemo(max_entries=8)
+
+
+def normalize_name(nama):
+    """
+    Bentuk baku nama lokasi untuk pencocokan.
+    """
+    if nama is None or (isinstance(nama, float) and np.isnan(nama)):
+        return ''
+    teks = unicodedata.normalize('NFKD', str(nama)).encode('ascii', 'ignore').decode().lower()
+    teks = re.sub(r'\bvia\b.*$', '', teks)
+    teks = re.sub(r'\barah (utara|selatan|timur|barat)\b', '', teks)
+    token = ' '.join(SINGKATAN.get(t, t) for t in re.findall(r'[a-z0-9]+', teks)).split()
+    inti = [t for t in token if t not in KATA_UMUM]
+    return ' '.join(inti or token)
+
+
+def trigrams(teks):
+    """
+    Himpunan trigram karakter dengan padding, sehingga awal dan akhir kata ikut berbobot.
+    """
+    teks = f"  {teks} "
+    return {teks[i:i + 3] for i in range(len(teks) - 2)}
+
+
+def core_tokens(teks):
+    """
+    Kata pembeda sebuah nama ternormalisasi: tanpa kata pelengkap dan angka,
+    kecuali hanya itu isi namanya.
+    """
+    token = teks.split()
+    inti = {t for t in token if t not in KATA_PELENGKAP and not t.isdigit()}
+    return inti or set(token)
+
+
+class NameIndex:
+    """
+    Indeks terbalik trigram atas nama-nama yang sudah dinormalisasi.
+
+    Nama asli yang normalisasinya sama (mis. "Pancoran Arah Timur" dan
+    "Pancoran Arah Barat") berbagi satu kunci; `kode[i]` adalah id kunci
+    untuk nama ke-i.
+    """
+
+    def __init__(self, names):
+        kode, kunci = pd.factorize(pd.Series(list(names), dtype=object).map(normalize_name))
+        self.kode = kode.astype(np.int64)
+        self.kunci = pd.Index(kunci)
+        self.n = len(self.kunci)
+        self._tepat = {k: i for i, k in enumerate(self.kunci) if k}
+
+        gram = [trigrams(k) if k else set() for k in self.kunci]
+        self.n_gram = np.array([len(g) for g in gram], dtype=np.int64)
+        posting = {}
+        for i, g in enumerate(gram):
+            for t in g:
+                posting.setdefault(t, []).append(i)
+        batas = max(MIN_POSTING_UMUM, MAKS_PORSI_POSTING * self.n)
+        self.posting = {t: np.array(ids, dtype=np.int64) for t, ids in posting.items() if len(ids) <= batas}
+
+        # Kata pembeda setiap kunci sebagai id kosakata, berurutan per kunci:
+        # kata kunci ke-i adalah kata_id[kata_awal[i]:kata_awal[i] + n_kata[i]]
+        kata = [core_tokens(k) for k in self.kunci]
+        self._kosakata = {}
+        kata_id = [self._kosakata.setdefault(t, len(self._kosakata)) for w in kata for t in sorted(w)]
+        self.n_kata = np.array([len(w) for w in kata], dtype=np.int64)
+        self.kata_awal = np.concatenate([[0], np.cumsum(self.n_kata)])[:-1].astype(np.int64)
+        self.kata_id = np.array(kata_id, dtype=np.int64)
+
+    def query(self, nama):
+        """
+        (id kunci terbaik, skor, metode) untuk satu nama; id -1 bila tidak ada kandidat.
+
+        Skor adalah rata-rata koefisien Dice trigram dan kecocokan kata
+        pembeda (core_tokens): jumlah kata yang sama dibagi jumlah kata pada
+        sisi yang lebih banyak. Satu kata tidak dapat "menutupi" nama halte
+        berkata banyak, sehingga "Cilincing" rendah terhadap "Cakung
+        Cilincing" dan "Jembatan Lima" rendah terhadap "Jembatan Dua",
+        tetapi "Senen" tetap tinggi terhadap "Senen Raya".
+        """
+        q = normalize_name(nama)
+        if not q:
+            return -1, 0.0, None
+        if q in self._tepat:
+            return self._tepat[q], 1.0, 'tepat'
+        gram = trigrams(q)
+        daftar = [self.posting[t] for t in gram if t in self.posting]
+        if not daftar:
+            return -1, 0.0, None
+        ids, sama = np.unique(np.concatenate(daftar), return_counts=True)
+        dice = 2 * sama / (len(gram) + self.n_gram[ids])
+
+        # Kata yang sama hanya dihitung untuk kandidat dari langkah trigram,
+        # sehingga kata umum ("pasar") tidak menyentuh seluruh kunci
+        kata = core_tokens(q)
+        id_kueri = [self._kosakata[t] for t in kata if t in self._kosakata]
+        kata_sama = np.zeros(len(ids), dtype=np.int64)
+        if id_kueri:
+            panjang = self.n_kata[ids]
+            milik = np.repeat(np.arange(len(ids)), panjang)
+            posisi = np.repeat(self.kata_awal[ids] - np.cumsum(panjang) + panjang, panjang) + np.arange(panjang.sum())
+            sama_kata = np.isin(self.kata_id[posisi], id_kueri)
+            kata_sama = np.bincount(milik[sama_kata], minlength=len(ids))
+        skor = (dice + kata_sama / np.maximum(len(kata), self.n_kata[ids])) / 2
+        # Seri diputus oleh kunci yang lebih pendek lalu urutan kemunculan
+        terbaik = np.lexsort((ids, self.n_gram[ids], -skor))[0]
+        return int(ids[terbaik]), float(skor[terbaik]), 'trigram'
+
+
+def resolve_endpoints(names, halte_df, ambang=AMBANG_COCOK):
+    """
+    Padanan halte untuk setiap nama titik unik.
+
+    Mengembalikan DataFrame berindeks 'Lokasi' dengan kolom Halte (nama halte
+    pertama pada kunci yang cocok), Jumlah_Halte, Skor, Metode, Wilayah,
+    Lintang, dan Bujur (rata-rata koordinat halte sekunci). Titik dengan skor
+    di bawah `ambang` tetap dicatat skornya tetapi tanpa halte dan koordinat.
+    """
+    lokasi = pd.Index(pd.unique(pd.Series(list(names), dtype=object).dropna()), name='Lokasi')
+    if halte_df.empty:
+        # Tanpa halte tidak ada kandidat; semua titik tercatat tanpa padanan
+        return pd.DataFrame({
+            'Halte': pd.Series(index=lokasi, dtype=halte_df['nama_halte'].dtype),
+            'Jumlah_Halte': pd.Series(0, index=lokasi, dtype='int64'),
+            'Skor': pd.Series(0.0, index=lokasi),
+            'Metode': pd.Series(None, index=lokasi, dtype=object),
+            'Wilayah': pd.Series(None, index=lokasi, dtype=object),
+            'Lintang': pd.Series(float('nan'), index=lokasi),
+            'Bujur': pd.Series(float('nan'), index=lokasi),
+        })
+    index = NameIndex(halte_df['nama_halte'])
+    kunci = pd.Series(index.kode, index=halte_df.index)
+    pertama = halte_df.groupby(kunci.to_numpy(), sort=True)
+    per_kunci = pd.DataFrame({
+        'Halte': pertama['nama_halte'].first(),
+        'Jumlah_Halte': pertama.size(),
+        'Wilayah': pertama['wilayah'].first().astype(object),
+        'Lintang': pertama['lat'].mean(),
+        'Bujur': pertama['lon'].mean(),
+    }).reindex(np.arange(index.n))
+
+    hasil = [index.query(nama) for nama in lokasi]
+    ids = np.array([h[0] for h in hasil], dtype=np.int64)
+    skor = np.array([h[1] for h in hasil], dtype='float64')
+    cocok = (ids >= 0) & (skor >= ambang)
+
+    tabel = per_kunci.iloc[np.where(cocok, ids, 0)].set_axis(lokasi).where(pd.Series(cocok, index=lokasi), axis=0)
+    tabel['Jumlah_Halte'] = tabel['Jumlah_Halte'].fillna(0).astype('int64')
+    tabel.insert(2, 'Skor', skor.round(3))
+    tabel.insert(3, 'Metode', pd.Series([h[2] for h in hasil], index=lokasi, dtype=object).where(cocok, None))
+    return tabel
+
+
+def route_services(rute_df):
+    """
+    Layanan yang menyinggahi setiap titik: jumlah kode rute unik dan kategorinya.
+    """
+    ujung = pd.concat([
+        rute_df[['titik_a', 'kode', 'kategori']].rename(columns={'titik_a': 'Lokasi'}),
+        rute_df[['titik_b', 'kode', 'kategori']].rename(columns={'titik_b': 'Lokasi'}),
+    ], ignore_index=True).dropna(subset=['Lokasi'])
+    ujung['Lokasi'] = ujung['Lokasi'].astype(str)
+    per_lokasi = ujung.groupby('Lokasi', sort=False)
+    return pd.DataFrame({
+        'Jumlah_Layanan': per_lokasi['kode'].nunique(),
+        'Kategori_Layanan': per_lokasi['kategori'].agg(lambda s: ', '.join(sorted(s.dropna().astype(str).unique()))),
+    })
+
+
+def hub_locations(hub_df, cocok, rute_df):
+    """
+    Tabel hub ditambah jumlah layanan dan padanan halte beserta koordinatnya.
+    """
+    layanan = route_services(rute_df)
+    tabel = hub_df.join(layanan, on='Hub').join(cocok[['Halte', 'Skor', 'Lintang', 'Bujur']], on='Hub')
+    tabel['Jumlah_Layanan'] = tabel['Jumlah_Layanan'].fillna(0).astype('int64')
+    return tabel
+
+
+def get_endpoint_matches(fingerprint, rute_df, halte_df):
+    """
+    Padanan halte semua titik rute, ter-memo per sidik jari dataset.
+    """
+    def hitung():
+        return resolve_endpoints(pd.concat([rute_df['titik_a'], rute_df['titik_b']]).dropna().astype(str), halte_df)
+
+    return _memo.get_or_compute(('titik', fingerprint), hitung)
+
+
+def get_hub_locations(fingerprint, hub_df, cocok, rute_df):
+    """
+    Tabel hub berlokasi, ter-memo per sidik jari sumber rute (termasuk filter).
+    """
+    return _memo.get_or_compute(('hub', fingerprint), lambda: hub_locations(hub_df, cocok, rute_df))
@@ -0,0 +1,42 @@
+"""
+Memo LRU kecil yang dikunci pada sidik jari dataset (ditambah parameter).
+
+Dipakai oleh modul analitik untuk menyimpan hasil turunan sekali per
+dataset per proses, sehingga rerun Streamlit hanya melakukan lookup.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class FingerprintMemo:
+    """
+    LRU thread-safe: kunci -> hasil. Hasil diperlakukan read-only oleh pemanggil.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        # Dihitung di luar lock agar sesi lain tidak ikut menunggu
+        hasil = compute()
+
+        with self._lock:
+            self._entries[key] = hasil
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return hasil
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
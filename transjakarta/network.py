@@ -0,0 +1,304 @@
+"""
+Mesin graf jaringan rute untuk analisis hub.
+
+Setiap rute pada rute_df adalah sisi berarah titik_a -> titik_b. Nama lokasi
+dikodekan menjadi indeks bilangan bulat (pd.factorize) dan ketetanggaan
+disimpan dalam format CSR (indptr/indices) berbasis NumPy, sehingga derajat,
+tipologi, sentralitas, dan jumlah transit dihitung tanpa loop Python per
+rute maupun per baris.
+
+- Derajat masuk/keluar dan PageRank memakai graf berarah (arah rute).
+- Betweenness dan jumlah transit memakai graf tak berarah tanpa sisi ganda,
+  karena penumpang dapat menempuh rute ke dua arah.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Ambang tipologi hub (selisih rute keluar - masuk) dan minimal koneksi
+AMBANG_TIPOLOGI = 2
+MIN_KONEKSI_HUB = 5
+
+# Batas ukuran matriks hop (jumlah sumber x jumlah simpul, int16)
+MAKS_SIMPUL_TRANSIT = 5000
+
+# Jumlah sumber BFS untuk betweenness dan distribusi transit; jaringan yang
+# lebih besar dihitung dari sampel sumber acak sebanyak ini
+SAMPEL_SUMBER = 512
+
+
+def hub_typology(rute_keluar, rute_masuk, ambang=AMBANG_TIPOLOGI):
+    """
+    Klasifikasi hub secara tervektorisasi berdasarkan selisih rute keluar dan masuk.
+    """
+    diff = np.asarray(rute_keluar) - np.asarray(rute_masuk)
+    return np.select(
+        [diff > ambang, diff < -ambang],
+        ["Dominan Terminal", "Dominan Tujuan"],
+        default="Seimbang (Transit)",
+    )
+
+
+def _csr(src, dst, n):
+    """
+    Membangun (indptr, indices) CSR dari daftar sisi.
+    """
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return indptr, dst[order].astype(np.int64)
+
+
+def _gather(indptr, indices, frontier):
+    """
+    Tetangga semua simpul pada `frontier` sekaligus.
+    Mengembalikan (posisi_asal, tetangga): posisi_asal menunjuk ke indeks di `frontier`.
+    """
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    pos = np.repeat(np.arange(len(frontier)), counts)
+    offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return pos, indices[starts[pos] + offset]
+
+
+class RouteNetwork:
+    """
+    Graf jaringan rute Transjakarta yang dibangun dari rute_df.
+    """
+
+    def __init__(self, rute_df, sumber='titik_a', tujuan='titik_b'):
+        n_rute = len(rute_df)
+        gabungan = pd.concat([rute_df[sumber], rute_df[tujuan]], ignore_index=True)
+        codes, uniques = pd.factorize(gabungan, use_na_sentinel=True)
+        codes = codes.astype(np.int64)
+
+        self.nodes = pd.Index(np.asarray(uniques, dtype=object).astype(str), name='Hub')
+        self.n = len(self.nodes)
+        src, dst = codes[:n_rute], codes[n_rute:]
+
+        # Derajat dihitung dari setiap ujung yang terisi, sama seperti value_counts
+        self.out_degree = np.bincount(src[src >= 0], minlength=self.n)
+        self.in_degree = np.bincount(dst[dst >= 0], minlength=self.n)
+
+        valid = (src >= 0) & (dst >= 0)
+        self.src, self.dst = src[valid], dst[valid]
+        self.indptr, self.indices = _csr(self.src, self.dst, self.n)
+
+        # Graf tak berarah tanpa sisi ganda dan loop, untuk jarak/transit
+        a = np.concatenate([self.src, self.dst])
+        b = np.concatenate([self.dst, self.src])
+        pasangan = np.unique(a[a != b] * self.n + b[a != b])
+        self.u_indptr, self.u_indices = _csr(pasangan // self.n, pasangan % self.n, self.n)
+
+        self._cache = {}
+
+    # --- Derajat dan tipologi ---
+
+    @property
+    def total_degree(self):
+        return self.in_degree + self.out_degree
+
+    def degree_series(self, kind='out'):
+        values = {'out': self.out_degree, 'in': self.in_degree, 'total': self.total_degree}[kind]
+        return pd.Series(values, index=self.nodes)
+
+    def typology(self):
+        return hub_typology(self.out_degree, self.in_degree)
+
+    def location_sets(self):
+        """
+        Himpunan lokasi keberangkatan (A) dan tujuan (B) untuk diagram Venn.
+        """
+        return (
+            frozenset(self.nodes[self.out_degree > 0]),
+            frozenset(self.nodes[self.in_degree > 0]),
+        )
+
+    def top_hubs(self, k=15):
+        """
+        Lokasi yang menjadi titik awal sekaligus titik akhir, diurutkan menurut total rute.
+        """
+        mask = (self.out_degree > 0) & (self.in_degree > 0)
+        return pd.Series(self.total_degree[mask], index=self.nodes[mask]).nlargest(k)
+
+    # --- Sentralitas ---
+
+    def pagerank(self, damping=0.85, tol=1e-10, max_iter=100):
+        """
+        PageRank pada graf berarah (bobot = jumlah rute) dengan iterasi pangkat.
+        """
+        if 'pagerank' in self._cache:
+            return self._cache['pagerank']
+        n = self.n
+        if n == 0:
+            return np.empty(0)
+        out_w = np.bincount(self.src, minlength=n).astype('float64')
+        dangling = out_w == 0
+        rank = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            share = np.divide(rank, out_w, out=np.zeros(n), where=~dangling)
+            masuk = np.bincount(self.dst, weights=share[self.src], minlength=n)
+            baru = (1 - damping) / n + damping * (masuk + rank[dangling].sum() / n)
+            selesai = np.abs(baru - rank).sum() < tol
+            rank = baru
+            if selesai:
+                break
+        self._cache['pagerank'] = rank
+        return rank
+
+    def _bfs(self, s):
+        """
+        BFS per level dari satu sumber pada graf tak berarah.
+        Mengembalikan (sigma, level_edges): jumlah lintasan terpendek ke setiap
+        simpul dan sisi (v, w) antar level berurutan untuk akumulasi balik.
+        """
+        dist = np.full(self.n, -1, dtype=np.int64)
+        sigma = np.zeros(self.n)
+        dist[s] = 0
+        sigma[s] = 1.0
+        frontier = np.array([s], dtype=np.int64)
+        level_edges = []
+        d = 0
+        while frontier.size:
+            pos, nbr = _gather(self.u_indptr, self.u_indices, frontier)
+            parent = frontier[pos]
+            baru = dist[nbr] == -1
+            dist[nbr[baru]] = d + 1
+            lanjut = dist[nbr] == d + 1
+            v, w = parent[lanjut], nbr[lanjut]
+            np.add.at(sigma, w, sigma[v])
+            level_edges.append((v, w))
+            frontier = np.unique(nbr[baru])
+            d += 1
+        return sigma, level_edges
+
+    def betweenness(self, sampel=SAMPEL_SUMBER, seed=0):
+        """
+        Betweenness centrality (Brandes) ternormalisasi pada graf tak berarah.
+        Bila jumlah simpul melebihi `sampel`, dihitung dari sumber acak dan diskalakan.
+        """
+        key = ('betweenness', sampel, seed)
+        if key in self._cache:
+            return self._cache[key]
+        n = self.n
+        bc = np.zeros(n)
+        if n < 3:
+            return bc
+        if sampel is None or sampel >= n:
+            sumber = np.arange(n)
+        else:
+            sumber = np.random.default_rng(seed).choice(n, sampel, replace=False)
+
+        for s in sumber:
+            sigma, level_edges = self._bfs(s)
+            delta = np.zeros(n)
+            for v, w in reversed(level_edges):
+                np.add.at(delta, v, sigma[v] / sigma[w] * (1 + delta[w]))
+            delta[s] = 0
+            bc += delta
+
+        # Graf tak berarah: setiap pasangan terhitung dua kali
+        bc *= (n / len(sumber)) / 2
+        bc *= 2 / ((n - 1) * (n - 2))
+        self._cache[key] = bc
+        return bc
+
+    # --- Transit ---
+
+    def _hop_blocks(self, sumber, batch):
+        """
+        BFS berkelompok: menghasilkan (mulai, blok hop) untuk setiap `batch` sumber.
+        """
+        n = self.n
+        for mulai in range(0, len(sumber), batch):
+            src = sumber[mulai:mulai + batch]
+            rows = np.arange(len(src))
+            blok = np.full((len(src), n), -1, dtype=np.int16)
+            blok[rows, src] = 0
+            front_row, front_node = rows, src
+            d = 0
+            while front_node.size:
+                pos, nbr = _gather(self.u_indptr, self.u_indices, front_node)
+                row = front_row[pos]
+                baru = blok[row, nbr] == -1
+                d += 1
+                blok[row[baru], nbr[baru]] = d
+                # Frontier berikutnya dibaca langsung dari blok (otomatis unik)
+                front_row, front_node = np.nonzero(blok == d)
+            yield mulai, blok
+
+    def hop_matrix(self, sumber=None, batch=256):
+        """
+        Jumlah rute minimum (hop) dari setiap simpul sumber ke semua simpul,
+        dengan BFS berkelompok. -1 berarti tidak terjangkau.
+        """
+        n = self.n
+        sumber = np.arange(n) if sumber is None else np.asarray(sumber, dtype=np.int64)
+        if len(sumber) * n > MAKS_SIMPUL_TRANSIT ** 2:
+            raise ValueError(
+                f"Matriks transit {len(sumber)} x {n} terlalu besar; gunakan sampel sumber."
+            )
+        hasil = np.full((len(sumber), n), -1, dtype=np.int16)
+        for mulai, blok in self._hop_blocks(sumber, batch):
+            hasil[mulai:mulai + len(blok)] = blok
+        return hasil
+
+    def transfer_distribution(self, sampel=SAMPEL_SUMBER, seed=0):
+        """
+        Distribusi jumlah transit minimum (hop - 1) antar semua pasangan lokasi
+        yang berbeda. Bila jumlah simpul melebihi `sampel`, dihitung dari sumber
+        acak dan jumlah pasangan diskalakan ke seluruh jaringan (perkiraan).
+        """
+        key = ('transit', sampel, seed)
+        if key in self._cache:
+            return self._cache[key]
+        n = self.n
+        if sampel is None or sampel >= n:
+            sumber = np.arange(n)
+        else:
+            sumber = np.sort(np.random.default_rng(seed).choice(n, sampel, replace=False))
+
+        # Hanya histogram yang disimpan, sehingga matriks hop tidak pernah utuh;
+        # ukuran blok diperkecil agar satu blok tetap dalam batas MAKS_SIMPUL_TRANSIT
+        batch = max(1, min(256, MAKS_SIMPUL_TRANSIT ** 2 // max(n, 1)))
+        jumlah = np.zeros(2, dtype=np.int64)
+        for _, blok in self._hop_blocks(sumber, batch):
+            # Geser +1 agar -1 (tidak terjangkau) masuk bin 0; hop 0 (diri sendiri) dibuang
+            bin_blok = np.bincount(blok.ravel().astype(np.int64) + 1)
+            if len(bin_blok) > len(jumlah):
+                jumlah = np.pad(jumlah, (0, len(bin_blok) - len(jumlah)))
+            jumlah[:len(bin_blok)] += bin_blok
+        jumlah[1] -= len(sumber)
+        skala = n / len(sumber) if len(sumber) else 0.0
+
+        label = [f"{hop - 1} kali transit" for hop in range(1, len(jumlah) - 1)] + ['Tidak terjangkau']
+        nilai = np.concatenate([jumlah[2:], jumlah[:1]]) * skala
+        hasil = pd.DataFrame({
+            'Jumlah Pasangan': np.rint(nilai).astype(np.int64),
+            'Proporsi': nilai / nilai.sum() if nilai.sum() else nilai,
+        }, index=pd.Index(label, name='Transit'))
+        hasil = hasil[hasil['Jumlah Pasangan'] > 0]
+        self._cache[key] = hasil
+        return hasil
+
+    # --- Tabel hub ---
+
+    def hub_table(self, min_koneksi=MIN_KONEKSI_HUB):
+        """
+        Tabel tipologi hub: rute masuk/keluar, total koneksi, tipologi, dan sentralitas.
+        """
+        mask = self.total_degree > min_koneksi
+        hub_df = pd.DataFrame({
+            'Hub': self.nodes[mask],
+            'Rute_Masuk': self.in_degree[mask],
+            'Rute_Keluar': self.out_degree[mask],
+            'Total_Koneksi': self.total_degree[mask],
+            'Tipologi': self.typology()[mask],
+            'PageRank': self.pagerank()[mask] if self.n else np.empty(0),
+            'Betweenness': self.betweenness()[mask],
+        })
+        return hub_df.sort_values(by=['Total_Koneksi', 'Hub'], ascending=[False, True]).reset_index(drop=True)
@@ -0,0 +1,302 @@
+"""
+Instrumentasi waktu dan memori per tahap untuk satu rerun dashboard.
+
+Profiler mencatat "span" bersarang: nama, fase (muat, hitung, render,
+kirim, llm), waktu wall-clock, waktu CPU thread, perubahan RSS, dan
+(opsional) puncak memori tracemalloc. Waktu "sendiri" setiap span
+(dikurangi span anak) dipakai untuk ringkasan per fase sehingga waktu
+tidak terhitung dua kali.
+
+Profiler aktif disimpan di ContextVar, sehingga modul pustaka dapat
+memanggil `span(...)` tanpa menerima objek profiler sebagai argumen.
+Bila tidak ada profiler aktif, `span` tidak melakukan apa pun selain
+satu lookup, sehingga instrumentasi aman dibiarkan di kode produksi.
+Setiap thread skrip Streamlit memiliki konteksnya sendiri, jadi daftar span
+sesi yang berbeda tidak tercampur. Waktu CPU diukur per thread
+(time.thread_time), sehingga tidak ikut menghitung sesi lain tetapi juga
+tidak menghitung kerja di thread pekerja pustaka. RSS dan tracemalloc
+berlaku untuk seluruh proses: bila profiler sesi lain berjalan selama
+sebuah span, perubahan RSS dan puncak memori span itu dikosongkan (None)
+karena tidak dapat dipisahkan per sesi. pandas baru diimpor saat hasil
+dibaca sebagai tabel.
+"""
+
+import contextlib
+import contextvars
+import datetime
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+
+FASE = ('muat', 'hitung', 'render', 'kirim', 'llm')
+
+# Lokasi bawaan log JSONL (di dalam direktori cache yang diabaikan git)
+LOG_BAWAAN = os.path.join('.cache', 'profil', 'rerun.jsonl')
+
+_aktif = contextvars.ContextVar('profiler_aktif', default=None)
+
+# Status profiler di seluruh proses (dilindungi _kunci_proses): per thread,
+# jumlah profiler yang sedang berjalan dan berapa kali profiler dimulai
+# (untuk mendeteksi sesi lain yang mulai dan selesai di tengah sebuah span),
+# serta jumlah profiler yang memakai tracemalloc yang dimulai modul ini
+_kunci_proses = threading.Lock()
+_proses = {'berjalan': {}, 'dimulai': {}, 'pengguna_tracemalloc': 0, 'tracemalloc_milik_modul': False}
+
+
+def _jejak_sesi_lain():
+    """
+    (profiler thread lain yang sedang berjalan, total profiler yang pernah dimulai thread lain).
+    """
+    sendiri = threading.get_ident()
+    with _kunci_proses:
+        berjalan = sum(n for t, n in _proses['berjalan'].items() if t != sendiri)
+        dimulai = sum(n for t, n in _proses['dimulai'].items() if t != sendiri)
+    return berjalan, dimulai
+
+
+def _rss_mb():
+    """
+    Resident set size proses saat ini (MB), atau None bila tidak tersedia.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Profiler:
+    """
+    Pencatat span untuk satu lingkup (mis. satu rerun atau satu pertanyaan chat).
+    Dengan `lacak_memori=True`, puncak alokasi Python per span diukur dengan
+    tracemalloc (menambah overhead, jadi hanya untuk diagnosis).
+    """
+
+    def __init__(self, lingkup='rerun', lacak_memori=False):
+        self.lingkup = lingkup
+        self.lacak_memori = lacak_memori
+        self.spans = []
+        self.total_detik = None
+        self._tumpukan = []
+        self._t0 = time.perf_counter()
+        self._berjalan = None  # ident thread saat profiler berjalan
+        self._sebelumnya = None
+
+    def start(self):
+        with _kunci_proses:
+            if self._berjalan is None:
+                self._berjalan = threading.get_ident()
+                _proses['berjalan'][self._berjalan] = _proses['berjalan'].get(self._berjalan, 0) + 1
+                _proses['dimulai'][self._berjalan] = _proses['dimulai'].get(self._berjalan, 0) + 1
+                if self.lacak_memori:
+                    if _proses['pengguna_tracemalloc'] == 0 and not tracemalloc.is_tracing():
+                        tracemalloc.start()
+                        _proses['tracemalloc_milik_modul'] = True
+                    _proses['pengguna_tracemalloc'] += 1
+        self._t0 = time.perf_counter()
+        return self
+
+    def stop(self):
+        """
+        Mengakhiri pencatatan (idempoten) dan melepas profiler dari konteks bila masih aktif.
+        """
+        with _kunci_proses:
+            if self._berjalan is not None:
+                if _proses['berjalan'][self._berjalan] == 1:
+                    # Hitungan 'dimulai' dipertahankan agar span sesi lain yang sedang
+                    # berjalan tetap tahu bahwa profiler ini sempat aktif
+                    del _proses['berjalan'][self._berjalan]
+                else:
+                    _proses['berjalan'][self._berjalan] -= 1
+                self._berjalan = None
+                if self.lacak_memori:
+                    _proses['pengguna_tracemalloc'] -= 1
+                    # tracemalloc hanya dihentikan oleh profiler terakhir yang memakainya
+                    if _proses['pengguna_tracemalloc'] == 0 and _proses['tracemalloc_milik_modul']:
+                        tracemalloc.stop()
+                        _proses['tracemalloc_milik_modul'] = False
+        if self.total_detik is None:
+            self.total_detik = time.perf_counter() - self._t0
+        if _aktif.get() is self:
+            _aktif.set(None)
+        return self
+
+    def __enter__(self):
+        self._sebelumnya = _aktif.get()
+        _aktif.set(self)
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        _aktif.set(self._sebelumnya)
+        return False
+
+    @contextlib.contextmanager
+    def span(self, nama, fase, **atribut):
+        """
+        Mengukur blok kode. Dict catatan di-yield agar pemanggil dapat
+        menambahkan atribut (mis. cache hit/miss) sebelum blok selesai.
+        """
+        induk = self._tumpukan[-1] if self._tumpukan else None
+        catatan = {
+            'nama': nama,
+            'fase': fase,
+            'bagian': atribut.pop('bagian', induk['bagian'] if induk else None),
+            'kedalaman': len(self._tumpukan),
+            **atribut,
+        }
+        self.spans.append(catatan)
+        catatan['_anak'] = 0.0
+        lain_berjalan, lain_dimulai = _jejak_sesi_lain()
+        sendiri = lain_berjalan == 0
+        if sendiri and self.lacak_memori and tracemalloc.is_tracing():
+            # Puncak induk sejauh ini disimpan sebelum direset untuk span ini
+            if induk is not None:
+                induk['_puncak'] = max(induk.get('_puncak', 0), tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        rss0 = _rss_mb()
+        cpu0 = time.thread_time()
+        t0 = time.perf_counter()
+        self._tumpukan.append(catatan)
+        try:
+            yield catatan
+        finally:
+            catatan['detik'] = time.perf_counter() - t0
+            catatan['cpu_detik'] = time.thread_time() - cpu0
+            # Profiler lain yang berjalan atau sempat dimulai selama span ini
+            # membuat ukuran memori seluruh proses tidak lagi milik sesi ini
+            sendiri = sendiri and _jejak_sesi_lain() == (0, lain_dimulai)
+            rss1 = _rss_mb()
+            catatan['rss_delta_mb'] = rss1 - rss0 if sendiri and rss0 is not None and rss1 is not None else None
+            puncak = catatan.pop('_puncak', 0)
+            if self.lacak_memori and tracemalloc.is_tracing():
+                if sendiri:
+                    puncak = max(puncak, tracemalloc.get_traced_memory()[1])
+                    catatan['puncak_mb'] = puncak / 2**20
+                    if induk is not None:
+                        induk['_puncak'] = max(induk.get('_puncak', 0), puncak)
+                else:
+                    catatan['puncak_mb'] = None
+            self._tumpukan.pop()
+            catatan['detik_sendiri'] = catatan['detik'] - catatan.pop('_anak')
+            if induk is not None:
+                induk['_anak'] += catatan['detik']
+
+    def iterate(self, nama, fase, iterable, **atribut):
+        """
+        Membungkus iterator (mis. aliran potongan jawaban LLM): mencatat waktu
+        sampai elemen pertama dan waktu total sampai iterator habis.
+        """
+        with self.span(nama, fase, **atribut) as catatan:
+            t0 = time.perf_counter()
+            jumlah = 0
+            for item in iterable:
+                if jumlah == 0:
+                    catatan['pertama_detik'] = time.perf_counter() - t0
+                jumlah += 1
+                yield item
+            catatan['jumlah_potongan'] = jumlah
+
+    def to_frame(self):
+        """
+        Semua span sebagai DataFrame (urutan mulai), nama diindentasi menurut kedalaman.
+        """
+        import pandas as pd
+
+        if not self.spans:
+            return pd.DataFrame(columns=['bagian', 'nama', 'fase', 'detik', 'detik_sendiri'])
+        df = pd.DataFrame(self.spans)
+        df['nama'] = [' ' * k + n for k, n in zip(df['kedalaman'], df['nama'])]
+        return df.drop(columns=['kedalaman'])
+
+    def phase_summary(self):
+        """
+        Total waktu sendiri per fase (detik), terurut dari yang terbesar.
+        """
+        import pandas as pd
+
+        if not self.spans:
+            return pd.Series(dtype='float64', name='detik')
+        df = pd.DataFrame(self.spans)
+        return df.groupby('fase')['detik_sendiri'].sum().sort_values(ascending=False).rename('detik')
+
+    def append_jsonl(self, path=LOG_BAWAAN, **meta):
+        """
+        Menambahkan satu baris JSON berisi seluruh span lingkup ini ke `path`.
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        baris = {
+            'waktu': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'lingkup': self.lingkup,
+            'total_detik': self.total_detik if self.total_detik is not None else time.perf_counter() - self._t0,
+            **meta,
+            'span': self.spans,
+        }
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(baris, default=str) + '\n')
+
+
+def activate(profiler):
+    """
+    Menjadikan `profiler` (atau None) aktif untuk sisa konteks ini, mis. satu
+    rerun skrip Streamlit. Profiler sebelumnya yang belum dihentikan (rerun
+    yang terputus oleh pengecualian atau st.stop) dihentikan lebih dulu.
+    """
+    lama = _aktif.get()
+    if lama is not None and lama is not profiler:
+        lama.stop()
+    _aktif.set(profiler)
+    if profiler is not None:
+        profiler.start()
+    return profiler
+
+
+def current():
+    """
+    Profiler yang aktif di konteks ini, atau None.
+    """
+    return _aktif.get()
+
+
+def span(nama, fase, **atribut):
+    """
+    Span pada profiler aktif; tanpa profiler aktif menjadi konteks kosong.
+    """
+    profiler = _aktif.get()
+    if profiler is None:
+        return contextlib.nullcontext({})
+    return profiler.span(nama, fase, **atribut)
+
+
+def iterate(nama, fase, iterable, **atribut):
+    """
+    Profiler.iterate pada profiler aktif; tanpa profiler aktif iterable dikembalikan apa adanya.
+    """
+    profiler = _aktif.get()
+    if profiler is None:
+        return iterable
+    return profiler.iterate(nama, fase, iterable, **atribut)
+
+
+def read_log(path=LOG_BAWAAN):
+    """
+    Membaca log JSONL menjadi DataFrame span (satu baris per span) untuk analisis sesi nyata.
+    """
+    import pandas as pd
+
+    baris = []
+    with open(path, encoding='utf-8') as f:
+        for nomor, line in enumerate(f):
+            catatan = json.loads(line)
+            for s in catatan['span']:
+                baris.append({
+                    'rerun': nomor,
+                    'waktu': catatan['waktu'],
+                    'lingkup': catatan['lingkup'],
+                    **{k: v for k, v in catatan.items() if k not in ('span', 'waktu', 'lingkup', 'total_detik')},
+                    **s,
+                })
+    return pd.DataFrame(baris)
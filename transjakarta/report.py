@@ -0,0 +1,243 @@
+"""
+Mesin laporan batch tanpa Streamlit.
+
+Menjalankan pipeline yang sama dengan dashboard (ingest -> normalisasi
+koordinat -> agregat) lalu menulis setiap tabel sebagai Parquet/CSV,
+setiap grafik sebagai PNG/SVG, peta halte sebagai HTML interaktif
+(pydeck), dan satu halaman index.html yang memuat semuanya. Grafik
+yang saling bebas dirender paralel di ProcessPoolExecutor.
+
+Contoh (dari root repo):
+    python -m transjakarta.report --output laporan
+    python -m transjakarta.report --output laporan --format png svg --workers 4
+"""
+
+import argparse
+import base64
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from transjakarta.analytics import get_store_aggregates
+from transjakarta.charts import coverage_chart, dashboard_charts, render_figure
+from transjakarta.coords import normalize_coordinates
+from transjakarta.maps import TINGKAT_DETAIL, build_deck, get_map_layers
+from transjakarta.matching import get_endpoint_matches, get_hub_locations
+from transjakarta.spatial import coverage_gaps, get_coverage
+from transjakarta.store import PartitionedStore
+
+
+FORMAT_GRAFIK = ('png', 'svg')
+FORMAT_TABEL = ('parquet', 'csv')
+
+
+def load_dataset(data_dir='.'):
+    """
+    Memuat dan menyiapkan data seperti load_data pada aplikasi: direktori data
+    disinkronkan ke penyimpanan terpartisinya lalu dibaca dari sana.
+    Mengembalikan (store, halte_df, bus_penumpang_df, rute_df, halte_ditolak_df).
+    """
+    store = PartitionedStore(data_dir)
+    for nama_file, galat in store.sync()['gagal'].items():
+        print(f"Lewati {nama_file}: {galat}", file=sys.stderr)
+    frames = store.load()
+    halte_df, halte_ditolak_df = normalize_coordinates(frames['halte'])
+    return store, halte_df, frames['bus_penumpang'], frames['rute'], halte_ditolak_df
+
+
+def report_tables(agg, celah=None, lapisan=None, hub_df=None, cocok=None):
+    """
+    Semua tabel laporan: nama -> DataFrame. `hub_df` (tabel hub berlokasi)
+    menggantikan tabel tipologi hub bila diberikan.
+    """
+    tabel = {
+        'rasio_penumpang_bus': agg['ratio_df'],
+        'tipologi_hub': agg['hub_analysis_df'],
+        'tren_tahunan': agg['yearly_df'],
+        'halte_per_wilayah': agg['halte_by_wilayah'].rename('Jumlah Halte').to_frame(),
+        'halte_per_kecamatan': agg['halte_by_kecamatan'].rename('Jumlah Halte').to_frame(),
+        'rute_per_kategori': agg['rute_by_kategori'].rename('Jumlah Rute').to_frame(),
+        'koefisien_korelasi': agg['korelasi']['koefisien'],
+        'transit_antar_lokasi': agg['network'].transfer_distribution(),
+    }
+    if celah is not None:
+        tabel['celah_cakupan_kecamatan'] = celah['per_kecamatan']
+    if lapisan is not None:
+        tabel['ringkasan_wilayah'] = lapisan['wilayah']
+        tabel['ringkasan_kecamatan'] = lapisan['kecamatan']
+    if hub_df is not None:
+        tabel['tipologi_hub'] = hub_df
+    if cocok is not None:
+        tabel['padanan_titik_halte'] = cocok
+    return tabel
+
+
+def _render_tugas(tugas):
+    """
+    Pekerja pool: merender satu grafik ke satu format. Harus tingkat modul agar bisa di-pickle.
+    """
+    nama, spec, fmt = tugas
+    t0 = time.perf_counter()
+    data = render_figure(spec, figsize=spec.figsize, fmt=fmt)
+    return nama, fmt, data, time.perf_counter() - t0
+
+
+def render_charts(specs, formats=('png',), workers=None):
+    """
+    Merender semua grafik ke semua format di ProcessPoolExecutor.
+    `workers` bawaan = jumlah CPU; <= 1 berarti serial di proses ini (setiap
+    proses pekerja harus mengimpor matplotlib sendiri, jadi pool hanya
+    menguntungkan bila ada lebih dari satu inti).
+    Mengembalikan {(nama, fmt): (byte, detik)} dengan urutan sesuai `specs`.
+    """
+    tugas = [(nama, spec, fmt) for nama, spec in specs.items() for fmt in formats]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(tugas))
+    if workers <= 1:
+        hasil = map(_render_tugas, tugas)
+        return {(nama, fmt): (data, detik) for nama, fmt, data, detik in hasil}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # chunksize 1: grafik berbeda jauh biayanya, jadi dibagi satu per satu
+        hasil = list(pool.map(_render_tugas, tugas, chunksize=1))
+    return {(nama, fmt): (data, detik) for nama, fmt, data, detik in hasil}
+
+
+def write_table(df, path_tanpa_ekstensi, formats):
+    """
+    Menulis satu tabel ke setiap format; mengembalikan daftar file yang ditulis.
+    """
+    ditulis = []
+    for fmt in formats:
+        path = f"{path_tanpa_ekstensi}.{fmt}"
+        if fmt == 'parquet':
+            try:
+                df.to_parquet(path)
+            except ImportError:
+                print(f"Lewati {path}: pyarrow tidak terpasang.", file=sys.stderr)
+                continue
+        else:
+            df.to_csv(path)
+        ditulis.append(path)
+    return ditulis
+
+
+def _halaman_index(judul, fingerprint, gambar, tabel, peta):
+    """
+    Halaman HTML mandiri berisi semua grafik (PNG tertanam), tabel, dan tautan peta.
+    """
+    bagian = [
+        f"<h1>{html.escape(judul)}</h1>",
+        f"<p>Sidik jari dataset: <code>{html.escape(str(fingerprint))}</code></p>",
+        "<h2>Grafik</h2>",
+    ]
+    for nama, data in gambar.items():
+        b64 = base64.b64encode(data).decode('ascii')
+        bagian.append(f"<figure><img src='data:image/png;base64,{b64}' style='max-width:100%'><figcaption>{html.escape(nama)}</figcaption></figure>")
+    if peta:
+        bagian.append("<h2>Peta Halte</h2><ul>")
+        bagian += [f"<li><a href='{html.escape(path)}'>{html.escape(nama)}</a></li>" for nama, path in peta.items()]
+        bagian.append("</ul>")
+    bagian.append("<h2>Tabel</h2>")
+    for nama, df in tabel.items():
+        bagian.append(f"<h3>{html.escape(nama)}</h3>")
+        bagian.append(df.to_html(float_format=lambda x: f"{x:,.4g}", border=0))
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(judul)}</title>"
+        "<style>body{font-family:'Segoe UI',sans-serif;max-width:1200px;margin:auto}"
+        "table{border-collapse:collapse}td,th{padding:2px 8px;border-bottom:1px solid #ddd}</style>"
+        "</head><body>" + "\n".join(bagian) + "</body></html>"
+    )
+
+
+def build_report(output, data_dir='.', formats=('png',), tabel_formats=FORMAT_TABEL, workers=None,
+                 ambang_km=1.0, peta=True):
+    """
+    Membangun seluruh laporan di direktori `output`. Mengembalikan manifest (dict).
+    """
+    waktu = {}
+    t0 = time.perf_counter()
+    store, halte_df, bus_penumpang_df, rute_df, _ = load_dataset(data_dir)
+    agg = get_store_aggregates(store, bus_penumpang_df, rute_df)
+    fingerprint = agg['fingerprint']
+    raster = get_coverage(fingerprint, halte_df)['raster']
+    celah = coverage_gaps(raster, halte_df, ambang_km)
+    lapisan = get_map_layers(fingerprint, halte_df)
+    cocok = get_endpoint_matches(fingerprint, rute_df, halte_df)
+    hub_df = get_hub_locations(fingerprint, agg['hub_analysis_df'], cocok, rute_df)
+    waktu['data_dan_agregat'] = time.perf_counter() - t0
+
+    dir_tabel = os.path.join(output, 'tabel')
+    dir_grafik = os.path.join(output, 'grafik')
+    os.makedirs(dir_tabel, exist_ok=True)
+    os.makedirs(dir_grafik, exist_ok=True)
+    manifest = {'fingerprint': fingerprint, 'tabel': [], 'grafik': [], 'peta': []}
+
+    t0 = time.perf_counter()
+    tabel = report_tables(agg, celah, lapisan, hub_df, cocok)
+    for nama, df in tabel.items():
+        manifest['tabel'] += write_table(df, os.path.join(dir_tabel, nama), tabel_formats)
+    waktu['tabel'] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    specs = dashboard_charts(agg, bus_penumpang_df)
+    specs['cakupan'] = coverage_chart(raster, halte_df, ambang_km)
+    # PNG selalu dirender karena dipakai di index.html
+    formats = tuple(dict.fromkeys(('png',) + tuple(formats)))
+    hasil = render_charts(specs, formats, workers)
+    for (nama, fmt), (data, _) in hasil.items():
+        path = os.path.join(dir_grafik, f"{nama}.{fmt}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        manifest['grafik'].append(path)
+    waktu['grafik'] = time.perf_counter() - t0
+    waktu['grafik_total_cpu'] = sum(detik for _, detik in hasil.values())
+
+    peta_html = {}
+    if peta:
+        t0 = time.perf_counter()
+        for i, tingkat in enumerate(TINGKAT_DETAIL):
+            deck, _ = build_deck(lapisan, tingkat)
+            nama_file = f"peta_halte_{i + 1}.html"
+            deck.to_html(os.path.join(output, nama_file), open_browser=False, notebook_display=False)
+            peta_html[tingkat] = nama_file
+            manifest['peta'].append(os.path.join(output, nama_file))
+        waktu['peta'] = time.perf_counter() - t0
+
+    gambar = {nama: data for (nama, fmt), (data, _) in hasil.items() if fmt == 'png'}
+    with open(os.path.join(output, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(_halaman_index("Laporan Analisis Transjakarta", fingerprint, gambar, tabel, peta_html))
+
+    manifest['waktu_detik'] = waktu
+    with open(os.path.join(output, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangun laporan dashboard Transjakarta tanpa Streamlit.")
+    parser.add_argument('--output', default='laporan', help="Direktori keluaran (default: laporan).")
+    parser.add_argument('--data-dir', default='.', help="Direktori file Excel/CSV sumber (default: direktori kerja).")
+    parser.add_argument('--format', nargs='+', choices=FORMAT_GRAFIK, default=['png'], help="Format grafik.")
+    parser.add_argument('--tabel', nargs='+', choices=FORMAT_TABEL, default=list(FORMAT_TABEL), help="Format tabel.")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses render grafik (1 = serial; default: jumlah CPU).")
+    parser.add_argument('--ambang-km', type=float, default=1.0, help="Ambang jarak celah cakupan (km).")
+    parser.add_argument('--tanpa-peta', action='store_true', help="Jangan tulis peta HTML pydeck.")
+    args = parser.parse_args(argv)
+
+    manifest = build_report(
+        args.output, data_dir=args.data_dir, formats=args.format, tabel_formats=args.tabel,
+        workers=args.workers, ambang_km=args.ambang_km, peta=not args.tanpa_peta,
+    )
+    print(f"{len(manifest['tabel'])} file tabel, {len(manifest['grafik'])} file grafik, "
+          f"{len(manifest['peta'])} peta -> {os.path.abspath(args.output)}")
+    for tahap, detik in manifest['waktu_detik'].items():
+        print(f"  {tahap:<18} {detik * 1000:>8.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
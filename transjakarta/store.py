@@ -0,0 +1,403 @@
+"""
+Penyimpanan terpartisi untuk ingest inkremental ekstrak multi-periode.
+
+Direktori data dipantau untuk file Excel/CSV yang namanya cocok dengan
+pola setiap sumber (SUMBER_DATA[...]['pola'], mis. "Data Rute Jalur
+Transjakarta *"), sehingga ekstrak bulanan/tahunan baru cukup diletakkan
+di direktori yang sama. Setiap sinkronisasi hanya mem-parse file yang baru
+atau berubah (dideteksi dari mtime dan ukuran, tanpa membuka file), lalu
+menulis barisnya sebagai file Feather per partisi bergaya Hive:
+
+    <root>/<sumber>/periode_data=2024/jenis_layanan=BRT/<kunci-file>.feather
+
+Setiap file partisi berasal dari tepat satu file sumber, sehingga file yang
+berubah cukup mengganti partisinya sendiri dan file yang dihapus cukup
+menghapus partisinya. Manifest JSON mencatat file sumber, kuncinya, dan
+partisi yang dihasilkan; manifest ditulis ulang secara atomik.
+
+Selain partisi, setiap sumber memiliki satu snapshot Feather gabungan
+(<root>/<sumber>.feather) yang ditulis ulang saat sinkronisasi bila versi
+sumber itu berubah. Pembacaan seluruh sumber (load()) cukup memetakan satu
+file tersebut ke memori; partisi hanya dibaca untuk pembacaan tersaring.
+
+Setiap ekstrak dianggap memuat periode yang belum ada di file lain; baris
+dari beberapa file digabung apa adanya tanpa deduplikasi.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import quote
+
+import pandas as pd
+
+from transjakarta.ingest import SCHEMA_VERSION, SUMBER_DATA, apply_schema, source_key
+from transjakarta.profiling import span
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - pyarrow opsional
+    feather = None
+
+
+STORE_SUBDIR = os.path.join('.cache', 'store')
+
+# Ekstensi file sumber yang dikenali dan cara membacanya
+EKSTENSI_SUMBER = ('.xlsx', '.xls', '.csv')
+
+NILAI_KOSONG = '__kosong__'
+
+# Nomor baris di file sumber, agar read() mengembalikan urutan asli file
+# (urutan memengaruhi penentuan seri pada hitungan teratas)
+KOLOM_URUTAN = '_baris'
+
+
+def _nilai_json(v):
+    """
+    Nilai partisi sebagai tipe JSON biasa (NaN menjadi None).
+    """
+    if v is None or (isinstance(v, float) and v != v):
+        return None
+    return v.item() if hasattr(v, 'item') else v
+
+
+def _baca_file_sumber(path, spec):
+    if path.lower().endswith('.csv'):
+        df = pd.read_csv(path)
+    else:
+        df = pd.read_excel(path, sheet_name=spec['sheet_name'])
+    return apply_schema(df, spec)
+
+
+def _tulis_frame(df, path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    if feather is not None:
+        feather.write_feather(df, tmp, compression='uncompressed')
+    else:
+        df.to_pickle(tmp)
+    os.replace(tmp, path)
+
+
+def _baca_frame(path):
+    if feather is not None:
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_pickle(path)
+
+
+class PartitionedStore:
+    """
+    Penyimpanan terpartisi untuk satu direktori data.
+    Aman dipakai bersama oleh banyak sesi dalam satu proses: sync() dan
+    setiap pembaca manifest memegang kunci yang sama, sehingga pembaca tidak
+    pernah melihat manifest atau partisi yang sedang diganti.
+    """
+
+    def __init__(self, data_dir='.', root=None, sumber=None):
+        self.data_dir = data_dir
+        self.root = root or os.path.join(data_dir, STORE_SUBDIR)
+        self.sumber = sumber or SUMBER_DATA
+        self._lock = threading.RLock()
+        self._manifest = self._baca_manifest()
+        self.terakhir_sinkron = None
+
+    # --- manifest ---
+
+    @property
+    def _path_manifest(self):
+        return os.path.join(self.root, 'manifest.json')
+
+    def _baca_manifest(self):
+        try:
+            with open(self._path_manifest, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        if not manifest or manifest.get('versi') != SCHEMA_VERSION:
+            return {'versi': SCHEMA_VERSION, 'file': {}}
+        return manifest
+
+    def _simpan_manifest(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp = f"{self._path_manifest}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self._manifest, f, indent=1)
+        os.replace(tmp, self._path_manifest)
+
+    # --- pemindaian ---
+
+    def discover(self):
+        """
+        File sumber di direktori data: nama file -> nama sumber.
+        """
+        hasil = {}
+        try:
+            nama_file = sorted(os.listdir(self.data_dir))
+        except FileNotFoundError:
+            return hasil
+        for fname in nama_file:
+            dasar, ext = os.path.splitext(fname)
+            if ext.lower() not in EKSTENSI_SUMBER or fname.startswith('~$'):  # lewati file kunci Excel
+                continue
+            for nama, spec in self.sumber.items():
+                if 'pola' in spec and fnmatch.fnmatchcase(dasar, spec['pola']):
+                    hasil[fname] = nama
+                    break
+        return hasil
+
+    def scan(self):
+        """
+        Perubahan direktori data terhadap manifest tanpa membuka file (hanya os.stat).
+        Mengembalikan dict 'baru', 'berubah', 'dihapus' berisi daftar nama file.
+        """
+        with self._lock:
+            ditemukan = self.discover()
+            tercatat = self._manifest['file']
+            perubahan = {'baru': [], 'berubah': [], 'dihapus': []}
+            for fname, nama in ditemukan.items():
+                try:
+                    key = source_key(os.path.join(self.data_dir, fname))
+                except FileNotFoundError:
+                    continue  # terhapus di antara listdir dan stat
+                if fname not in tercatat:
+                    perubahan['baru'].append(fname)
+                elif tercatat[fname]['key'] != key:
+                    perubahan['berubah'].append(fname)
+            perubahan['dihapus'] = [f for f in tercatat if f not in ditemukan]
+            return perubahan
+
+    # --- sinkronisasi ---
+
+    def _hapus_partisi(self, entri):
+        for p in entri.get('partisi', []):
+            try:
+                os.remove(os.path.join(self.root, p['path']))
+            except OSError:
+                pass
+
+    def _tulis_partisi(self, nama, fname, key, df):
+        spec = self.sumber[nama]
+        kolom = [k for k in spec.get('partisi', []) if k in df.columns]
+        df = df.assign(**{KOLOM_URUTAN: range(len(df))})
+        # File tanpa baris tetap mendapat satu partisi kosong agar kolomnya tercatat
+        kelompok = df.groupby(kolom, observed=True, dropna=False, sort=True) if kolom and len(df) else [((), df)]
+        partisi = []
+        for nilai, bagian in kelompok:
+            nilai = nilai if isinstance(nilai, tuple) else (nilai,)
+            segmen = [
+                f"{k}={quote(str(v), safe='') if _nilai_json(v) is not None else NILAI_KOSONG}"
+                for k, v in zip(kolom, nilai)
+            ]
+            rel = os.path.join(nama, *segmen, f"{key}.feather")
+            os.makedirs(os.path.dirname(os.path.join(self.root, rel)), exist_ok=True)
+            _tulis_frame(bagian.reset_index(drop=True), os.path.join(self.root, rel))
+            partisi.append({'path': rel, 'nilai': {k: _nilai_json(v) for k, v in zip(kolom, nilai)}, 'baris': len(bagian)})
+        return partisi
+
+    def sync(self):
+        """
+        Mem-parse file baru/berubah, menulis partisinya, dan menghapus partisi
+        file yang berubah atau hilang. File yang gagal dibaca dicatat beserta
+        pesan galatnya dan tidak dicoba lagi sampai file tersebut berubah.
+        Mengembalikan perubahan seperti scan() ditambah 'gagal' (nama file -> pesan).
+        """
+        with self._lock:
+            perubahan = self.scan()
+            perubahan['gagal'] = {}
+            ada_perubahan = any(perubahan.values())
+            tercatat = self._manifest['file']
+            for fname in perubahan['dihapus']:
+                self._hapus_partisi(tercatat.pop(fname))
+
+            ditemukan = self.discover()
+            for fname in perubahan['baru'] + perubahan['berubah']:
+                nama = ditemukan[fname]
+                path = os.path.join(self.data_dir, fname)
+                key = source_key(path)
+                if fname in tercatat:
+                    self._hapus_partisi(tercatat.pop(fname))
+                entri = {'sumber': nama, 'key': key, 'mtime': os.stat(path).st_mtime, 'partisi': []}
+                try:
+                    with span(f"parse {fname}", 'muat', sumber=nama):
+                        df = _baca_file_sumber(path, self.sumber[nama])
+                    entri['baris'] = len(df)
+                    entri['partisi'] = self._tulis_partisi(nama, fname, key, df)
+                except Exception as e:  # file rusak tidak boleh menghentikan sumber lain
+                    entri['galat'] = f"{type(e).__name__}: {e}"
+                    perubahan['gagal'][fname] = entri['galat']
+                tercatat[fname] = entri
+
+            if self._perbarui_snapshot() or ada_perubahan:
+                self._simpan_manifest()
+            self.terakhir_sinkron = time.time()
+            return perubahan
+
+    def _path_snapshot(self, nama):
+        return os.path.join(self.root, f"{nama}.feather")
+
+    def _perbarui_snapshot(self):
+        """
+        Menulis ulang snapshot gabungan setiap sumber yang versinya berubah.
+        Mengembalikan True bila manifest ikut berubah.
+        """
+        snapshot = self._manifest.setdefault('snapshot', {})
+        berubah = False
+        for nama in self.sumber:
+            versi = self.version(nama)
+            if snapshot.get(nama) == versi:
+                continue
+            if self.entries(nama):
+                with span(f"snapshot {nama}", 'muat', sumber=nama):
+                    _tulis_frame(self._baca_partisi(nama), self._path_snapshot(nama))
+                snapshot[nama] = versi
+                berubah = True
+            elif snapshot.pop(nama, None) is not None:
+                try:
+                    os.remove(self._path_snapshot(nama))
+                except OSError:
+                    pass
+                berubah = True
+        return berubah
+
+    # --- pembacaan ---
+
+    def entries(self, nama):
+        """
+        Entri manifest yang berhasil dibaca untuk satu sumber: daftar (nama file, entri), urut mtime.
+        """
+        with self._lock:
+            entri = [(f, e) for f, e in self._manifest['file'].items() if e['sumber'] == nama and 'galat' not in e]
+            return sorted(entri, key=lambda fe: (fe[1]['mtime'], fe[0]))
+
+    def version(self, nama):
+        """
+        Sidik jari isi satu sumber (berubah hanya bila file sumber tersebut berubah).
+        """
+        with self._lock:
+            kunci = '|'.join(f"{f}:{e['key']}" for f, e in self.entries(nama))
+            return hashlib.sha1(f"{nama}|{kunci}".encode('utf-8')).hexdigest()[:16]
+
+    def fingerprint(self):
+        """
+        Sidik jari gabungan seluruh sumber.
+        """
+        with self._lock:
+            versi = '|'.join(self.version(nama) for nama in sorted(self.sumber))
+            return hashlib.sha1(versi.encode('utf-8')).hexdigest()[:16]
+
+    def read(self, nama, where=None, file=None):
+        """
+        Baris satu sumber. Tanpa `where` dan `file` dibaca dari snapshot
+        gabungan; `where` ({kolom: [nilai, ...]}) hanya membaca partisi yang
+        cocok, dan `file` membatasi ke partisi satu file sumber.
+        """
+        with self._lock:
+            if not self.entries(nama):
+                raise FileNotFoundError(2, "Tidak ada file sumber yang cocok", os.path.join(self.data_dir, self.sumber[nama]['pola']))
+            if where is None and file is None and self._manifest.get('snapshot', {}).get(nama) == self.version(nama):
+                return _baca_frame(self._path_snapshot(nama))
+            return self._baca_partisi(nama, where, file)
+
+    def _baca_partisi(self, nama, where=None, file=None):
+        spec = self.sumber[nama]
+        entri = self.entries(nama)
+        frames = []
+        for fname, e in entri:
+            if file is not None and fname != file:
+                continue
+            bagian = [
+                _baca_frame(os.path.join(self.root, p['path']))
+                for p in e['partisi']
+                if not (where and any(k in p['nilai'] and p['nilai'][k] not in v for k, v in where.items()))
+            ]
+            if bagian:
+                frames.append(pd.concat(bagian, ignore_index=True).sort_values(KOLOM_URUTAN, kind='stable'))
+        if not frames:
+            contoh = next(p for _, e in entri for p in e['partisi'])
+            frames = [_baca_frame(os.path.join(self.root, contoh['path'])).iloc[:0]]
+        # Partisi kosong (file tanpa baris) tidak boleh mengubah tipe kolom hasil gabungan
+        frames = [f for f in frames if len(f)] or frames[:1]
+        df = pd.concat(frames, ignore_index=True).drop(columns=KOLOM_URUTAN)
+        # Kategori tiap partisi berbeda; disamakan kembali setelah digabung
+        return apply_schema(df, spec)
+
+    def load(self):
+        """
+        Semua sumber sebagai dict nama -> DataFrame, dari versi manifest yang sama.
+        """
+        with self._lock:
+            return {nama: self.read(nama) for nama in self.sumber}
+
+    def summary(self):
+        """
+        Ringkasan manifest: satu baris per file sumber.
+        """
+        with self._lock:
+            baris = [
+                {
+                    'file': f,
+                    'sumber': e['sumber'],
+                    'baris': e.get('baris'),
+                    'partisi': len(e['partisi']),
+                    'diubah': pd.Timestamp(e['mtime'], unit='s'),
+                    'galat': e.get('galat'),
+                }
+                for f, e in sorted(self._manifest['file'].items(), key=lambda fe: (fe[1]['sumber'], fe[1]['mtime']))
+            ]
+            return pd.DataFrame(baris, columns=['file', 'sumber', 'baris', 'partisi', 'diubah', 'galat'])
+
+
+def load_directory(data_dir='.', root=None):
+    """
+    Menyinkronkan `data_dir` ke penyimpanan terpartisinya lalu memuat semua
+    sumber (dict nama -> DataFrame). File yang gagal dibaca dilewati.
+    """
+    store = PartitionedStore(data_dir, root=root)
+    store.sync()
+    return store.load()
+
+
+def watch(store, interval=30.0, callback=None, berhenti=None):
+    """
+    Memantau direktori data: sinkronisasi setiap `interval` detik dan memanggil
+    `callback(perubahan)` bila ada perubahan. Berjalan sampai `berhenti`
+    (threading.Event) diset.
+    """
+    berhenti = berhenti or threading.Event()
+    while not berhenti.is_set():
+        perubahan = store.sync()
+        if any(perubahan.values()) and callback is not None:
+            callback(perubahan)
+        berhenti.wait(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sinkronkan direktori data Transjakarta ke penyimpanan terpartisi.")
+    parser.add_argument('--data-dir', default='.', help="Direktori file Excel/CSV sumber (default: direktori kerja).")
+    parser.add_argument('--watch', type=float, default=None, metavar='DETIK', help="Pantau terus dengan interval ini.")
+    args = parser.parse_args(argv)
+
+    store = PartitionedStore(args.data_dir)
+
+    def laporkan(perubahan):
+        for jenis in ('baru', 'berubah', 'dihapus'):
+            for fname in perubahan[jenis]:
+                print(f"{jenis:<8} {fname}")
+        for fname, galat in perubahan['gagal'].items():
+            print(f"gagal    {fname}: {galat}")
+
+    if args.watch:
+        try:
+            watch(store, args.watch, laporkan)
+        except KeyboardInterrupt:
+            pass
+    else:
+        laporkan(store.sync())
+        print(store.summary().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
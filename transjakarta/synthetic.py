@@ -0,0 +1,180 @@
+"""
+Pembangkit data sintetis berskema sama dengan workbook sumber.
+
+Data sampel hanya berisi ratusan baris, sehingga perilaku pipeline pada
+data 10x-1000x lebih besar tidak terlihat. Modul ini membangkitkan tabel
+halte, rute, dan bus/penumpang dengan kolom, tipe, dan format mentah yang
+sama dengan file Excel (termasuk koordinat berjumlah digit campuran dan
+baris rusak), menggunakan data sampel sebagai templat sebaran:
+
+- halte: baris templat dipilih acak; koordinat valid digeser beberapa
+  ratus meter lalu ditulis ulang dengan jumlah digit baris templatnya.
+- rute: titik keberangkatan/tujuan ditarik dari lokasi nyata ditambah
+  lokasi sintetis (bertambah ~sqrt(skala)) dengan popularitas Zipf, sehingga
+  tetap ada sedikit hub besar.
+- bus_penumpang: deret triwulanan diperpanjang ke tahun-tahun sebelumnya dan
+  layanan nyata digandakan sebagai layanan sintetis dengan rasio
+  penumpang/bus yang mirip.
+
+Contoh (dari root repo):
+    python -m transjakarta.synthetic --skala 10 --output data_sintetis/x10
+    python -m transjakarta.report --data-dir data_sintetis/x10 --output laporan_x10
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from transjakarta.coords import normalize_coordinates
+from transjakarta.ingest import SUMBER_DATA, sources_in
+from transjakarta.store import load_directory
+
+
+# Simpangan pergeseran koordinat halte sintetis dari halte templat (derajat, ~500 m)
+SIMPANGAN_DERAJAT = 0.005
+
+# Eksponen Zipf popularitas lokasi rute
+EKSPONEN_ZIPF = 0.8
+
+
+def _digit(values):
+    """
+    Jumlah digit bagian bulat nilai absolut (0 untuk nol/NaN).
+    """
+    values = np.abs(np.asarray(values, dtype='float64'))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digit = np.floor(np.log10(values)) + 1
+    return np.where(np.isfinite(digit), digit, 0).astype('int64')
+
+
+def synthetic_halte(templat, n, rng):
+    """
+    `n` halte sintetis dari DataFrame halte `templat` (koordinat belum dinormalisasi).
+    """
+    valid, _ = normalize_coordinates(templat)
+    idx = rng.integers(0, len(templat), n)
+    df = templat.iloc[idx].reset_index(drop=True)
+    df['nama_halte'] = (df['nama_halte'].astype(str) + ' ' + pd.Series(np.arange(n)).astype(str)).astype('string')
+
+    # Baris templat yang ditolak disalin apa adanya agar proporsi baris rusak tetap sama
+    sah = templat.index[idx].isin(valid.index)
+    pusat = valid.reindex(templat.index[idx])
+    lat = pusat['lat'].to_numpy() + rng.normal(0, SIMPANGAN_DERAJAT, n)
+    lon = pusat['lon'].to_numpy() + rng.normal(0, SIMPANGAN_DERAJAT, n)
+    # Jumlah digit mengikuti baris templat: lintang 1 digit bulat, bujur 3 digit bulat
+    x = np.round(lat * 10.0 ** (_digit(df['koordinat_x']) - 1))
+    y = np.round(lon * 10.0 ** (_digit(df['koordinat_y']) - 3))
+    # Int64 (nullable): koordinat templat yang kosong tetap kosong
+    for kolom, nilai in (('koordinat_x', x), ('koordinat_y', y)):
+        asli = pd.to_numeric(df[kolom], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        df[kolom] = pd.array(np.where(sah, nilai, asli), dtype='Float64').astype('Int64')
+    return df
+
+
+def synthetic_rute(templat, n, rng, skala):
+    """
+    `n` rute sintetis dari DataFrame rute `templat`.
+    """
+    frekuensi = pd.concat([templat['titik_a'], templat['titik_b']]).dropna().value_counts()
+    nyata = frekuensi.index.astype(str).to_numpy()
+    n_lokasi = max(len(nyata), math.ceil(len(nyata) * math.sqrt(skala)))
+    lokasi = np.concatenate([nyata, [f"Lokasi Sintetis {i}" for i in range(n_lokasi - len(nyata))]])
+    # Lokasi nyata yang paling sering dipakai mendapat peringkat teratas
+    p = 1 / np.arange(1, n_lokasi + 1) ** EKSPONEN_ZIPF
+    p /= p.sum()
+
+    titik_a = rng.choice(lokasi, n, p=p)
+    titik_b = rng.choice(lokasi, n, p=p).astype(object)
+    titik_b[rng.random(n) < templat['titik_b'].isna().mean()] = None
+
+    kategori = templat['kategori'].value_counts(normalize=True)
+    periode = templat['periode_data'].value_counts(normalize=True)
+    df = pd.DataFrame({
+        'periode_data': rng.choice(periode.index.to_numpy(), n, p=periode.to_numpy()),
+        'kategori': rng.choice(kategori.index.astype(str).to_numpy(), n, p=kategori.to_numpy()),
+        'kode': [f"S{i}" for i in range(n)],
+        'jurusan': [f"{a} - {b}" if b is not None else a for a, b in zip(titik_a, titik_b)],
+        'titik_a': titik_a,
+        'titik_b': titik_b,
+    })
+    return df[list(templat.columns)]
+
+
+def synthetic_bus_penumpang(templat, n, rng, skala):
+    """
+    Sekitar `n` baris bus/penumpang triwulanan sintetis dari DataFrame `templat`.
+    """
+    per_layanan = templat.groupby('jenis_layanan', observed=True).agg(
+        jumlah_bus=('jumlah_bus', 'mean'), jumlah_penumpang=('jumlah_penumpang', 'mean'),
+    )
+    per_layanan.index = per_layanan.index.astype(str)
+    n_salinan = max(1, math.ceil(math.sqrt(skala)))
+    layanan = []
+    for k in range(n_salinan):
+        for nama, baris in per_layanan.iterrows():
+            label = nama if k == 0 else f"{nama} Sintetis {k}"
+            faktor = 1.0 if k == 0 else rng.lognormal(0, 0.3)
+            layanan.append((label, baris['jumlah_bus'] * faktor, baris['jumlah_penumpang'] / baris['jumlah_bus']))
+
+    # Triwulan terbaru dipertahankan, deret diperpanjang mundur sejauh yang diperlukan
+    akhir = int(templat['periode_data'].max()) * 4 + int(templat.loc[templat['periode_data'].idxmax(), 'triwulan']) - 1
+    n_triwulan = max(1, math.ceil(n / len(layanan)))
+    baris = []
+    for t in range(akhir - n_triwulan + 1, akhir + 1):
+        tahun, triwulan = divmod(t, 4)
+        for label, bus, rasio in layanan:
+            jumlah_bus = max(1, int(round(bus * rng.lognormal(0, 0.05))))
+            baris.append((tahun, triwulan + 1, label, jumlah_bus, int(jumlah_bus * rasio * rng.lognormal(0, 0.15))))
+    df = pd.DataFrame(baris, columns=['periode_data', 'triwulan', 'jenis_layanan', 'jumlah_bus', 'jumlah_penumpang'])
+    return df.tail(n).reset_index(drop=True)[list(templat.columns)]
+
+
+def generate(skala=1, seed=0, templat=None):
+    """
+    Semua sumber data sintetis sebesar `skala` kali data sampel.
+    Mengembalikan dict nama -> DataFrame bertipe seperti hasil
+    PartitionedStore.load() (templat sudah melalui apply_schema); koordinat
+    halte masih mentah, belum dinormalisasi. Tanpa `templat`, data sampel
+    dimuat dari direktori kerja.
+    """
+    templat = templat or load_directory()
+    rng = np.random.default_rng(seed)
+    return {
+        'halte': synthetic_halte(templat['halte'], round(len(templat['halte']) * skala), rng),
+        'bus_penumpang': synthetic_bus_penumpang(templat['bus_penumpang'], round(len(templat['bus_penumpang']) * skala), rng, skala),
+        'rute': synthetic_rute(templat['rute'], round(len(templat['rute']) * skala), rng, skala),
+    }
+
+
+def write_sources(frames, data_dir):
+    """
+    Menulis data ke workbook Excel dengan nama file dan sheet seperti sumber asli.
+    Mengembalikan spesifikasi sumber dengan path file yang ditulis; direktori
+    tersebut dapat dibaca dengan transjakarta.store.PartitionedStore.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    sumber = sources_in(data_dir)
+    for nama, df in frames.items():
+        df.to_excel(sumber[nama]['path'], sheet_name=sumber[nama]['sheet_name'], index=False)
+    return sumber
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bangkitkan data sumber Transjakarta sintetis.")
+    parser.add_argument('--skala', type=float, default=10, help="Kelipatan ukuran data sampel (default: 10).")
+    parser.add_argument('--output', default=None, help="Direktori keluaran (default: data_sintetis/x<skala>).")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join('data_sintetis', f"x{args.skala:g}")
+    frames = generate(args.skala, args.seed)
+    write_sources(frames, output)
+    for nama, df in frames.items():
+        print(f"{nama:<14} {len(df):>9,} baris -> {os.path.join(output, SUMBER_DATA[nama]['path'])}")
+
+
+if __name__ == '__main__':
+    main()